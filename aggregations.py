@@ -0,0 +1,202 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Jumlah status filter yang disimpan di LRU
+DEFAULT_MAX_ENTRIES = 64
+
+# Kunci murah untuk satu status filter
+FilterState = namedtuple('FilterState', ['platform', 'sentiment', 'media_type', 'location', 'start_date', 'end_date'])
+
+
+def filters_of(state):
+    return {
+        'Platform': state.platform,
+        'Sentiment': state.sentiment,
+        'Media Type': state.media_type,
+        'Location': state.location,
+    }
+
+
+# --- Roll-up dasar dari seleksi pada indeks filter (baris atau sel kubus) ---
+
+# Jumlah baris per nilai dimensi (setara value_counts), hanya nilai yang muncul.
+# Nilai berjumlah sama diurutkan menurut baris terpilih pertamanya, seperti value_counts.
+def count_by(index, col, selection):
+    codes = selection.take(index.codes[col])
+    valid = codes >= 0
+    codes = codes[valid]
+    weights = None if index.row_counts is None else selection.take(index.row_counts)[valid]
+    counts = np.bincount(codes, weights=weights, minlength=len(index.categories[col])).round().astype('int64')
+    first_rows = np.full(len(counts), np.iinfo('int64').max, dtype='int64')
+    np.minimum.at(first_rows, codes, index.first_row_positions(selection.mask)[valid])
+    present = np.flatnonzero(counts > 0)
+    order = present[np.lexsort((first_rows[present], -counts[present]))]
+    return pd.Series(counts[order], index=pd.Index(index.categories[col][order], name=col), name='count')
+
+
+# Total keterlibatan per nilai dimensi (setara groupby(col)['Engagements'].sum())
+def engagements_by(index, col, selection):
+    codes = selection.take(index.codes[col])
+    engagements = selection.take(index.engagements)
+    valid = codes >= 0
+    codes = codes[valid]
+    sums = np.bincount(codes, weights=engagements[valid], minlength=len(index.categories[col]))
+    present = np.bincount(codes, minlength=len(index.categories[col])) > 0
+    result = pd.Series(sums.round().astype('int64'), index=pd.Index(index.categories[col], name=col), name='Engagements')
+    return result[present]
+
+
+# Total keterlibatan harian (setara groupby(Date.dt.date)); dengan fill_empty_days
+# hari tanpa data ikut bernilai 0 (setara resample('D'))
+def daily_engagements(index, selection, fill_empty_days=False):
+    days = selection.take(index.days)
+    if len(days) == 0:
+        return pd.Series([], index=pd.DatetimeIndex([], name='Date'), dtype='int64', name='Engagements')
+    first_day = days.min()
+    offsets = (days - first_day).astype('int64')
+    engagements = selection.take(index.engagements)
+    sums = np.bincount(offsets, weights=engagements)
+    present = np.bincount(offsets) > 0
+    day_index = pd.DatetimeIndex(first_day + np.arange(len(sums)), name='Date')
+    result = pd.Series(sums.round().astype('int64'), index=day_index, name='Engagements')
+    return result if fill_empty_days else result[present]
+
+
+# Arah tren dari nilai harian pertama dan terakhir
+def trend_direction(daily):
+    overall_trend = 'stabil'
+    if len(daily) > 1:
+        first_engagement = daily.iloc[0]
+        last_engagement = daily.iloc[-1]
+        if last_engagement > first_engagement * 1.1:
+            overall_trend = 'meningkat'
+        elif last_engagement < first_engagement * 0.9:
+            overall_trend = 'menurun'
+    return overall_trend
+
+
+# --- Metrik dasbor; masing-masing bernilai None jika kolom yang dibutuhkan tidak ada ---
+
+def _dimension_counts(col):
+    def compute(layer, state):
+        if col not in layer.index.codes:
+            return None
+        return count_by(layer.index, col, layer.metric(state, 'selection'))
+    return compute
+
+
+def _dimension_engagements(col):
+    def compute(layer, state):
+        if col not in layer.index.codes or layer.index.engagements is None:
+            return None
+        return engagements_by(layer.index, col, layer.metric(state, 'selection'))
+    return compute
+
+
+def _daily(fill_empty_days):
+    def compute(layer, state):
+        if layer.index.dates is None or layer.index.engagements is None:
+            return None
+        return daily_engagements(layer.index, layer.metric(state, 'selection'), fill_empty_days)
+    return compute
+
+
+def _selection(layer, state):
+    return layer.index.select(filters_of(state), state.start_date, state.end_date)
+
+
+def _engagement_trend(layer, state):
+    daily = layer.metric(state, 'daily_engagements')
+    return None if daily is None else trend_direction(daily)
+
+
+# Fakta agregat untuk prompt ringkasan LLM
+def _summary_facts(layer, state):
+    sentiment_counts = layer.metric(state, 'sentiment_counts')
+    sentiment_counts = {} if sentiment_counts is None else sentiment_counts.to_dict()
+    platform_engagements = layer.metric(state, 'platform_engagements')
+    platform_engagements = {} if platform_engagements is None else platform_engagements.sort_values(ascending=False).to_dict()
+    media_type_counts = layer.metric(state, 'media_type_counts')
+    media_type_counts = {} if media_type_counts is None else media_type_counts.to_dict()
+    location_engagements = layer.metric(state, 'location_engagements')
+    location_engagements = {} if location_engagements is None else location_engagements.sort_values(ascending=False).to_dict()
+
+    top_platform = next(iter(platform_engagements)) if platform_engagements else 'N/A'
+    top_location = next(iter(location_engagements)) if location_engagements else 'N/A'
+
+    daily = layer.metric(state, 'daily_engagements')
+    if daily is not None:
+        start_date = daily.index.min().strftime('%Y-%m-%d') if not daily.empty else 'N/A'
+        end_date = daily.index.max().strftime('%Y-%m-%d') if not daily.empty else 'N/A'
+    else:
+        start_date = 'N/A'
+        end_date = 'N/A'
+
+    return {
+        'dominant_sentiment': max(sentiment_counts, key=sentiment_counts.get) if sentiment_counts else 'N/A',
+        'top_platform': top_platform,
+        'top_platform_engagements': int(platform_engagements.get(top_platform, 0)),
+        'overall_trend': layer.metric(state, 'engagement_trend') or 'stabil',
+        'start_date': start_date,
+        'end_date': end_date,
+        'dominant_media_type': max(media_type_counts, key=media_type_counts.get) if media_type_counts else 'N/A',
+        'top_location': top_location,
+        'top_location_engagements': int(location_engagements.get(top_location, 0)),
+    }
+
+
+METRICS = {
+    'selection': _selection,
+    'sentiment_counts': _dimension_counts('Sentiment'),
+    'media_type_counts': _dimension_counts('Media Type'),
+    'platform_engagements': _dimension_engagements('Platform'),
+    'location_engagements': _dimension_engagements('Location'),
+    'daily_engagements': _daily(fill_empty_days=False),
+    'daily_engagements_filled': _daily(fill_empty_days=True),
+    'engagement_trend': _engagement_trend,
+    'summary_facts': _summary_facts,
+}
+
+
+# Lapisan agregasi bersama: setiap metrik dihitung sekali per status filter,
+# disimpan dalam LRU terbatas yang dikunci oleh FilterState.
+# Hasil metrik dibagi antar pemanggil dan tidak boleh diubah.
+class AggregationLayer:
+    def __init__(self, index, max_entries=DEFAULT_MAX_ENTRIES):
+        self.index = index
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def metric(self, state, name):
+        return self.memo(state, name, lambda: METRICS[name](self, state))
+
+    # Memo umum per status filter: hitung compute() sekali untuk (state, name).
+    # Dipakai juga untuk turunan metrik seperti bagian grafik yang sudah dibangun.
+    def memo(self, state, name, compute):
+        with self._lock:
+            entry = self._entries.get(state)
+            if entry is None:
+                entry = self._entries[state] = {}
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(state)
+            if name in entry:
+                self.hits += 1
+                return entry[name]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            entry[name] = value
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
@@ -0,0 +1,147 @@
+import argparse
+import datetime
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from aggregations import FilterState
+from downsampling import AUTO_GRANULARITY, GRANULARITY_OPTIONS
+from report_engine import report_to_html, run_report
+from summary_client import DEFAULT_BASE_URL, SummaryClient
+
+NO_DATA_SUMMARY_TEXT = "Tidak ada data yang difilter untuk membuat ringkasan."
+
+
+def output_paths(output_dir, csv_path):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(output_dir, stem + '.json'), os.path.join(output_dir, stem + '.html')
+
+
+def write_report(report, json_path, html_path=None):
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False)
+    if html_path:
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(report_to_html(report))
+
+
+# Proses satu CSV di proses pekerja: tulis laporan JSON (dan HTML jika tidak menunggu ringkasan)
+def process_file(csv_path, output_dir, drop_nan, state, persona, write_html, backend='pandas',
+                 granularity=AUTO_GRANULARITY):
+    json_path, html_path = output_paths(output_dir, csv_path)
+    started = time.perf_counter()
+    try:
+        report = run_report(csv_path, name=os.path.basename(csv_path), drop_nan=drop_nan, state=state, persona=persona,
+                            backend=backend, granularity=granularity)
+        write_report(report, json_path, html_path if write_html else None)
+    except Exception as e:
+        return {'path': csv_path, 'error': f'{type(e).__name__}: {e}'}
+    return {
+        'path': csv_path,
+        'json': json_path,
+        'html': html_path,
+        'rows': report['rows'],
+        'prompt': report['summary_prompt'],
+        'facts': report['summary_facts'],
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+# Tambahkan ringkasan ke laporan JSON lalu render HTML-nya
+def attach_summary(json_path, html_path, summary):
+    with open(json_path, encoding='utf-8') as f:
+        report = json.load(f)
+    report['summary'] = summary
+    write_report(report, json_path, html_path)
+
+
+# Minta ringkasan untuk semua laporan sekaligus lewat satu klien ber-pool
+def summarize_reports(results, persona, api_key, concurrency, base_url=DEFAULT_BASE_URL):
+    client = SummaryClient(api_key, base_url=base_url, max_workers=concurrency, pool_size=concurrency)
+    futures = {result['json']: client.submit(result['prompt'], persona, result['facts'])
+               for result in results if result.get('prompt')}
+    summaries = {}
+    for json_path, future in futures.items():
+        try:
+            summaries[json_path] = future.result()
+        except Exception as e:
+            summaries[json_path] = f'Error membuat ringkasan: {e}'
+    client.close()
+    return summaries
+
+
+def parse_date(value):
+    return datetime.date.fromisoformat(value)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Buat laporan intelijen media (JSON dan HTML) untuk setiap CSV dalam sebuah direktori.")
+    parser.add_argument('input_dir', help="Direktori berisi file CSV")
+    parser.add_argument('-o', '--output-dir', default='reports', help="Direktori keluaran laporan (default: reports)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help="Jumlah proses pekerja (default: jumlah core)")
+    parser.add_argument('--keep-nan', action='store_true', help="Jangan hapus baris dengan nilai yang hilang")
+    parser.add_argument('--backend', choices=['pandas', 'duckdb'], default='pandas',
+                        help="Mesin pemrosesan; duckdb memindai CSV out-of-core untuk file yang lebih besar dari RAM")
+    parser.add_argument('--platform', default='All')
+    parser.add_argument('--sentiment', default='All')
+    parser.add_argument('--media-type', default='All')
+    parser.add_argument('--location', default='All')
+    parser.add_argument('--start-date', type=parse_date, help="Tanggal mulai (YYYY-MM-DD)")
+    parser.add_argument('--end-date', type=parse_date, help="Tanggal akhir (YYYY-MM-DD)")
+    parser.add_argument('--trend-granularity', choices=GRANULARITY_OPTIONS, default=AUTO_GRANULARITY,
+                        help="Ember grafik tren: auto (dari rentang), D, W, atau M")
+    parser.add_argument('--summaries', action='store_true', help="Buat ringkasan LLM untuk setiap laporan secara batch")
+    parser.add_argument('--persona', choices=['professional', 'consultant'], default='professional')
+    parser.add_argument('--api-key', default=os.environ.get('GEMINI_API_KEY'), help="Kunci API Gemini (default: $GEMINI_API_KEY)")
+    parser.add_argument('--api-base-url', default=DEFAULT_BASE_URL, help="URL dasar Gemini API")
+    parser.add_argument('--summary-concurrency', type=int, default=4, help="Jumlah permintaan ringkasan paralel")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.summaries and not args.api_key:
+        parser.error("--summaries membutuhkan --api-key atau $GEMINI_API_KEY")
+    if bool(args.start_date) != bool(args.end_date):
+        parser.error("--start-date dan --end-date harus diberikan bersama")
+
+    csv_paths = sorted(glob.glob(os.path.join(args.input_dir, '*.csv')))
+    if not csv_paths:
+        parser.error(f"Tidak ada file CSV di {args.input_dir}")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    state = FilterState(args.platform, args.sentiment, args.media_type, args.location, args.start_date, args.end_date)
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(process_file, path, args.output_dir, not args.keep_nan, state, args.persona, not args.summaries,
+                               args.backend, args.trend_granularity)
+                   for path in csv_paths]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if 'error' in result:
+                print(f"GAGAL {result['path']}: {result['error']}", file=sys.stderr)
+            else:
+                print(f"OK {result['path']} ({result['rows']} baris, {result['seconds']} dtk)")
+
+        succeeded = [result for result in results if 'error' not in result]
+        if args.summaries:
+            summaries = summarize_reports(succeeded, args.persona, args.api_key, args.summary_concurrency, args.api_base_url)
+            list(pool.map(attach_summary,
+                          [result['json'] for result in succeeded],
+                          [result['html'] for result in succeeded],
+                          [summaries.get(result['json'], NO_DATA_SUMMARY_TEXT) for result in succeeded]))
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(succeeded)}/{len(csv_paths)} laporan selesai dalam {elapsed:.1f} dtk "
+          f"({len(csv_paths) / elapsed:.2f} file/dtk, {args.workers} pekerja)")
+    return 0 if len(succeeded) == len(csv_paths) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from aggregations import AggregationLayer, FilterState
+from ingestion import read_csv_chunked
+from report_engine import ALL_FILTERS, SECTION_BUILDERS, build_aggregations, build_summary_prompt, clean_data
+from synthetic_data import generate_frame, positive_int, write_csv
+
+# Ukuran dataset default (baris)
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+
+# Ukur satu tahap: waktu dinding, atau puncak memori yang dialokasikan selama tahap berjalan.
+# tracemalloc memperlambat alokasi objek Python berlipat-lipat, jadi waktu dan memori diukur
+# pada jalannya yang terpisah; waktu dari jalannya dengan tracemalloc dicatat sebagai None.
+class StageTimer:
+    def __init__(self, measure_memory=True):
+        self.measure_memory = measure_memory
+        self.stages = []
+
+    def run(self, stage, func, *args, rows_in=None):
+        if self.measure_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - started
+        peak = None
+        if self.measure_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.stages.append({'stage': stage, 'seconds': None if self.measure_memory else round(seconds, 6),
+                            'peak_bytes': peak,
+                            'rows_in': rows_in, 'rows_out': _row_count(result)})
+        return result
+
+
+def _row_count(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, pd.DataFrame):
+        return int(result.shape[0])
+    if isinstance(result, AggregationLayer):
+        return result.index.size # jumlah sel kubus
+    if hasattr(result, 'count') and isinstance(result.count, int):
+        return result.count
+    return None
+
+
+# Status filter representatif: platform teratas dan separuh pertama rentang tanggal
+def filtered_state(aggregations):
+    index = aggregations.index
+    platforms = index.options('Platform') if 'Platform' in index.codes else []
+    start, end = index.date_bounds()
+    midpoint = start + (end - start) / 2 if start is not None else None
+    return FilterState(platforms[0] if platforms else 'All', 'All', 'All', 'All',
+                       start.date() if start is not None else None,
+                       midpoint.date() if midpoint is not None else None)
+
+
+# Jalankan seluruh pipeline dasbor pada satu CSV, satu tahap per pengukuran
+def benchmark_file(path, drop_nan=True, measure_memory=True):
+    timer = StageTimer(measure_memory)
+    df, _ = timer.run('parse_csv', read_csv_chunked, path)
+    cleaned_df, _, _ = timer.run('clean_and_process_data', clean_data, df, drop_nan, rows_in=len(df))
+    del df
+    aggregations = timer.run('build_cube', build_aggregations, cleaned_df, rows_in=len(cleaned_df))
+
+    for label, state in [('all', ALL_FILTERS), ('filtered', filtered_state(aggregations))]:
+        timer.run(f'filter_{label}', aggregations.metric, state, 'selection', rows_in=len(cleaned_df))
+        for builder in SECTION_BUILDERS:
+            timer.run(f'chart_{builder.__name__[:-len("_section")]}_{label}', builder, aggregations, state)
+        # Fakta ringkasan diukur pada lapisan dengan memo kosong (indeks kubus yang sama); di lapisan
+        # bersama, grafik di atas sudah menghitung semua metriknya sehingga yang terukur hanya cache hit
+        if not aggregations.metric(state, 'selection').empty:
+            fresh = AggregationLayer(aggregations.index)
+            facts = timer.run(f'summary_facts_{label}', fresh.metric, state, 'summary_facts')
+            timer.run(f'summary_prompt_{label}', build_summary_prompt, facts, 'professional')
+    return timer.stages
+
+
+# Jalankan pipeline sekali pada data kecil agar impor Plotly dan inisialisasi lain tidak masuk ke tahap pertama
+def warm_up():
+    cleaned_df, _, _ = clean_data(generate_frame(1_000))
+    aggregations = build_aggregations(cleaned_df)
+    for builder in SECTION_BUILDERS:
+        builder(aggregations, ALL_FILTERS)
+
+
+# Gabungkan jalannya per tahap: waktu terbaik dari jalannya waktu, puncak memori dari jalannya memori
+def merge_repeats(runs):
+    merged = []
+    for stages in zip(*runs):
+        seconds = [stage['seconds'] for stage in stages if stage['seconds'] is not None]
+        peaks = [stage['peak_bytes'] for stage in stages if stage['peak_bytes'] is not None]
+        merged.append(dict(stages[0], seconds=min(seconds), peak_bytes=max(peaks) if peaks else None,
+                           repeats=len(seconds)))
+    return merged
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes, data_dir, repeat=1, seed=0, drop_nan=True, measure_memory=True):
+    warm_up()
+    results = []
+    for rows in sizes:
+        path = os.path.join(data_dir, f'synthetic_{rows}_{seed}.csv')
+        if not os.path.exists(path):
+            write_csv(path, rows, seed=seed)
+        runs = [benchmark_file(path, drop_nan, measure_memory=False) for _ in range(repeat)]
+        if measure_memory:
+            runs.append(benchmark_file(path, drop_nan, measure_memory=True))
+        results.append({'rows': rows, 'file_bytes': os.path.getsize(path), 'stages': merge_repeats(runs)})
+        total = sum(stage['seconds'] for stage in results[-1]['stages'])
+        print(f"{rows} baris: {total:.2f} dtk", file=sys.stderr)
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'drop_nan': drop_nan,
+            'memory_measured': measure_memory,
+        },
+        'results': results,
+    }
+
+
+# Bandingkan dua hasil benchmark: rasio waktu per (ukuran, tahap); > 1 berarti lebih lambat.
+# Tahap yang bertambah kurang dari min_seconds tidak dianggap regresi (derau pengukuran).
+def compare(baseline, current, threshold=1.2, min_seconds=0.01):
+    baseline_seconds = {(result['rows'], stage['stage']): stage['seconds']
+                        for result in baseline['results'] for stage in result['stages']}
+    rows = []
+    for result in current['results']:
+        for stage in result['stages']:
+            before = baseline_seconds.get((result['rows'], stage['stage']))
+            if before:
+                ratio = stage['seconds'] / before
+                rows.append({'rows': result['rows'], 'stage': stage['stage'], 'baseline': before,
+                             'current': stage['seconds'], 'ratio': round(ratio, 3), 'regression': ratio > threshold and stage['seconds'] - before > min_seconds})
+    return rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline dasbor per tahap pada data sintetis.")
+    parser.add_argument('--sizes', type=positive_int, nargs='+', default=DEFAULT_SIZES, help="Ukuran dataset (baris)")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'media-dashboard-bench'),
+                        help="Direktori CSV sintetis (dipakai ulang antar jalannya)")
+    parser.add_argument('-o', '--output', help="Tulis hasil JSON ke file ini (default: stdout)")
+    parser.add_argument('--repeat', type=positive_int, default=1, help="Jumlah jalannya pengukuran waktu per ukuran")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep-nan', action='store_true')
+    parser.add_argument('--no-memory', action='store_true', help="Lewati jalannya pengukuran memori (tracemalloc)")
+    parser.add_argument('--compare', help="JSON benchmark sebelumnya untuk dibandingkan")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Rasio waktu yang dianggap regresi")
+    parser.add_argument('--min-seconds', type=float, default=0.01, help="Selisih waktu minimum yang dianggap regresi")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = run_benchmarks(args.sizes, args.data_dir, args.repeat, args.seed,
+                            drop_nan=not args.keep_nan, measure_memory=not args.no_memory)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report['comparison'] = compare(json.load(f), report, args.threshold, args.min_seconds)
+        regressions = [row for row in report['comparison'] if row['regression']]
+        for row in regressions:
+            print(f"REGRESI {row['rows']} baris {row['stage']}: {row['baseline']:.4f} -> {row['current']:.4f} dtk "
+                  f"(x{row['ratio']})", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from filter_index import FILTER_DIMENSIONS, FilterIndex
+from ingestion import combine_frames
+
+# Kolom jumlah baris asli per sel kubus
+ROWS_COLUMN = 'Rows'
+
+# Kolom posisi baris asli pertama per sel kubus; menentukan urutan nilai berjumlah sama
+# (value_counts mengurutkannya menurut kemunculan pertama)
+FIRST_ROW_COLUMN = 'FirstRow'
+
+
+# Aturan sel kubus: hari x apakah waktunya tepat tengah malam x dimensi, dengan 'Date' setiap sel
+# adalah waktu paling awal di sel itu. Karena sel dipisah menurut tengah malam, perbandingan 'Date' sel
+# dengan batas tanggal (tengah malam) memberi hasil yang sama persis dengan perbandingan per baris.
+def _cell_keys(df, dimensions):
+    keys = [df[col] for col in dimensions]
+    if 'Date' in df.columns:
+        day = df['Date'].dt.floor('D').rename('_day')
+        keys = [day, (df['Date'] == day).rename('_midnight')] + keys
+    return keys
+
+
+# Aturan sel yang sama sebagai ekspresi GROUP BY SQL (backend DuckDB)
+def cell_key_sql(dimensions, has_dates, quote):
+    keys = [quote(col) for col in dimensions]
+    if has_dates:
+        keys = ["date_trunc('day', Date)", "Date = date_trunc('day', Date)"] + keys
+    return keys
+
+
+# Kelompokkan baris (atau sel) per sel kubus; rows_aggregation menentukan cara kolom jumlah baris dihitung
+def _group_cells(df, dimensions, rows_aggregation):
+    dimensions = [col for col in dimensions if col in df.columns]
+    aggregations = {'Engagements': ('Engagements', 'sum'), ROWS_COLUMN: rows_aggregation}
+    if FIRST_ROW_COLUMN in df.columns:
+        aggregations[FIRST_ROW_COLUMN] = (FIRST_ROW_COLUMN, 'min')
+    if 'Date' not in df.columns and not dimensions:
+        return pd.DataFrame({name: [df[col].agg(func)] for name, (col, func) in aggregations.items()})
+    if 'Date' in df.columns:
+        aggregations['Date'] = ('Date', 'min')
+
+    cube = df.groupby(_cell_keys(df, dimensions), observed=True, dropna=False, sort=False).agg(**aggregations)
+    cube = cube.reset_index().drop(columns=['_day', '_midnight'], errors='ignore')
+    cube['Engagements'] = cube['Engagements'].astype('int64')
+    return cube
+
+
+# Bangun kubus agregat: total keterlibatan dan jumlah baris per
+# hari x Platform x Sentiment x Media Type x Location (lihat _cell_keys).
+# row_offset adalah posisi baris pertama df di dataset (mis. baris delta sesudah riwayat).
+def build_cube(df, dimensions=FILTER_DIMENSIONS, row_offset=0):
+    df = df.assign(**{FIRST_ROW_COLUMN: np.arange(row_offset, row_offset + len(df), dtype='int64')})
+    return _group_cells(df, dimensions, ('Engagements', 'size'))
+
+
+# Gabungkan beberapa kubus (mis. kubus lama dan kubus baris baru) menjadi satu tanpa membaca baris.
+# Sel dengan kunci sama disatukan dengan aturan yang sama seperti build_cube, sehingga hasilnya
+# setara build_cube atas semua baris.
+def merge_cubes(cubes, dimensions=FILTER_DIMENSIONS):
+    cube = combine_frames([cube for cube in cubes if not cube.empty] or cubes[:1])
+    return _group_cells(cube, dimensions, (ROWS_COLUMN, 'sum'))
+
+
+# Tambahkan kubus delta ke kubus yang ada dengan hanya mengelompokkan ulang sel pada hari yang muncul
+# di delta; sel hari lain disalin apa adanya. Karena hari adalah bagian dari kunci sel, hasilnya setara
+# merge_cubes. Tanpa kolom Date semua sel bisa tersentuh, jadi dipakai merge_cubes biasa.
+def update_cube(cube, delta_cube, dimensions=FILTER_DIMENSIONS):
+    if 'Date' not in cube.columns or cube.empty or delta_cube.empty:
+        return merge_cubes([cube, delta_cube], dimensions)
+    touched = cube['Date'].dt.floor('D').isin(delta_cube['Date'].dt.floor('D').unique())
+    merged = merge_cubes([cube[touched], delta_cube], dimensions)[list(cube.columns)]
+    return combine_frames([cube[~touched], merged])
+
+
+# Indeks filter di atas kubus yang sudah jadi (mis. dari cache disk atau backend DuckDB).
+# Kubus lama tanpa kolom posisi baris pertama memakai urutan sel.
+def cube_index(cube):
+    return FilterIndex(cube, rows_column=ROWS_COLUMN,
+                       first_row_column=FIRST_ROW_COLUMN if FIRST_ROW_COLUMN in cube.columns else None)
+
+
+# Indeks filter di atas kubus: filter dan roll-up bekerja pada sel, bukan baris
+def build_cube_index(df):
+    return cube_index(build_cube(df))
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import pyarrow as pa
+from pyarrow import feather
+
+# Versi format cache; naikkan jika skema penyimpanan berubah
+CACHE_VERSION = 2
+
+# Lokasi dan anggaran ukuran cache (dapat diatur lewat variabel lingkungan)
+DEFAULT_CACHE_DIR = os.environ.get(
+    'MEDIA_DASHBOARD_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'media_dashboard')
+)
+DEFAULT_CACHE_BUDGET = int(os.environ.get('MEDIA_DASHBOARD_CACHE_BYTES', 4 * 1024 ** 3))
+
+# Ukuran blok saat meng-hash byte unggahan
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+CACHE_SUFFIX = '.arrow'
+METADATA_KEY = b'media_dashboard'
+
+# Berkas indeks nama dataset tersimpan -> kunci cache terbaru
+REFS_FILE = 'refs.json'
+
+
+# Hash byte unggahan secara streaming (tanpa menyalin seluruh file)
+def hash_upload(source, block_size=HASH_BLOCK_SIZE):
+    digest = hashlib.blake2b(digest_size=20)
+    if hasattr(source, 'getbuffer'):
+        buffer = source.getbuffer()
+        try:
+            for start in range(0, len(buffer), block_size):
+                digest.update(buffer[start:start + block_size])
+        finally:
+            buffer.release()
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(block_size), b''):
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+# Kunci cache: hash isi unggahan ditambah opsi pembersihan
+def dataset_key(content_hash, **options):
+    payload = json.dumps({'v': CACHE_VERSION, 'content': content_hash, 'options': options}, sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+# Cache dataset bersih dalam format Arrow IPC (dapat di-mmap) dengan penggusuran LRU
+class DatasetCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, budget_bytes=DEFAULT_CACHE_BUDGET):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def has(self, key):
+        return os.path.exists(self._path(key))
+
+    # Muat DataFrame dan metadata; None jika tidak ada di cache.
+    # Kolom dibuat sebagai blok terpisah (split_blocks) langsung di atas buffer mmap, sehingga kolom
+    # numerik, tanggal, dan kode kategori tanpa nilai kosong tidak disalin dan muat ulang hampir tidak
+    # bergantung pada ukuran dataset. Larik hasilnya hanya-baca; kolom dengan nilai kosong tetap disalin.
+    def load(self, key):
+        path = self._path(key)
+        try:
+            table = feather.read_table(path, memory_map=True)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+
+        # Tandai sebagai baru dipakai untuk urutan LRU
+        os.utime(path)
+        raw_metadata = (table.schema.metadata or {}).get(METADATA_KEY, b'{}')
+        # self_destruct melepas tiap kolom Arrow begitu dikonversi; tabel tidak dipakai lagi sesudahnya
+        return table.to_pandas(split_blocks=True, self_destruct=True), json.loads(raw_metadata)
+
+    # Simpan DataFrame; kembalikan False jika tidak dapat dikonversi atau melebihi anggaran.
+    # Dengan evict=False penggusuran ditunda sampai pemanggil memanggil evict() (atau save_ref) sendiri.
+    def store(self, key, df, metadata=None, evict=True):
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return False
+
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata[METADATA_KEY] = json.dumps(metadata or {}).encode('utf-8')
+        table = table.replace_schema_metadata(schema_metadata)
+
+        # Tulis ke file sementara lalu ganti secara atomik
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            # Tanpa kompresi agar dapat dibaca langsung lewat mmap
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            if os.path.getsize(tmp_path) > self.budget_bytes:
+                return False
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if evict:
+            self.evict()
+        return True
+
+    # Dataset tersimpan: nama -> {'key': kunci cache terbaru, 'pins': kunci yang disematkan, ...info}
+    def refs(self):
+        try:
+            with open(os.path.join(self.directory, REFS_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    # Arahkan nama dataset ke kunci cache baru (ditulis atomik). Entri pins (default: key saja) tidak
+    # digusur selama ref ini menunjuk ke sana, sehingga dataset tersimpan selalu dapat dimuat;
+    # entri ref sebelumnya kembali mengikuti LRU. Penggusuran yang tertunda dijalankan sesudahnya.
+    def save_ref(self, name, key, pins=None, **info):
+        refs = self.refs()
+        refs[name] = dict(info, key=key, pins=list(pins or [key]))
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(refs, f)
+        os.replace(tmp_path, os.path.join(self.directory, REFS_FILE))
+        self.evict()
+
+    # Kunci yang disematkan oleh dataset tersimpan
+    def pinned_keys(self):
+        return {pin for ref in self.refs().values() for pin in ref.get('pins', [ref['key']])}
+
+    # Hapus entri yang paling lama tidak dipakai sampai total ukuran di bawah anggaran.
+    # Entri yang disematkan tetap dihitung dalam total tetapi tidak pernah dihapus.
+    def evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        pinned = {self._path(key) for key in self.pinned_keys()}
+        for _, size, path in entries:
+            if total <= self.budget_bytes:
+                break
+            if path in pinned:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
@@ -0,0 +1,96 @@
+import numpy as np
+
+AUTO_GRANULARITY = 'auto'
+
+# Granularitas tren: aturan resample pandas dan label judul grafik
+GRANULARITIES = {
+    'D': ('D', 'Harian'),
+    'W': ('W-MON', 'Mingguan'),
+    'M': ('MS', 'Bulanan'),
+}
+GRANULARITY_OPTIONS = [AUTO_GRANULARITY] + list(GRANULARITIES)
+
+# Batas titik yang dikirim ke browser; di atasnya deret disampel ulang dengan LTTB
+TREND_POINT_BUDGET = 1000
+
+# Mode otomatis memilih granularitas terhalus yang jumlah titiknya muat dalam anggaran titik,
+# jadi rentang harian yang panjang (di atas WEBGL_POINT_THRESHOLD) tetap harian dan dirender lewat WebGL
+AUTO_MAX_BUCKETS = TREND_POINT_BUDGET
+
+# Deret dengan titik lebih banyak dari ini dirender lewat WebGL (Scattergl) tanpa penanda
+WEBGL_POINT_THRESHOLD = 500
+
+
+# Pilih granularitas dari panjang rentang yang dipilih (jumlah hari pada deret harian)
+def choose_granularity(days, granularity=AUTO_GRANULARITY):
+    if granularity != AUTO_GRANULARITY:
+        return granularity
+    if days <= AUTO_MAX_BUCKETS:
+        return 'D'
+    if days / 7 <= AUTO_MAX_BUCKETS:
+        return 'W'
+    return 'M'
+
+
+# Jumlahkan deret harian ke ember minggu (mulai Senin) atau bulan.
+# Label ember pertama (awal minggu/bulan) bisa jatuh sebelum data pertama; label itu dipotong ke tanggal data pertama.
+def bucket_series(daily, granularity):
+    if granularity == 'D' or daily.empty:
+        return daily
+    rule = GRANULARITIES[granularity][0]
+    buckets = daily.resample(rule, label='left', closed='left').sum()
+    first_day = daily.index[0]
+    buckets.index = buckets.index.where(buckets.index >= first_day, first_day)
+    return buckets
+
+
+# Largest-Triangle-Three-Buckets: pilih `threshold` indeks yang mempertahankan bentuk deret
+# (puncak dan lembah tetap ada). Titik pertama dan terakhir selalu dipertahankan.
+def lttb(y, threshold, x=None):
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype='float64')
+    x = np.arange(n, dtype='float64') if x is None else np.asarray(x, dtype='float64')
+
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype('int64')
+    selected = np.empty(threshold, dtype='int64')
+    selected[0] = 0
+    selected[-1] = n - 1
+    anchor = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs((x[anchor] - avg_x) * (y[start:end] - y[anchor])
+                       - (x[anchor] - x[start:end]) * (avg_y - y[anchor]))
+        anchor = start + int(np.argmax(areas))
+        selected[i + 1] = anchor
+    return selected
+
+
+# Siapkan deret tren untuk grafik: ember sesuai rentang, lalu LTTB di atas anggaran titik.
+# Mengembalikan (deret, granularitas, jumlah_titik_sebelum_sampel).
+def trend_points(daily, granularity=AUTO_GRANULARITY, budget=TREND_POINT_BUDGET):
+    granularity = choose_granularity(len(daily), granularity)
+    series = bucket_series(daily, granularity)
+    total_points = len(series)
+    if total_points > budget:
+        series = series.iloc[lttb(series.to_numpy(), budget)]
+    return series, granularity, total_points
+
+
+def trend_title(granularity, shown_points, total_points):
+    title = f"Tren Keterlibatan {GRANULARITIES[granularity][1]}"
+    if shown_points < total_points:
+        title += f" ({shown_points} dari {total_points} titik)"
+    return title
+
+
+def granularity_label(granularity):
+    return 'Otomatis' if granularity == AUTO_GRANULARITY else GRANULARITIES[granularity][1]
+
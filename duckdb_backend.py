@@ -0,0 +1,260 @@
+import argparse
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # backend out-of-core bersifat opsional
+    duckdb = None
+
+from data_cube import FIRST_ROW_COLUMN, ROWS_COLUMN, cell_key_sql, cube_index
+from filter_index import FILTER_DIMENSIONS
+from ingestion import DATE_FORMAT_CANDIDATES, detect_date_format, has_timezone
+from report_engine import ALL_FILTERS
+
+try:
+    from pandas._libs.parsers import STR_NA_VALUES
+except ImportError:
+    STR_NA_VALUES = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                     '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+# Ukuran unggahan (byte) mulai dari mana dasbor memakai backend out-of-core; harus di bawah
+# server.maxUploadSize Streamlit (.streamlit/config.toml), kalau tidak unggahan sebesar itu sudah ditolak
+OUT_OF_CORE_THRESHOLD = int(os.environ.get('MEDIA_DASHBOARD_OUT_OF_CORE_BYTES', 512 * 1024 ** 2))
+
+# Batas memori DuckDB; sisanya ditumpahkan ke direktori sementara
+DUCKDB_MEMORY_LIMIT = os.environ.get('MEDIA_DASHBOARD_DUCKDB_MEMORY', '2GB')
+DUCKDB_TEMP_DIRECTORY = os.environ.get('MEDIA_DASHBOARD_DUCKDB_TEMP',
+                                       os.path.join(tempfile.gettempdir(), 'media-dashboard-duckdb'))
+
+# Jumlah sampel tanggal untuk mendeteksi format (sama dengan jalur pandas)
+DATE_SAMPLE_SIZE = 200
+
+
+def available():
+    return duckdb is not None
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+# Dataset CSV yang dipindai lazy oleh DuckDB. Pembersihan dinyatakan dalam SQL dengan semantik yang sama
+# dengan jalur pandas: view 'typed' mengurai tanggal dan keterlibatan, cleaned_condition memilih baris
+# bersih (tanggal valid, tanpa NaN); filter dan group-by didorong ke pemindaian, sehingga baris tidak
+# pernah dimuat ke pandas.
+class DuckDBDataset:
+    def __init__(self, path, drop_nan=True, memory_limit=DUCKDB_MEMORY_LIMIT,
+                 temp_directory=DUCKDB_TEMP_DIRECTORY):
+        if duckdb is None:
+            raise ImportError("Backend out-of-core membutuhkan paket 'duckdb'.")
+        self.path = path
+        self.drop_nan = drop_nan
+        self.warnings = []
+        self.con = duckdb.connect()
+        self.con.execute(f"SET memory_limit = {_literal(memory_limit)}")
+        # Nilai tanggal tanpa zona yang di-cast ke TIMESTAMPTZ dianggap UTC, seperti di jalur pandas
+        self.con.execute("SET TimeZone = 'UTC'")
+        if temp_directory:
+            self.con.execute(f"SET temp_directory = {_literal(temp_directory)}")
+
+        null_strings = ', '.join(_literal(value) for value in sorted(STR_NA_VALUES))
+        self.con.execute(
+            f"CREATE VIEW raw AS SELECT * FROM read_csv({_literal(path)}, header = true, "
+            f"all_varchar = true, nullstr = [{null_strings}])"
+        )
+        self.columns = [row[0] for row in self.con.execute("DESCRIBE raw").fetchall()]
+        self.dimensions = [col for col in FILTER_DIMENSIONS if col in self.columns]
+        self.has_dates = 'Date' in self.columns
+        self._create_cleaned_view()
+
+    # Ekspresi tanggal, selalu diurai di dalam DuckDB: format tetap yang dideteksi dari sampel
+    # (toleran terhadap nilai kotor), atau jika tidak ada format dominan, format kandidat pertama
+    # yang berhasil per nilai lalu cast ISO (setara ingestion.parse_mixed_dates).
+    # Nilai berzona waktu ('Z' atau offset) di-cast ke TIMESTAMPTZ lalu dinormalkan ke UTC naif
+    # (setara ingestion.parse_dates); try_strptime dengan %z tidak mengenali 'Z', dan cast ke
+    # TIMESTAMP membuang offset. Nilai yang tidak terurai menjadi NULL (setara NaT).
+    def _date_expression(self):
+        sample = self.con.execute(
+            f"SELECT Date FROM raw WHERE Date IS NOT NULL LIMIT {DATE_SAMPLE_SIZE}"
+        ).fetchdf()['Date']
+        date_format = detect_date_format(sample)
+        iso_utc = "timezone('UTC', TRY_CAST(raw.Date AS TIMESTAMPTZ))"
+        if has_timezone(date_format):
+            return iso_utc
+        if date_format is not None:
+            return f"try_strptime(raw.Date, {_literal(date_format)})"
+
+        attempts = [f"try_strptime(raw.Date, {_literal(fmt)})" for fmt in DATE_FORMAT_CANDIDATES]
+        return f"COALESCE({', '.join(attempts + [iso_utc])})"
+
+    def _create_cleaned_view(self):
+        select = []
+        for col in self.columns:
+            if col == 'Date':
+                select.append(f"CAST({self._date_expression()} AS TIMESTAMP) AS Date")
+            elif col == 'Engagements':
+                # to_numeric(errors='coerce').fillna(0).astype(int): nilai rusak menjadi 0, pecahan dipotong
+                select.append("CAST(trunc(COALESCE(TRY_CAST(raw.Engagements AS DOUBLE), 0)) AS BIGINT) AS Engagements")
+            else:
+                select.append(f"raw.{_quote(col)}")
+
+        if 'Engagements' not in self.columns:
+            self.warnings.append("Kolom 'Engagements' tidak ditemukan. Metrik keterlibatan tidak akan tersedia.")
+            select.append("CAST(0 AS BIGINT) AS Engagements")
+        if not self.has_dates:
+            self.warnings.insert(0, "Kolom 'Date' tidak ditemukan. Beberapa fitur mungkin tidak berfungsi dengan baik.")
+
+        conditions = []
+        if self.has_dates:
+            conditions.append("Date IS NOT NULL")
+        if self.drop_nan:
+            conditions += [f"{_quote(col)} IS NOT NULL" for col in self.columns if col not in ('Date', 'Engagements')]
+        # Syarat baris bersih, dipakai sebagai FILTER agregat di scan()
+        self.cleaned_condition = ' AND '.join(conditions) or 'TRUE'
+
+        # Nomor baris file (jendela streaming, tanpa materialisasi) untuk posisi baris pertama per sel
+        select.append("row_number() OVER () AS _row")
+        self.con.execute(
+            f"CREATE VIEW typed AS SELECT {', '.join(select)} FROM raw"
+        )
+
+    # Predikat filter sebagai ekspresi SQL ('TRUE' tanpa filter) beserta parameternya.
+    # Parameter bernomor ($1, $2, ...) sehingga ekspresi boleh muncul lebih dari sekali dalam satu kueri.
+    def filter_condition(self, state):
+        conditions = []
+        params = []
+        for col, value in zip(FILTER_DIMENSIONS, [state.platform, state.sentiment, state.media_type, state.location]):
+            if value != 'All' and col in self.dimensions:
+                params.append(value)
+                conditions.append(f"{_quote(col)} = ${len(params)}")
+        if self.has_dates and state.start_date and state.end_date:
+            params += [pd.Timestamp(state.start_date).to_pydatetime(), pd.Timestamp(state.end_date).to_pydatetime()]
+            conditions.append(f"Date >= ${len(params) - 1} AND Date <= ${len(params)}")
+        return ' AND '.join(conditions) or 'TRUE', params
+
+    # Kubus agregat (lihat data_cube.build_cube) dan jumlah baris dalam satu pemindaian file.
+    # GROUP BY berjalan atas semua baris bertipe: agregat kubus hanya menghitung baris bersih yang lolos
+    # filter state (FILTER), sementara jumlah baris bersih dan baris mentah dihitung per sel lalu
+    # dijumlahkan, sehingga file tidak dipindai ulang untuk menghitung baris.
+    # Sel tanpa baris terpilih dibuang. Mengembalikan (kubus, jumlah_baris_bersih, baris_dihapus).
+    def scan(self, state=ALL_FILTERS):
+        keys = cell_key_sql(self.dimensions, self.has_dates, _quote)
+        selected, params = self.filter_condition(state)
+        kept = f"({self.cleaned_condition}) AND ({selected})"
+        select = [_quote(col) for col in self.dimensions]
+        if self.has_dates:
+            select.append(f"MIN(Date) FILTER (WHERE {kept}) AS Date")
+        select += [f"CAST(COALESCE(SUM(Engagements) FILTER (WHERE {kept}), 0) AS BIGINT) AS Engagements",
+                   f"COUNT(*) FILTER (WHERE {kept}) AS {ROWS_COLUMN}",
+                   f"MIN(_row) FILTER (WHERE {kept}) AS {FIRST_ROW_COLUMN}",
+                   f"COUNT(*) FILTER (WHERE {self.cleaned_condition}) AS _cleaned_rows",
+                   "COUNT(*) AS _raw_rows"]
+
+        group_by = f" GROUP BY {', '.join(keys)}" if keys else ''
+        cube = self.con.execute(f"SELECT {', '.join(select)} FROM typed{group_by}", params).fetchdf()
+        row_count = int(cube.pop('_cleaned_rows').sum())
+        rows_removed = int(cube.pop('_raw_rows').sum()) - row_count
+        if keys:
+            cube = cube[cube[ROWS_COLUMN] > 0].reset_index(drop=True)
+        cube[FIRST_ROW_COLUMN] = cube[FIRST_ROW_COLUMN].fillna(0).astype('int64')
+        for col in self.dimensions:
+            cube[col] = cube[col].astype('category')
+        if self.has_dates:
+            cube['Date'] = pd.to_datetime(cube['Date'])
+        return cube, row_count, rows_removed
+
+    def close(self):
+        self.con.close()
+
+
+# Bangun kubus agregat dari file CSV tanpa memuat barisnya.
+# Mengembalikan (kubus, jumlah_baris_bersih, baris_dihapus, peringatan).
+def load_cube(path, drop_nan=True, state=ALL_FILTERS, **options):
+    dataset = DuckDBDataset(path, drop_nan, **options)
+    try:
+        return dataset.scan(state) + (dataset.warnings,)
+    finally:
+        dataset.close()
+
+
+# Bandingkan hasil backend DuckDB dengan jalur pandas untuk beberapa status filter.
+# Mengembalikan daftar perbedaan (kosong berarti sama).
+def verify_against_pandas(path, drop_nan=True, states=None):
+    from aggregations import AggregationLayer, FilterState
+    from report_engine import build_aggregations, build_sections, load_dataset
+
+    cleaned_df, rows_removed, _, _ = load_dataset(path, drop_nan)
+    pandas_layer = build_aggregations(cleaned_df)
+    cube, duck_rows, duck_removed, _ = load_cube(path, drop_nan)
+    duck_layer = AggregationLayer(cube_index(cube))
+
+    mismatches = []
+    if (cleaned_df.shape[0], rows_removed) != (duck_rows, duck_removed):
+        mismatches.append(f"jumlah baris: pandas {(cleaned_df.shape[0], rows_removed)}, duckdb {(duck_rows, duck_removed)}")
+    if 'Date' in cleaned_df.columns and 'Date' in cube.columns and \
+            getattr(cleaned_df['Date'].dtype, 'tz', None) != getattr(cube['Date'].dtype, 'tz', None):
+        mismatches.append(f"tipe kolom Date: pandas {cleaned_df['Date'].dtype}, duckdb {cube['Date'].dtype}")
+
+    if states is None:
+        states = [ALL_FILTERS]
+        start, end = pandas_layer.index.date_bounds()
+        for col in pandas_layer.index.codes:
+            for value in pandas_layer.index.options(col)[:2]:
+                filters = dict(zip(FILTER_DIMENSIONS, ['All'] * 4), **{col: value})
+                states.append(FilterState(filters['Platform'], filters['Sentiment'], filters['Media Type'],
+                                          filters['Location'], start and start.date(), end and end.date()))
+
+    metrics = ['sentiment_counts', 'media_type_counts', 'platform_engagements', 'location_engagements',
+               'daily_engagements_filled', 'summary_facts']
+    # Tipe yang tidak cocok (mis. tanggal berzona waktu di satu sisi) membuat perhitungan atau
+    # perbandingan gagal; itu dilaporkan sebagai perbedaan, bukan dimunculkan sebagai pengecualian
+    for state in states:
+        for name in metrics:
+            try:
+                expected = pandas_layer.metric(state, name)
+                actual = duck_layer.metric(state, name)
+                # Urutan ikut dibandingkan: nilai berjumlah sama diurutkan menurut kemunculan pertama
+                same = expected == actual if isinstance(expected, dict) or expected is None \
+                    else actual is not None and list(expected.items()) == list(actual.items())
+            except (TypeError, ValueError) as e:
+                mismatches.append(f"{name} untuk {state}: tipe tidak cocok ({type(e).__name__}: {e})")
+                continue
+            if not same:
+                mismatches.append(f"{name} untuk {state}: pandas {expected}, duckdb {actual}")
+        try:
+            expected_insights = [section['insights'] for section in build_sections(pandas_layer, state)]
+            actual_insights = [section['insights'] for section in build_sections(duck_layer, state)]
+        except (TypeError, ValueError) as e:
+            mismatches.append(f"wawasan untuk {state}: tipe tidak cocok ({type(e).__name__}: {e})")
+            continue
+        if expected_insights != actual_insights:
+            mismatches.append(f"wawasan untuk {state} berbeda")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifikasi backend DuckDB terhadap jalur pandas untuk file CSV kecil.")
+    parser.add_argument('csv', nargs='+')
+    parser.add_argument('--keep-nan', action='store_true')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.csv:
+        mismatches = verify_against_pandas(path, drop_nan=not args.keep_nan)
+        print(f"{'SAMA' if not mismatches else 'BERBEDA'} {path}")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        failed = failed or bool(mismatches)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
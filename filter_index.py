@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+# Dimensi yang dapat difilter di sidebar
+FILTER_DIMENSIONS = ['Platform', 'Sentiment', 'Media Type', 'Location']
+
+# Nilai pilihan yang berarti "tanpa filter"
+ALL_VALUES = 'All'
+
+
+# Indeks filter yang dibangun sekali per dataset bersih:
+# kode kategori per dimensi, bitmap per nilai (dibuat saat pertama dipakai),
+# dan urutan tanggal sehingga rentang tanggal menjadi irisan.
+# DataFrame sumber tidak pernah disalin.
+# Jika rows_column diberikan, setiap baris mewakili sejumlah baris asli (mis. sel kubus agregat);
+# first_row_column memberi posisi baris asli pertamanya (tanpa itu, posisi baris di df).
+class FilterIndex:
+    def __init__(self, df, dimensions=FILTER_DIMENSIONS, rows_column=None, first_row_column=None):
+        self.size = len(df)
+        self.row_counts = df[rows_column].to_numpy() if rows_column else None
+        self.first_rows = df[first_row_column].to_numpy() if first_row_column else None
+        self.codes = {}
+        self.categories = {}
+        for col in dimensions:
+            if col not in df.columns:
+                continue
+            values = df[col]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype('category')
+            self.codes[col] = values.cat.codes.to_numpy()
+            self.categories[col] = values.cat.categories
+
+        self.engagements = df['Engagements'].to_numpy() if 'Engagements' in df.columns else None
+
+        self.dates = None
+        if 'Date' in df.columns:
+            self.dates = df['Date'].to_numpy()
+            self.date_order = np.argsort(self.dates, kind='stable')
+            self.sorted_dates = self.dates[self.date_order]
+            self.days = self.dates.astype('datetime64[D]')
+
+        self._bitmaps = {}
+
+    # Nilai unik yang benar-benar muncul untuk sebuah dimensi, terurut
+    def options(self, col):
+        if col not in self.codes:
+            return []
+        codes = self.codes[col]
+        present = np.bincount(codes[codes >= 0], minlength=len(self.categories[col])) > 0
+        return sorted(self.categories[col][present].tolist())
+
+    def date_bounds(self):
+        if self.dates is None or self.size == 0:
+            return None, None
+        return pd.Timestamp(self.sorted_dates[0]), pd.Timestamp(self.sorted_dates[-1])
+
+    # Bitmap terkemas (1 bit per baris) untuk satu nilai dimensi
+    def value_bitmap(self, col, value):
+        key = (col, value)
+        if key not in self._bitmaps:
+            code = self.categories[col].get_indexer([value])[0]
+            if code < 0:
+                # Nilai tidak dikenal: tidak ada baris yang cocok (kode -1 adalah NaN)
+                self._bitmaps[key] = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+            else:
+                self._bitmaps[key] = np.packbits(self.codes[col] == code)
+        return self._bitmaps[key]
+
+    # Bitmap terkemas untuk rentang tanggal [start, end], diambil dari irisan indeks tanggal terurut
+    def date_bitmap(self, start, end):
+        lo, hi = self.date_slice(start, end)
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.date_order[lo:hi]] = True
+        return np.packbits(mask)
+
+    def date_slice(self, start, end):
+        dtype = self.sorted_dates.dtype
+        lo = np.searchsorted(self.sorted_dates, np.datetime64(pd.to_datetime(start)).astype(dtype), side='left')
+        hi = np.searchsorted(self.sorted_dates, np.datetime64(pd.to_datetime(end)).astype(dtype), side='right')
+        return lo, max(lo, hi)
+
+    # Selesaikan kombinasi filter menjadi satu seleksi baris lewat AND bitwise
+    def select(self, filters, start_date=None, end_date=None):
+        bitmap = None
+        for col, value in filters.items():
+            if value == ALL_VALUES or col not in self.codes:
+                continue
+            value_bits = self.value_bitmap(col, value)
+            bitmap = value_bits if bitmap is None else bitmap & value_bits
+
+        if self.dates is not None and start_date and end_date:
+            date_bits = self.date_bitmap(start_date, end_date)
+            bitmap = date_bits if bitmap is None else bitmap & date_bits
+
+        mask = None if bitmap is None else np.unpackbits(bitmap, count=self.size).view(bool)
+        return FilterSelection(mask, self.size, self.row_count(mask))
+
+    # Posisi baris asli pertama dari setiap baris terpilih
+    def first_row_positions(self, mask):
+        if self.first_rows is not None:
+            return self.first_rows if mask is None else self.first_rows[mask]
+        return np.arange(self.size) if mask is None else np.flatnonzero(mask)
+
+    # Jumlah baris asli yang terwakili oleh mask
+    def row_count(self, mask):
+        if self.row_counts is None:
+            return self.size if mask is None else int(np.count_nonzero(mask))
+        return int(self.row_counts.sum() if mask is None else self.row_counts[mask].sum())
+
+
+# Seleksi baris hasil filter; mask None berarti semua baris
+class FilterSelection:
+    def __init__(self, mask, size, count):
+        self.mask = mask
+        self.size = size
+        self.count = count
+
+    @property
+    def empty(self):
+        return self.count == 0
+
+    # Terapkan seleksi ke satu larik kolom (hanya kolom itu yang disalin)
+    def take(self, values):
+        return values if self.mask is None else values[self.mask]
+
+    # Wujudkan DataFrame terfilter bila memang dibutuhkan
+    def frame(self, df):
+        return df if self.mask is None else df[self.mask]
+
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from data_cube import build_cube, update_cube
+
+# Akhiran kunci cache untuk hash baris dataset
+HASHES_KEY_SUFFIX = '-hashes'
+
+
+# Hash 64-bit per baris bersih, dipakai untuk mencocokkan baris delta dengan baris yang sudah ada.
+# Keterlibatan disamakan ke int64 dan tanggal ke nanodetik karena lebar integer hasil downcast
+# dan resolusi datetime hasil penguraian bisa berbeda antar file.
+def row_hashes(df):
+    if 'Engagements' in df.columns:
+        df = df.assign(Engagements=df['Engagements'].astype('int64'))
+    if 'Date' in df.columns:
+        df = df.assign(Date=df['Date'].astype('datetime64[ns]'))
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+# Jumlah kemunculan setiap hash di `existing` (hash unik terurut) dan `counts` untuk setiap hash di `hashes`
+def _existing_counts(existing, counts, hashes):
+    if not len(existing):
+        return np.zeros(len(hashes), dtype='int64')
+    positions = np.minimum(np.searchsorted(existing, hashes), len(existing) - 1)
+    return np.where(existing[positions] == hashes, counts[positions], 0)
+
+
+# Gabungkan hash baru ke pasangan (hash unik terurut, jumlah) tanpa mengurutkan ulang riwayat
+def _add_counts(existing, counts, hashes):
+    added, added_counts = np.unique(hashes, return_counts=True)
+    positions = np.searchsorted(existing, added)
+    present = _existing_counts(existing, counts, added) > 0
+    counts = counts.copy()
+    counts[positions[present]] += added_counts[present]
+    return (np.insert(existing, positions[~present], added[~present]),
+            np.insert(counts, positions[~present], added_counts[~present]))
+
+
+# Dataset yang dapat ditambah per file delta: kubus agregat dan hash baris unik terurut beserta jumlah
+# kemunculannya. Hanya itu yang disimpan; baris bersih tidak, karena semua grafik, filter, dan ringkasan
+# dibaca dari kubus. Menambah delta hanya menulis kubus dan hash; riwayat tidak diurai, dibersihkan,
+# atau diagregasi ulang.
+# metadata: rows (jumlah baris), columns, rows_removed, duplicates_skipped (kumulatif)
+# dan deltas (hash file delta yang sudah diterapkan).
+class IncrementalDataset:
+    def __init__(self, cube, hashes, counts, metadata):
+        self.cube = cube
+        self.hashes = hashes
+        self.counts = counts
+        self.metadata = metadata
+
+    @classmethod
+    def from_cleaned(cls, cleaned_df, rows_removed):
+        metadata = {'rows': int(cleaned_df.shape[0]), 'columns': list(cleaned_df.columns),
+                    'rows_removed': int(rows_removed), 'duplicates_skipped': 0, 'deltas': []}
+        hashes, counts = np.unique(row_hashes(cleaned_df), return_counts=True)
+        return cls(build_cube(cleaned_df), hashes, counts.astype('int64'), metadata)
+
+    # Kunci cache yang ditulis store() untuk key; dataset tersimpan menyematkannya (DatasetCache.save_ref)
+    @staticmethod
+    def cache_keys(key):
+        return [key, key + HASHES_KEY_SUFFIX]
+
+    @property
+    def row_count(self):
+        return self.metadata['rows']
+
+    def has_delta(self, delta_hash):
+        return delta_hash in self.metadata['deltas']
+
+    # Tambahkan baris delta yang sudah dibersihkan.
+    # Baris dicocokkan sebagai multiset: baris yang muncul k kali di delta dan n kali di dataset hanya
+    # ditambah max(k - n, 0) kali, sehingga periode yang dikirim ulang tidak tergandakan, sementara baris
+    # kembar yang sah (mis. dua unggahan identik di hari yang sama) tetap dihitung seperti pada unggahan penuh.
+    # Hanya sel pada hari yang disentuh delta yang dikelompokkan ulang (update_cube); indeks filter di atas
+    # kubus tetap dibangun ulang sekali per dataset baru, pada skala sel kubus, bukan baris.
+    # Mengembalikan (dataset_baru, statistik).
+    def append(self, cleaned_delta, rows_removed, delta_hash):
+        columns = self.metadata['columns']
+        if set(cleaned_delta.columns) != set(columns):
+            raise ValueError(f"Kolom file delta ({', '.join(cleaned_delta.columns)}) tidak sama dengan kolom dataset "
+                             f"({', '.join(columns)}).")
+        cleaned_delta = cleaned_delta[columns]
+
+        hashes = row_hashes(cleaned_delta)
+        occurrence = pd.Series(hashes).groupby(hashes, sort=False).cumcount().to_numpy()
+        keep = occurrence >= _existing_counts(self.hashes, self.counts, hashes)
+        added = cleaned_delta[keep]
+
+        metadata = dict(self.metadata,
+                        rows_removed=self.metadata['rows_removed'] + int(rows_removed),
+                        duplicates_skipped=self.metadata['duplicates_skipped'] + int((~keep).sum()),
+                        deltas=self.metadata['deltas'] + [delta_hash])
+        stats = {'rows_added': int(keep.sum()), 'duplicates_skipped': int((~keep).sum()), 'rows_removed': int(rows_removed)}
+        if added.empty:
+            return IncrementalDataset(self.cube, self.hashes, self.counts, metadata), stats
+
+        metadata.update(rows=self.row_count + int(keep.sum()))
+        cube = update_cube(self.cube, build_cube(added, row_offset=self.row_count))
+        return IncrementalDataset(cube, *_add_counts(self.hashes, self.counts, hashes[keep]), metadata), stats
+
+    # Tulis kubus beserta metadata dan hash di bawah key. Penggusuran ditunda (evict=False) agar entri
+    # yang baru ditulis tidak tergusur sebelum pemanggil menyematkannya lewat save_ref.
+    def store(self, cache, key):
+        return (cache.store(key, self.cube, self.metadata, evict=False)
+                and cache.store(key + HASHES_KEY_SUFFIX, pd.DataFrame({'row_hash': self.hashes, 'count': self.counts}),
+                                evict=False))
+
+    # Muat dari cache disk; None jika kubus atau hash tidak ada (mis. langkah antara yang sudah digusur)
+    @classmethod
+    def load(cls, cache, key):
+        parts = [cache.load(key), cache.load(key + HASHES_KEY_SUFFIX)]
+        if any(part is None for part in parts):
+            return None
+        (cube, metadata), (hashes, _) = parts
+        if 'count' not in hashes.columns:
+            return None
+        return cls(cube, hashes['row_hash'].to_numpy(), hashes['count'].to_numpy(), metadata)
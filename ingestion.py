@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Kolom dimensi yang dibaca langsung sebagai kategori
+CATEGORICAL_COLUMNS = ['Platform', 'Sentiment', 'Media Type', 'Location']
+
+# Ukuran chunk default (baris) saat membaca unggahan
+DEFAULT_CHUNKSIZE = 250_000
+
+# Format tanggal cadangan jika tebakan pandas gagal
+DATE_FORMAT_CANDIDATES = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%d/%m/%Y',
+    '%m/%d/%Y',
+    '%d-%m-%Y',
+    '%Y/%m/%d',
+    '%d/%m/%Y %H:%M',
+    '%m/%d/%Y %H:%M',
+]
+
+# Jumlah sampel tanggal untuk mendeteksi format
+DATE_SAMPLE_SIZE = 200
+
+# Bagian minimum sampel (bukan kosong) yang harus terurai agar sebuah format diterima;
+# sisanya dianggap nilai kotor dan menjadi NaT lewat errors='coerce'
+DATE_FORMAT_MIN_SHARE = 0.95
+
+
+# Hitung memori sebuah DataFrame (byte)
+def frame_memory(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+# Catat penggunaan memori untuk satu tahap
+def record_stage(report, stage, rows, nbytes):
+    report.append({'stage': stage, 'rows': int(rows), 'bytes': int(nbytes)})
+
+
+# Apakah format tanggal memuat zona waktu (mis. ISO 8601 dengan 'Z' atau offset '+07:00')
+def has_timezone(date_format):
+    return date_format is not None and ('%z' in date_format or '%Z' in date_format)
+
+
+# Urai tanggal dengan satu format (nilai rusak menjadi NaT). Nilai berzona waktu dinormalkan ke UTC
+# tanpa zona (naif); nilai tanpa zona tidak berubah. Format berzona waktu diurai sebagai ISO 8601
+# karena offset dapat berbeda antar baris; backend DuckDB memakai aturan yang sama (cast TIMESTAMPTZ).
+def parse_dates(values, date_format):
+    if has_timezone(date_format):
+        date_format = 'ISO8601'
+    return pd.to_datetime(values, format=date_format, errors='coerce', utc=True).dt.tz_localize(None)
+
+
+# Deteksi satu format tanggal tetap dari sampel nilai.
+# Nilai kotor di sampel tidak menggagalkan deteksi: format yang mengurai bagian terbesar sampel
+# (minimal DATE_FORMAT_MIN_SHARE) dipilih, dengan urutan kandidat sebagai pemutus seri.
+def detect_date_format(values):
+    sample = pd.Series(values).dropna().astype(str).head(DATE_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+
+    guessed = next((fmt for fmt in map(guess_datetime_format, sample.head(10)) if fmt), None)
+    candidates = ([guessed] if guessed else []) + DATE_FORMAT_CANDIDATES
+    best_format, best_share = None, DATE_FORMAT_MIN_SHARE
+    for fmt in candidates:
+        share = parse_dates(sample, fmt).notna().mean()
+        if share == 1:
+            return fmt
+        if share >= best_share and (best_format is None or share > best_share):
+            best_format, best_share = fmt, share
+    return best_format
+
+
+# Urai tanggal tanpa format dominan: per nilai dipakai format kandidat pertama yang berhasil,
+# lalu ISO 8601 (offset zona waktu dinormalkan ke UTC naif); sisanya NaT.
+# Backend DuckDB menyatakan aturan yang sama dalam SQL.
+def parse_mixed_dates(values):
+    values = pd.Series(values, dtype=object)
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for fmt in DATE_FORMAT_CANDIDATES + ['ISO8601']:
+        missing = parsed.isna() & values.notna()
+        if not missing.any():
+            break
+        parsed[missing] = parse_dates(values[missing], fmt)
+    return parsed
+
+
+# Urai kolom tanggal hanya pada nilai unik, lalu petakan kembali lewat kode
+def parse_dates_cached(values, cache):
+    codes, uniques = pd.factorize(values)
+    missing = [u for u in uniques if u not in cache]
+    if missing:
+        parsed = parse_mixed_dates(missing)
+        cache.update(zip(missing, parsed.to_numpy(dtype='datetime64[ns]')))
+    lookup = np.array([cache[u] for u in uniques] + [np.datetime64('NaT')], dtype='datetime64[ns]')
+    # Kode -1 (nilai kosong) menunjuk ke NaT di akhir tabel
+    return pd.Series(lookup[codes], index=values.index)
+
+
+# Beri tipe data pada satu chunk
+def _type_chunk(chunk, date_state):
+    if 'Date' in chunk.columns:
+        if date_state['format'] is None and not date_state['detected']:
+            date_state['format'] = detect_date_format(chunk['Date'])
+            date_state['detected'] = True
+        if date_state['format'] is not None:
+            chunk['Date'] = parse_dates(chunk['Date'], date_state['format'])
+        else:
+            chunk['Date'] = parse_dates_cached(chunk['Date'], date_state['cache'])
+
+    if 'Engagements' in chunk.columns:
+        engagements = pd.to_numeric(chunk['Engagements'], errors='coerce').fillna(0).astype('int64')
+        chunk['Engagements'] = pd.to_numeric(engagements, downcast='integer')
+
+    return chunk
+
+
+# Satukan kolom kategori dari beberapa bagian. Bagian yang kolomnya kosong seluruhnya punya kategori
+# bertipe object sementara bagian lain bertipe str (pandas 3), dan union_categoricals menolak campuran tipe;
+# jadi semua kategori disamakan dulu ke tipe kategori bagian pertama yang tidak kosong.
+def _union_categoricals(parts):
+    dtype = next((part.cat.categories.dtype for part in parts if len(part.cat.categories)), None)
+    if dtype is not None:
+        parts = [part if part.cat.categories.dtype == dtype
+                 else pd.Categorical.from_codes(part.cat.codes, categories=part.cat.categories.astype(dtype))
+                 for part in parts]
+    return pd.Series(pd.api.types.union_categoricals(parts, sort_categories=True))
+
+
+# Gabungkan chunk (atau frame dengan kolom sama) per kolom; kategori disatukan (terurut) tanpa kembali ke object
+def combine_frames(chunks):
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[col] = _union_categoricals(parts)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+# Baca unggahan CSV per chunk langsung dari byte, dengan tipe data diberikan saat membaca
+def read_csv_chunked(source, chunksize=DEFAULT_CHUNKSIZE, report=None):
+    if report is None:
+        report = []
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    dtype = {col: 'category' for col in CATEGORICAL_COLUMNS}
+    dtype['Date'] = object
+    date_state = {'format': None, 'detected': False, 'cache': {}}
+
+    chunks = []
+    peak_chunk_bytes = 0
+    reader = pd.read_csv(source, dtype=dtype, encoding='utf-8', chunksize=chunksize)
+    for chunk in reader:
+        chunk = _type_chunk(chunk, date_state)
+        peak_chunk_bytes = max(peak_chunk_bytes, frame_memory(chunk))
+        chunks.append(chunk)
+
+    if not chunks:
+        df = pd.DataFrame()
+    else:
+        df = combine_frames(chunks)
+    del chunks
+
+    record_stage(report, 'chunk_terbesar', min(chunksize, len(df)), peak_chunk_bytes)
+    record_stage(report, 'baca_bertipe', len(df), frame_memory(df))
+    return df, report
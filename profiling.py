@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+# Logger baris JSON per tahap; dapat dimatikan dengan MEDIA_DASHBOARD_PROFILE_LOG=0
+LOGGER_NAME = 'media_dashboard.profiling'
+PROFILE_LOG_ENABLED = os.environ.get('MEDIA_DASHBOARD_PROFILE_LOG', '1') != '0'
+
+# Ukur memori setiap tahap (tracemalloc) untuk semua jalannya skrip, bukan hanya saat panel diagnostik aktif
+PROFILE_MEMORY_ENABLED = os.environ.get('MEDIA_DASHBOARD_PROFILE_MEMORY', '0') == '1'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+# Pasang handler stderr sekali: setiap catatan ditulis apa adanya sebagai satu baris JSON
+def configure_logging(stream=None):
+    if logger.handlers or not PROFILE_LOG_ENABLED:
+        return logger
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+# tracemalloc hanya aktif selama ada tahap terukur yang berjalan (dari sesi mana pun), karena
+# penelusuran alokasi memperlambat semua kode. Jika tracemalloc sudah dinyalakan pihak lain
+# (mis. benchmark), ia tidak dimatikan di sini.
+# reset_peak dan get_traced_memory berlaku untuk seluruh proses, jadi tahap terukur dari sesi lain atau
+# fragmen yang berjalan bersamaan akan saling me-reset puncak. Karena itu tahap terluar yang mengukur
+# memori memegang _measure_lock sampai selesai: pengukuran memori berjalan bergantian antar sesi.
+# Kunci ini tidak boleh dipegang selama menunggu jaringan, disk, atau thread pekerja, jadi tahap seperti itu
+# dicatat tanpa memori (stage(..., memory=False)) dan tidak boleh bersarang di dalam tahap terukur.
+_measure_lock = threading.RLock()
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+# Pencatat per jalannya skrip: setiap tahap mencatat waktu dinding, puncak memori, baris
+# masuk/keluar, dan status cache, lalu dikirim sebagai baris JSON ke logger.
+# Dengan track_memory, peak_memory_bytes adalah puncak memori yang ditelusuri tracemalloc selama
+# tahap di atas nilai saat tahap mulai (termasuk tahap bersarang), bukan high-water mark RSS proses.
+# Tahap terukur dari profiler lain menunggu (_measure_lock), tetapi tracemalloc menelusuri seluruh proses,
+# jadi alokasi thread lain yang tidak mengukur (mis. sesi tanpa panel diagnostik) tetap ikut terhitung;
+# memori di luar alokator Python/NumPy (mis. buffer Arrow) tidak terlihat. Tanpa track_memory, dan untuk
+# tahap memory=False, nilainya None.
+class Profiler:
+    def __init__(self, session_id=None, run_id=None, log=PROFILE_LOG_ENABLED, track_memory=PROFILE_MEMORY_ENABLED):
+        self.session_id = session_id
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.log = log
+        self.track_memory = track_memory
+        self.records = []
+        self._open = []
+        self._open_peaks = [] # puncak tahap anak per tahap terbuka (reset_peak bersifat global)
+        self._measuring = 0 # jumlah tahap terbuka yang mengukur memori
+        self.started_at = time.perf_counter()
+        self.finished = False
+
+    # Ukur satu tahap. cache_stats (opsional) adalah fungsi yang mengembalikan dict dengan 'misses';
+    # tahap tanpa miss baru dicatat sebagai cache 'hit'. Catatan yang dihasilkan dapat diisi
+    # pemanggil (mis. rows_out) sebelum blok selesai.
+    # memory=False mencatat waktu saja (tanpa _measure_lock dan tracemalloc), untuk tahap yang sebagian
+    # besar menunggu I/O; tahap anaknya tetap dapat mengukur memori.
+    @contextmanager
+    def stage(self, name, rows_in=None, cache_stats=None, memory=True):
+        record = {'stage': name, 'depth': len(self._open), 'seconds': None, 'peak_memory_bytes': None,
+                  'rows_in': rows_in, 'rows_out': None, 'cache': None}
+        misses_before = cache_stats()['misses'] if cache_stats else None
+        measure = self.track_memory and memory
+        if measure:
+            if not self._measuring:
+                _measure_lock.acquire()
+                _acquire_tracing()
+            self._measuring += 1
+            memory_before, peak_so_far = tracemalloc.get_traced_memory()
+            self._note_peak(peak_so_far)
+            tracemalloc.reset_peak()
+        self.records.append(record) # urutan mulai, jadi tahap bersarang muncul di bawah induknya
+        self._open.append(record)
+        self._open_peaks.append(0)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - started, 6)
+            self._open.pop()
+            child_peak = self._open_peaks.pop()
+            if measure:
+                peak = max(tracemalloc.get_traced_memory()[1], child_peak)
+                record['peak_memory_bytes'] = max(peak - memory_before, 0)
+                self._note_peak(peak)
+                self._measuring -= 1
+                if not self._measuring:
+                    _release_tracing()
+                    _measure_lock.release()
+            if cache_stats and record['cache'] is None:
+                record['cache'] = 'hit' if cache_stats()['misses'] == misses_before else 'miss'
+            self.emit(record)
+
+    def _note_peak(self, peak):
+        for i, previous in enumerate(self._open_peaks):
+            self._open_peaks[i] = max(previous, peak)
+
+    # Isi status cache tahap terdalam yang sedang berjalan (mis. dari dalam fungsi ber-cache)
+    def annotate(self, **fields):
+        if self._open:
+            self._open[-1].update(fields)
+
+    def emit(self, record):
+        if self.log:
+            logger.info(json.dumps(dict(record, event='stage', run_id=self.run_id, session_id=self.session_id),
+                                   default=str))
+
+    # Tandai jalannya skrip selesai; tahap yang datang sesudahnya (mis. fragmen yang
+    # dijalankan ulang sendiri) harus memakai profiler baru
+    def finish(self):
+        self.finished = True
+
+    def total_seconds(self):
+        return round(time.perf_counter() - self.started_at, 6)
@@ -0,0 +1,403 @@
+import base64
+import html
+import json
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from aggregations import AggregationLayer, FilterState
+from data_cube import build_cube_index, cube_index
+from downsampling import AUTO_GRANULARITY, WEBGL_POINT_THRESHOLD, trend_points, trend_title
+from ingestion import frame_memory, read_csv_chunked, record_stage
+from text_format import format_markdown_bold
+
+# Palet warna kustom yang terinspirasi dari gaya HTML Anda
+CUSTOM_PLOTLY_COLORS = [
+    '#ec4899', # pink-400
+    '#a78bfa', # purple-400
+    '#f43f5e', # rose-400
+    '#C7CEEA', # light purple
+    '#FADADD', # light pink
+    '#ADD8E6', # light blue
+    '#DDA0DD', # plum
+    '#FFE4E1', # misty rose
+    '#E6E6FA', # lavender
+    '#DEB887'  # burlywood
+]
+
+# Status filter tanpa filter apa pun
+ALL_FILTERS = FilterState('All', 'All', 'All', 'All', None, None)
+
+# --- Pembersihan Data ---
+
+# Pembersihan dan Transformasi Data
+# Tidak mengubah DataFrame masukan. Mengembalikan (df_bersih, baris_dihapus, peringatan).
+def clean_data(df, drop_nan=True):
+    initial_row_count = df.shape[0]
+    warnings = []
+
+    # Konversi kolom 'Date' ke datetime, paksa kesalahan menjadi NaT (Not a Time)
+    if 'Date' in df.columns:
+        if not pd.api.types.is_datetime64_any_dtype(df['Date']):
+            df = df.assign(Date=pd.to_datetime(df['Date'], errors='coerce'))
+        # Filter baris di mana Date adalah NaT
+        invalid_dates = df['Date'].isna()
+        if invalid_dates.any():
+            df = df[~invalid_dates]
+    else:
+        warnings.append("Kolom 'Date' tidak ditemukan. Beberapa fitur mungkin tidak berfungsi dengan baik.")
+
+    # Konversi 'Engagements' ke numerik, paksa kesalahan menjadi NaN
+    if 'Engagements' in df.columns:
+        if not pd.api.types.is_integer_dtype(df['Engagements']):
+            df = df.assign(Engagements=pd.to_numeric(df['Engagements'], errors='coerce').fillna(0).astype(int))
+    else:
+        warnings.append("Kolom 'Engagements' tidak ditemukan. Metrik keterlibatan tidak akan tersedia.")
+        df = df.assign(Engagements=0) # Tambahkan default jika tidak ada
+
+    # Hapus baris dengan nilai NaN apa pun jika drop_nan benar
+    df_cleaned = df
+    if drop_nan:
+        missing_rows = df.isna().any(axis=1)
+        if missing_rows.any():
+            df_cleaned = df[~missing_rows]
+
+    rows_removed = initial_row_count - df_cleaned.shape[0]
+    return df_cleaned, rows_removed, warnings
+
+
+# Urai dan bersihkan satu CSV (path atau buffer biner)
+def load_dataset(source, drop_nan=True):
+    df, memory_report = read_csv_chunked(source)
+    cleaned_df, rows_removed, warnings = clean_data(df, drop_nan)
+    record_stage(memory_report, 'pembersihan', cleaned_df.shape[0], frame_memory(cleaned_df))
+    return cleaned_df, rows_removed, warnings, memory_report
+
+
+def build_aggregations(cleaned_df):
+    return AggregationLayer(build_cube_index(cleaned_df))
+
+
+# --- Bagian Grafik dan Wawasan ---
+# Setiap bagian adalah dict: key, title, figure (None jika tidak ada data), insights, empty_message
+
+# Judul tetap setiap bagian, per kunci bagian (judul di dalam grafik dapat berubah, mis. granularitas tren)
+SECTION_TITLES = {
+    'sentiment': 'Analisis Sentimen',
+    'trend': 'Tren Keterlibatan Seiring Waktu',
+    'platform': 'Keterlibatan per Platform',
+    'media_type': 'Kombinasi Jenis Media',
+    'location': '5 Lokasi Teratas',
+}
+
+
+def _section(key, empty_message, figure=None, insights=None):
+    return {'key': key, 'title': SECTION_TITLES[key], 'figure': figure, 'insights': insights or [],
+            'empty_message': empty_message}
+
+
+# Grafik 1: Perincian Sentimen
+def sentiment_section(aggregations, state):
+    section = _section('sentiment', 'Tidak ada data sentimen untuk ditampilkan.')
+    counts = aggregations.metric(state, 'sentiment_counts')
+    if counts is None or aggregations.metric(state, 'selection').empty:
+        return section
+
+    sentiment_counts = counts.reset_index()
+    sentiment_counts.columns = ['Sentiment', 'Count']
+    section['figure'] = px.pie(sentiment_counts, values='Count', names='Sentiment',
+                               title='Distribusi Sentimen', hole=0.3,
+                               color_discrete_sequence=CUSTOM_PLOTLY_COLORS) # Menggunakan palet kustom
+
+    # Wawasan
+    insights = section['insights']
+    if not sentiment_counts.empty:
+        dominant_sentiment = sentiment_counts.loc[sentiment_counts['Count'].idxmax()]
+        insights.append(f"Sentimen dominan adalah **{dominant_sentiment['Sentiment']}** dengan **{dominant_sentiment['Count']}** entri, menunjukkan persepsi yang umumnya {dominant_sentiment['Sentiment'].lower()}.")
+        if len(sentiment_counts) > 1:
+            least_sentiment = sentiment_counts.loc[sentiment_counts['Count'].idxmin()]
+            insights.append(f"**{least_sentiment['Sentiment']}** mewakili bagian terkecil dengan **{least_sentiment['Count']}** entri.")
+    return section
+
+
+# Grafik 2: Tren Keterlibatan Seiring Waktu
+# Grafik memakai ember hari/minggu/bulan sesuai rentang dan LTTB di atas anggaran titik,
+# sehingga ukuran payload terbatas; wawasan tetap dihitung dari total harian penuh.
+def trend_section(aggregations, state, granularity=AUTO_GRANULARITY):
+    section = _section('trend', 'Tidak ada data tren keterlibatan untuk ditampilkan.')
+    daily = aggregations.metric(state, 'daily_engagements_filled')
+    if daily is None or aggregations.metric(state, 'selection').empty:
+        return section
+
+    # Total harian dengan hari kosong bernilai 0 (setara resample('D'))
+    df_for_trend = daily.reset_index()
+    df_for_trend.columns = ['Date', 'Total Engagements']
+    df_for_trend = df_for_trend.sort_values('Date') # Pastikan data diurutkan berdasarkan tanggal
+
+    points, granularity, total_points = trend_points(daily, granularity)
+    if granularity == 'D' and len(points) == total_points:
+        df_for_chart = df_for_trend
+    else:
+        df_for_chart = points.reset_index()
+        df_for_chart.columns = ['Date', 'Total Engagements']
+    title = trend_title(granularity, len(points), total_points)
+
+    if len(df_for_chart) > WEBGL_POINT_THRESHOLD:
+        # Deret besar: trace WebGL (Scattergl) tanpa penanda; spline tidak didukung WebGL
+        section['figure'] = px.line(df_for_chart, x='Date', y='Total Engagements', title=title,
+                                    render_mode='webgl', color_discrete_sequence=[CUSTOM_PLOTLY_COLORS[0]])
+    else:
+        section['figure'] = px.line(df_for_chart, x='Date', y='Total Engagements',
+                                    title=title,
+                                    line_shape='spline', markers=True,
+                                    color_discrete_sequence=[CUSTOM_PLOTLY_COLORS[0]]) # Menggunakan warna pertama dari palet kustom
+
+    # Wawasan
+    insights = section['insights']
+    if not df_for_trend.empty:
+        peak_engagement = df_for_trend.loc[df_for_trend['Total Engagements'].idxmax()]
+        insights.append(f"Keterlibatan mencapai puncaknya sekitar **{peak_engagement['Date'].strftime('%Y-%m-%d')}** dengan **{peak_engagement['Total Engagements']}** keterlibatan.")
+
+        if len(df_for_trend) > 1:
+            overall_trend = aggregations.metric(state, 'engagement_trend')
+            insights.append(f"Tren keseluruhan menunjukkan keterlibatan yang **{overall_trend}** selama periode yang dipilih.")
+    return section
+
+
+# Grafik 3: Keterlibatan per Platform
+def platform_section(aggregations, state):
+    section = _section('platform', 'Tidak ada data keterlibatan platform untuk ditampilkan.')
+    engagements = aggregations.metric(state, 'platform_engagements')
+    if engagements is None or aggregations.metric(state, 'selection').empty:
+        return section
+
+    platform_engagements = engagements.reset_index()
+    platform_engagements.columns = ['Platform', 'Total Engagements']
+    platform_engagements = platform_engagements.sort_values('Total Engagements', ascending=True) # Untuk grafik batang horizontal
+    section['figure'] = px.bar(platform_engagements, x='Total Engagements', y='Platform',
+                               title='Total Keterlibatan per Platform', orientation='h',
+                               color_discrete_sequence=CUSTOM_PLOTLY_COLORS) # Menggunakan palet kustom
+
+    # Wawasan
+    insights = section['insights']
+    if not platform_engagements.empty:
+        top_platform = platform_engagements.loc[platform_engagements['Total Engagements'].idxmax()]
+        insights.append(f"**{top_platform['Platform']}** secara konsisten mendorong keterlibatan tertinggi dengan total **{top_platform['Total Engagements']}**.")
+        if len(platform_engagements) > 1:
+            lowest_platform = platform_engagements.loc[platform_engagements['Total Engagements'].idxmin()]
+            insights.append(f"Platform seperti **{lowest_platform['Platform']}** menunjukkan keterlibatan yang lebih rendah.")
+    return section
+
+
+# Grafik 4: Kombinasi Jenis Media
+def media_type_section(aggregations, state):
+    section = _section('media_type', 'Tidak ada data jenis media untuk ditampilkan.')
+    counts = aggregations.metric(state, 'media_type_counts')
+    if counts is None or aggregations.metric(state, 'selection').empty:
+        return section
+
+    media_type_counts = counts.reset_index()
+    media_type_counts.columns = ['Media Type', 'Count']
+    section['figure'] = px.pie(media_type_counts, values='Count', names='Media Type',
+                               title='Distribusi Jenis Media', hole=0.3,
+                               color_discrete_sequence=CUSTOM_PLOTLY_COLORS) # Menggunakan palet kustom
+
+    # Wawasan
+    insights = section['insights']
+    if not media_type_counts.empty:
+        dominant_media_type = media_type_counts.loc[media_type_counts['Count'].idxmax()]
+        insights.append(f"**{dominant_media_type['Media Type']}** adalah jenis media yang paling sering digunakan dengan **{dominant_media_type['Count']}** entri.")
+        if len(media_type_counts) > 1:
+            least_common_media = media_type_counts.loc[media_type_counts['Count'].idxmin()]
+            insights.append(f"**{least_common_media['Media Type']}** kurang umum, mungkin menjadi area untuk eksplorasi.")
+    return section
+
+
+# Grafik 5: 5 Lokasi Teratas
+def location_section(aggregations, state):
+    section = _section('location', 'Tidak ada data lokasi untuk ditampilkan.')
+    engagements = aggregations.metric(state, 'location_engagements')
+    if engagements is None or aggregations.metric(state, 'selection').empty:
+        return section
+
+    location_engagements = engagements.nlargest(5).reset_index()
+    location_engagements.columns = ['Location', 'Total Engagements']
+    location_engagements = location_engagements.sort_values('Total Engagements', ascending=True) # Untuk grafik batang horizontal
+    section['figure'] = px.bar(location_engagements, x='Total Engagements', y='Location',
+                               title='5 Lokasi Teratas berdasarkan Keterlibatan', orientation='h',
+                               color_discrete_sequence=[CUSTOM_PLOTLY_COLORS[0]]) # Menggunakan warna utama dari palet kustom
+
+    # Wawasan
+    insights = section['insights']
+    if not location_engagements.empty:
+        top_location = location_engagements.loc[location_engagements['Total Engagements'].idxmax()]
+        insights.append(f"**{top_location['Location']}** adalah area geografis utama untuk keterlibatan dengan total **{top_location['Total Engagements']}** keterlibatan.")
+    return section
+
+
+SECTION_BUILDERS = [sentiment_section, trend_section, platform_section, media_type_section, location_section]
+
+# Masukan setiap bagian selain status filter (semua bagian bergantung pada seluruh filter).
+# Menjadi bagian kunci memo, dan dasbor memakainya untuk menentukan bagian mana yang dijalankan ulang
+# saat sebuah kontrol berubah.
+SECTION_INPUTS = {
+    'sentiment_section': (),
+    'trend_section': ('granularity',),
+    'platform_section': (),
+    'media_type_section': (),
+    'location_section': (),
+}
+
+
+def section_key(builder):
+    return builder.__name__.removesuffix('_section')
+
+
+# Bangun satu bagian, dimemo per status filter di lapisan agregasi sehingga rerun dengan
+# status yang sama tidak menghitung ulang agregasi dan gambar Plotly (st.plotly_chart tetap mengirim
+# gambar ke browser pada setiap rerun). Hanya masukan yang dideklarasikan
+# bagian itu di SECTION_INPUTS yang diteruskan dan menjadi kunci memo.
+# Bagian hasil memo dibagi antar pemanggil dan tidak boleh diubah.
+def build_section(builder, aggregations, state, granularity=AUTO_GRANULARITY):
+    inputs = {'granularity': granularity}
+    options = {name: inputs[name] for name in SECTION_INPUTS[builder.__name__]}
+    return aggregations.memo(state, ('section', builder.__name__) + tuple(options.values()),
+                             lambda: builder(aggregations, state, **options))
+
+
+def build_sections(aggregations, state, granularity=AUTO_GRANULARITY):
+    return [build_section(builder, aggregations, state, granularity) for builder in SECTION_BUILDERS]
+
+
+# --- Prompt Ringkasan ---
+
+# Bangun prompt dari fakta agregat lapisan agregasi
+def build_summary_prompt(facts, persona):
+    persona_prefix = ""
+    if persona == "consultant":
+        persona_prefix = "Sebagai seorang konsultan ahli yang menyajikan laporan kepada klien penting, berikan ringkasan ini. Fokus pada rekomendasi strategis dan wawasan yang dapat ditindaklanjuti, dengan bahasa yang formal, berorientasi pada hasil, dan profesional.\n\n"
+    else:  # professional (default)
+        persona_prefix = "Sebagai seorang profesional internal, berikan ringkasan ini. Fokus pada tindakan langsung, wawasan operasional, dan bahasa yang ringkas.\n\n"
+
+    prompt = persona_prefix + f"""Berdasarkan data intelijen media dan wawasan berikut, berikan ringkasan strategi kampanye yang ringkas (tindakan dan rekomendasi utama).
+- Sentimen Dominan: {facts['dominant_sentiment']}.
+- Platform Keterlibatan Teratas: {facts['top_platform']} dengan {facts['top_platform_engagements']} keterlibatan.
+- Tren Keterlibatan Keseluruhan: {facts['overall_trend']} dari {facts['start_date']} hingga {facts['end_date']}.
+- Jenis Media yang Paling Sering Digunakan: {facts['dominant_media_type']}.
+- Lokasi Teratas untuk Keterlibatan: {facts['top_location']} dengan {facts['top_location_engagements']} keterlibatan.
+Sarankan 3-5 rekomendasi yang dapat ditindaklanjuti untuk mengoptimalkan kampanye media. Fokus pada langkah-langkah yang dapat ditindaklanjuti berdasarkan poin data ini."""
+
+    return prompt
+
+
+# --- Laporan ---
+
+# Status filter sebagai dict yang dapat diserialisasi ke JSON (tanggal sebagai teks ISO)
+def report_filters(state):
+    return {field: (str(value) if value is not None else None) for field, value in state._asdict().items()}
+
+
+# Susun dict laporan dari lapisan agregasi yang sudah jadi (dipakai run_report dan ekspor dasbor).
+# builders membatasi bagian yang disertakan, mis. hanya bagian yang sedang ditampilkan di dasbor.
+def build_report(aggregations, state, name, row_count, rows_removed, warnings=(), memory_report=(),
+                 persona='professional', granularity=AUTO_GRANULARITY, builders=SECTION_BUILDERS):
+    report = {
+        'name': name,
+        'rows': int(row_count),
+        'rows_removed': int(rows_removed),
+        'warnings': list(warnings),
+        'filters': report_filters(state),
+        'memory': list(memory_report),
+        'sections': [],
+        'summary_facts': None,
+        'summary_prompt': None,
+        'summary': None,
+    }
+    if row_count == 0:
+        return report
+
+    for builder in builders:
+        section = build_section(builder, aggregations, state, granularity)
+        figure = section['figure']
+        report['sections'].append(dict(section, figure=None if figure is None else json.loads(figure.to_json())))
+
+    if not aggregations.metric(state, 'selection').empty:
+        facts = aggregations.metric(state, 'summary_facts')
+        report['summary_facts'] = facts
+        report['summary_prompt'] = build_summary_prompt(facts, persona)
+    return report
+
+
+# Jalankan pipeline urai -> bersihkan -> filter -> agregasi -> wawasan untuk satu CSV.
+# Hasilnya dict yang dapat diserialisasi ke JSON (gambar sebagai JSON Plotly).
+# backend='duckdb' memindai file (harus berupa path) out-of-core dengan filter didorong ke pemindaian.
+def run_report(source, name=None, drop_nan=True, state=ALL_FILTERS, persona='professional', backend='pandas',
+               granularity=AUTO_GRANULARITY):
+    if backend == 'duckdb':
+        from duckdb_backend import load_cube
+        cube, row_count, rows_removed, warnings = load_cube(source, drop_nan, state)
+        memory_report = []
+        record_stage(memory_report, 'kubus_duckdb', len(cube), frame_memory(cube))
+        aggregations = AggregationLayer(cube_index(cube))
+    else:
+        cleaned_df, rows_removed, warnings, memory_report = load_dataset(source, drop_nan)
+        row_count = cleaned_df.shape[0]
+        aggregations = build_aggregations(cleaned_df) if row_count else None
+    return build_report(aggregations, state, name, row_count, rows_removed, warnings, memory_report,
+                        persona=persona, granularity=granularity)
+
+
+def report_title(report):
+    return f"Laporan Intelijen Media - {report['name']}" if report['name'] else "Laporan Intelijen Media"
+
+
+# Filter aktif laporan sebagai teks, mis. "Platform: B; Tanggal: 2024-01-01 s/d 2024-02-10".
+# None jika tidak ada filter.
+def describe_filters(filters):
+    labels = {'platform': 'Platform', 'sentiment': 'Sentiment', 'media_type': 'Jenis Media', 'location': 'Lokasi'}
+    parts = [f"{label}: {filters[field]}" for field, label in labels.items() if filters.get(field) not in (None, 'All')]
+    if filters.get('start_date') or filters.get('end_date'):
+        parts.append(f"Tanggal: {filters.get('start_date') or '-'} s/d {filters.get('end_date') or '-'}")
+    return '; '.join(parts) or None
+
+
+# Render laporan (dict dari run_report) menjadi satu halaman HTML.
+# images (dict kunci bagian -> byte PNG) menyematkan grafik sebagai gambar statis; bagian tanpa gambar
+# memakai grafik Plotly interaktif, dengan Plotly.js dimuat sekali sesuai include_plotlyjs.
+def report_to_html(report, include_plotlyjs='cdn', images=None):
+    title = html.escape(report_title(report))
+    body = [f"<h1>{title}</h1>",
+            f"<p>{report['rows']} baris ({report['rows_removed']} baris dihapus selama pembersihan awal).</p>"]
+    filters = describe_filters(report['filters'])
+    if filters:
+        body.append(f"<p>Filter: {html.escape(filters)}</p>")
+    body += [f"<p><em>{html.escape(warning)}</em></p>" for warning in report['warnings']]
+
+    if report['summary']:
+        body.append("<h2>Ringkasan Strategi Kampanye</h2>")
+        summary_html = format_markdown_bold(html.escape(report['summary'])).replace('\n', '<br>')
+        body.append(f"<div>{summary_html}</div>")
+
+    plotlyjs = include_plotlyjs
+    for section in report['sections']:
+        body.append(f"<h3>{section['title']}</h3>")
+        if section['figure'] is None:
+            body.append(f"<p>{section['empty_message']}</p>")
+        elif (images or {}).get(section['key']) is not None:
+            encoded = base64.b64encode(images[section['key']]).decode('ascii')
+            body.append(f"<img src=\"data:image/png;base64,{encoded}\" alt=\"{html.escape(section['title'])}\" "
+                        "style=\"max-width:100%\">")
+        else:
+            body.append(go.Figure(section['figure']).to_html(full_html=False, include_plotlyjs=plotlyjs))
+            plotlyjs = False # Skrip Plotly cukup dimuat sekali
+        body.append("<h4>Wawasan Utama:</h4><ul>")
+        body += [f"<li>{format_markdown_bold(html.escape(insight))}</li>" for insight in section['insights']]
+        if not section['insights']:
+            body.append(f"<li>{section['empty_message']}</li>")
+        body.append("</ul><hr>")
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title></head><body>{''.join(body)}</body></html>"
+    )
@@ -0,0 +1,194 @@
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import plotly.graph_objects as go
+
+from dataset_cache import DEFAULT_CACHE_DIR, dataset_key
+from report_engine import describe_filters, report_filters, report_title, report_to_html
+from text_format import BOLD_PATTERN
+
+try:
+    from fpdf import FPDF
+except ImportError:  # ekspor PDF membutuhkan fpdf2; HTML tetap tersedia
+    FPDF = None
+
+# Lokasi artefak ekspor dan jumlah artefak yang disimpan (yang paling lama tidak dipakai dihapus)
+DEFAULT_EXPORT_DIR = os.environ.get('MEDIA_DASHBOARD_EXPORT_DIR', os.path.join(DEFAULT_CACHE_DIR, 'exports'))
+DEFAULT_MAX_EXPORTS = int(os.environ.get('MEDIA_DASHBOARD_MAX_EXPORTS', 32))
+
+# Format ekspor -> tipe MIME
+EXPORT_FORMATS = {'html': 'text/html', 'pdf': 'application/pdf'}
+
+# Ukuran gambar grafik statis (piksel) dan faktor skala untuk layar beresolusi tinggi
+IMAGE_WIDTH = 900
+IMAGE_HEIGHT = 500
+IMAGE_SCALE = 2
+
+# Catatan pengganti grafik di PDF saat gambar statis tidak dapat dibuat
+IMAGE_UNAVAILABLE_MESSAGE = "Gambar grafik tidak tersedia (membutuhkan paket kaleido dan Chrome)."
+
+
+def available_formats():
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'pdf' or FPDF is not None]
+
+
+# Kunci artefak: dataset, status filter, format, dan semua hal lain yang mengubah isi
+# (granularitas, bagian yang ditampilkan, teks ringkasan)
+def export_key(dataset_cache_key, state, fmt, **options):
+    return dataset_key(dataset_cache_key, filters=report_filters(state), format=fmt, **options)
+
+
+# Gambar PNG statis satu grafik (JSON Plotly) lewat kaleido; None jika kaleido atau Chrome tidak tersedia
+def chart_image(figure):
+    try:
+        return go.Figure(figure).to_image(format='png', width=IMAGE_WIDTH, height=IMAGE_HEIGHT, scale=IMAGE_SCALE)
+    except (ValueError, RuntimeError):
+        return None
+
+
+def chart_images(report):
+    return {section['key']: chart_image(section['figure'])
+            for section in report['sections'] if section['figure'] is not None}
+
+
+# Font inti PDF hanya mendukung Latin-1; karakter lain diganti '?'
+def _pdf_text(text):
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+
+# Render laporan menjadi PDF: judul, filter, ringkasan, lalu setiap bagian (gambar statis dan wawasan)
+def report_to_pdf(report, images):
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+
+    # Dengan bold, hanya '**teks**' yang ditafsirkan (seperti format_markdown_bold di HTML). Markdown fpdf
+    # tidak dipakai karena ia juga mengubah '--', '__', '~~' dan tautan dalam teks LLM menjadi gaya lain.
+    def paragraph(text, size=10, style='', bold=False, height=5):
+        if not bold:
+            pdf.set_font('helvetica', style, size)
+            pdf.multi_cell(0, height, _pdf_text(text), new_x='LMARGIN', new_y='NEXT')
+            return
+        # split dengan grup tangkapan: bagian ganjil adalah isi penanda tebal
+        for i, part in enumerate(BOLD_PATTERN.split(_pdf_text(text))):
+            pdf.set_font('helvetica', 'B' if i % 2 else style, size)
+            pdf.write(height, part)
+        pdf.ln(height)
+
+    paragraph(report_title(report), size=16, style='B', height=8)
+    paragraph(f"{report['rows']} baris ({report['rows_removed']} baris dihapus selama pembersihan awal).")
+    filters = describe_filters(report['filters'])
+    if filters:
+        paragraph(f"Filter: {filters}")
+    for warning in report['warnings']:
+        paragraph(warning, style='I')
+
+    if report['summary']:
+        pdf.ln(3)
+        paragraph("Ringkasan Strategi Kampanye", size=13, style='B', height=7)
+        paragraph(report['summary'], bold=True)
+
+    for section in report['sections']:
+        pdf.ln(3)
+        paragraph(section['title'], size=13, style='B', height=7)
+        if section['figure'] is None:
+            paragraph(section['empty_message'])
+        elif images.get(section['key']) is not None:
+            pdf.image(io.BytesIO(images[section['key']]), w=pdf.epw)
+        else:
+            paragraph(IMAGE_UNAVAILABLE_MESSAGE, style='I')
+        paragraph("Wawasan Utama:", style='B')
+        for insight in section['insights'] or [section['empty_message']]:
+            paragraph(f"- {insight}", bold=True)
+    return bytes(pdf.output())
+
+
+# HTML memakai gambar statis bila tersedia; grafik yang gambarnya gagal dibuat disematkan sebagai Plotly
+# interaktif dengan Plotly.js di dalam file, sehingga file tetap berdiri sendiri. PDF hanya bisa memuat gambar.
+def render_export(report, fmt):
+    images = chart_images(report)
+    if fmt == 'pdf':
+        return report_to_pdf(report, images)
+    return report_to_html(report, include_plotlyjs=True, images=images).encode('utf-8')
+
+
+# Pekerja ekspor di thread latar. Artefak ditulis ke disk per kunci, jadi status filter yang sama
+# (dari sesi mana pun) memakai ulang file yang sudah ada, dan permintaan untuk kunci yang sedang
+# dikerjakan mendapat Future yang sama.
+class ExportWorker:
+    def __init__(self, directory=DEFAULT_EXPORT_DIR, max_exports=DEFAULT_MAX_EXPORTS, max_workers=1):
+        self.directory = directory
+        self.max_exports = max_exports
+        os.makedirs(self.directory, exist_ok=True)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+
+    def path(self, key, fmt):
+        return os.path.join(self.directory, f"{key}.{fmt}")
+
+    # Path artefak yang sudah jadi, atau None
+    def finished(self, key, fmt):
+        path = self.path(key, fmt)
+        try:
+            os.utime(path) # tandai baru dipakai untuk urutan LRU
+        except FileNotFoundError:
+            return None
+        return path
+
+    # Mulai ekspor; kembalikan Future berisi path artefak
+    def submit(self, key, fmt, report):
+        with self._lock:
+            future = self._jobs.get((key, fmt))
+            if future is not None:
+                return future
+            path = self.finished(key, fmt)
+            if path is not None:
+                future = Future()
+                future.set_result(path)
+                return future
+            future = self._executor.submit(self._render, key, fmt, report)
+            self._jobs[(key, fmt)] = future
+        future.add_done_callback(lambda _: self._forget(key, fmt))
+        return future
+
+    def _forget(self, key, fmt):
+        with self._lock:
+            self._jobs.pop((key, fmt), None)
+
+    def _render(self, key, fmt, report):
+        content = render_export(report, fmt)
+        # Tulis ke file sementara lalu ganti secara atomik
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, self.path(key, fmt))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+        return self.path(key, fmt)
+
+    # Hapus artefak yang paling lama tidak dipakai di atas batas jumlah
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.tmp'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                continue
+        for _, path in sorted(entries)[:max(len(entries) - self.max_exports, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self._executor.shutdown(wait=False)
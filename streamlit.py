@@ -1,9 +1,27 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import requests
 import json
-from io import StringIO
+import os
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from aggregations import AggregationLayer, FilterState
+from data_cube import cube_index
+from downsampling import AUTO_GRANULARITY, GRANULARITY_OPTIONS, granularity_label
+from dataset_cache import DatasetCache, dataset_key, hash_upload
+from duckdb_backend import OUT_OF_CORE_THRESHOLD, available as duckdb_available, load_cube
+from incremental import IncrementalDataset
+from ingestion import frame_memory, read_csv_chunked, record_stage
+from profiling import PROFILE_MEMORY_ENABLED, Profiler, configure_logging
+from report_engine import (SECTION_BUILDERS, SECTION_INPUTS, SECTION_TITLES, build_aggregations, build_report,
+                           build_section, build_summary_prompt, clean_data, section_key)
+from report_export import EXPORT_FORMATS, ExportWorker, available_formats, export_key
+from summary_client import SummaryClient, SummaryStream
+from text_format import IncrementalBoldFormatter, format_markdown_bold
 
 # Kunci API untuk Gemini (ganti dengan kunci API Anda yang sebenarnya)
 # Dalam aplikasi nyata, ini harus ditangani dengan aman, mis. rahasia Streamlit
@@ -16,169 +34,493 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Palet warna kustom yang terinspirasi dari gaya HTML Anda
-CUSTOM_PLOTLY_COLORS = [
-    '#ec4899', # pink-400
-    '#a78bfa', # purple-400
-    '#f43f5e', # rose-400
-    '#C7CEEA', # light purple
-    '#FADADD', # light pink
-    '#ADD8E6', # light blue
-    '#DDA0DD', # plum
-    '#FFE4E1', # misty rose
-    '#E6E6FA', # lavender
-    '#DEB887'  # burlywood
-]
+# Log waktu per tahap sebagai baris JSON (stderr), untuk diagregasi lintas sesi
+configure_logging()
 
 # --- Fungsi Pembantu ---
 
 # Fungsi untuk mengurai data CSV
-@st.cache_data
-def parse_csv(data):
-    # Gunakan StringIO untuk memperlakukan string sebagai file
-    df = pd.read_csv(StringIO(data))
-    return df
-
-# Pembersihan dan Transformasi Data
-@st.cache_data
-def clean_and_process_data(df, drop_nan=True):
-    initial_row_count = df.shape[0]
-
-    # Konversi kolom 'Date' ke datetime, paksa kesalahan menjadi NaT (Not a Time)
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        # Filter baris di mana Date adalah NaT
-        df = df.dropna(subset=['Date'])
-    else:
-        st.warning("Kolom 'Date' tidak ditemukan. Beberapa fitur mungkin tidak berfungsi dengan baik.")
-
-    # Konversi 'Engagements' ke numerik, paksa kesalahan menjadi NaN
-    if 'Engagements' in df.columns:
-        df['Engagements'] = pd.to_numeric(df['Engagements'], errors='coerce').fillna(0).astype(int)
-    else:
-        st.warning("Kolom 'Engagements' tidak ditemukan. Metrik keterlibatan tidak akan tersedia.")
-        df['Engagements'] = 0 # Tambahkan default jika tidak ada
-
-    # Hapus baris dengan nilai NaN apa pun jika drop_nan benar
-    if drop_nan:
-        df_cleaned = df.dropna()
-    else:
-        df_cleaned = df
+# Unggahan dibaca per chunk langsung dari byte (tanpa decode seluruh teks) dan diberi tipe saat dibaca
+def parse_csv(source):
+    df, memory_report = read_csv_chunked(source)
+    return df, memory_report
 
-    rows_removed = initial_row_count - df_cleaned.shape[0]
+# Pembersihan dan Transformasi Data (logika ada di report_engine; peringatan ditampilkan di sini)
+def clean_and_process_data(df, drop_nan=True):
+    df_cleaned, rows_removed, warnings = clean_data(df, drop_nan)
+    for warning in warnings:
+        st.warning(warning)
     return df_cleaned, rows_removed
 
-# Fungsi untuk mengonversi tebal seperti Markdown (**teks**) menjadi kuat HTML (<strong>teks</strong>)
-def format_markdown_bold(text):
-    import re
-    return re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
-
-# --- Integrasi LLM untuk Ringkasan Kampanye ---
-def generate_summary(filtered_data, persona):
-    if filtered_data.empty:
-        return "Tidak ada data yang difilter untuk membuat ringkasan."
-
-    # Siapkan data agregat untuk prompt LLM
-    sentiment_counts = filtered_data['Sentiment'].value_counts().to_dict() if 'Sentiment' in filtered_data.columns else {}
-    dominant_sentiment = max(sentiment_counts, key=sentiment_counts.get) if sentiment_counts else 'N/A'
-
-    platform_engagements = filtered_data.groupby('Platform')['Engagements'].sum().sort_values(ascending=False).to_dict() if 'Platform' in filtered_data.columns and 'Engagements' in filtered_data.columns else {}
-    top_platform = next(iter(platform_engagements)) if platform_engagements else 'N/A'
-    top_platform_engagements = platform_engagements.get(top_platform, 0)
-
-    overall_trend = 'stabil'
-    if 'Date' in filtered_data.columns and 'Engagements' in filtered_data.columns:
-        engagement_trend_data = filtered_data.groupby(filtered_data['Date'].dt.date)['Engagements'].sum().sort_index()
-        if len(engagement_trend_data) > 1:
-            first_engagement = engagement_trend_data.iloc[0]
-            last_engagement = engagement_trend_data.iloc[-1]
-            if last_engagement > first_engagement * 1.1:
-                overall_trend = 'meningkat'
-            elif last_engagement < first_engagement * 0.9:
-                overall_trend = 'menurun'
-        start_date_llm = engagement_trend_data.index.min().strftime('%Y-%m-%d') if not engagement_trend_data.empty else 'N/A'
-        end_date_llm = engagement_trend_data.index.max().strftime('%Y-%m-%d') if not engagement_trend_data.empty else 'N/A'
+# Cache dataset bersih di disk (Arrow IPC), dibagi oleh semua sesi
+@st.cache_resource
+def get_dataset_cache():
+    return DatasetCache()
+
+# Hash isi unggahan sekali per file, lalu simpan di sesi agar rerun tidak meng-hash ulang
+def upload_content_hash(uploaded_file):
+    upload_hashes = st.session_state.setdefault('upload_hashes', {})
+    profiler.annotate(cache='hit' if uploaded_file.file_id in upload_hashes else 'miss')
+    if uploaded_file.file_id not in upload_hashes:
+        upload_hashes[uploaded_file.file_id] = hash_upload(uploaded_file)
+    return upload_hashes[uploaded_file.file_id]
+
+# Fungsi untuk memuat dataset bersih: dari cache disk jika sudah dikenal, jika tidak urai dan bersihkan.
+# cache_resource hanya meng-hash kunci string (bukan DataFrame) dan mengembalikan objek yang sama;
+# DataFrame hasilnya tidak boleh diubah.
+# Badan fungsi hanya berjalan saat cache memori meleset, jadi status cache tahap dicatat di sini.
+@st.cache_resource(max_entries=4)
+def load_dataset(_source, key, drop_nan):
+    cache = get_dataset_cache()
+    cached = cache.load(key)
+    if cached is not None:
+        profiler.annotate(cache='disk')
+        cleaned_df, metadata = cached
+        memory_report = []
+        record_stage(memory_report, 'cache_disk', cleaned_df.shape[0], frame_memory(cleaned_df))
+        return cleaned_df, metadata['rows_removed'], memory_report
+
+    profiler.annotate(cache='miss')
+    with profiler.stage('parse_csv') as stage:
+        original_df, memory_report = parse_csv(_source)
+        stage['rows_out'] = original_df.shape[0]
+    with profiler.stage('clean_and_process_data', rows_in=original_df.shape[0]) as stage:
+        cleaned_df, rows_removed = clean_and_process_data(original_df, drop_nan)
+        stage['rows_out'] = cleaned_df.shape[0]
+    record_stage(memory_report, 'pembersihan', cleaned_df.shape[0], frame_memory(cleaned_df))
+    with profiler.stage('store_disk_cache', rows_in=cleaned_df.shape[0], memory=False):
+        cache.store(key, cleaned_df, {'rows_removed': int(rows_removed)})
+    return cleaned_df, rows_removed, memory_report
+
+# Unggahan besar diproses out-of-core: file di-spool ke disk lalu DuckDB memindainya dan
+# langsung menghasilkan kubus agregat, sehingga baris mentah tidak pernah dimuat ke pandas.
+# Kubus disimpan di cache disk seperti dataset bersih. Mengembalikan (kubus, jumlah_baris, baris_dihapus, laporan_memori).
+@st.cache_resource(max_entries=4)
+def load_dataset_cube(_source, key, drop_nan):
+    cache = get_dataset_cache()
+    cached = cache.load(key)
+    if cached is not None:
+        profiler.annotate(cache='disk')
+        cube, metadata = cached
+        memory_report = []
+        record_stage(memory_report, 'cache_disk', cube.shape[0], frame_memory(cube))
+        return cube, metadata['rows'], metadata['rows_removed'], memory_report
+
+    profiler.annotate(cache='miss')
+    with profiler.stage('spool_upload', memory=False):
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as spool:
+            _source.seek(0)
+            shutil.copyfileobj(_source, spool)
+    try:
+        with profiler.stage('duckdb_cube', memory=False) as stage:
+            cube, row_count, rows_removed, warnings = load_cube(spool.name, drop_nan)
+            stage['rows_out'] = cube.shape[0]
+    finally:
+        os.remove(spool.name)
+    for warning in warnings:
+        st.warning(warning)
+    memory_report = []
+    record_stage(memory_report, 'kubus_duckdb', cube.shape[0], frame_memory(cube))
+    cache.store(key, cube, {'rows': int(row_count), 'rows_removed': int(rows_removed)})
+    return cube, row_count, rows_removed, memory_report
+
+# Dataset tersimpan (hasil mode tambah harian): kubus dan hash baris dari cache disk (baris tidak dibaca)
+@st.cache_resource(max_entries=4)
+def load_saved_dataset(key):
+    profiler.annotate(cache='disk')
+    return IncrementalDataset.load(get_dataset_cache(), key)
+
+# Mode tambah harian: hanya file delta yang diurai, dibersihkan, dideduplikasi, dan digabung ke dataset.
+# _base adalah IncrementalDataset (dataset tersimpan) atau DataFrame bersih unggahan penuh.
+# Setiap langkah disimpan di cache disk dengan kunci berantai, dan nama dataset diarahkan ke kunci terakhir
+# (entrinya disematkan, tidak digusur) sehingga besok dataset dapat dibuka lagi tanpa mengunggah riwayat.
+# Delta yang sudah diterapkan dilewati.
+@st.cache_resource(max_entries=4)
+def append_deltas(_base, _delta_files, name, base_key, base_rows_removed, delta_hashes, drop_nan):
+    profiler.annotate(cache='miss')
+    cache = get_dataset_cache()
+    if isinstance(_base, IncrementalDataset):
+        dataset = _base
     else:
-        start_date_llm = 'N/A'
-        end_date_llm = 'N/A'
-
+        with profiler.stage('index_base_rows', rows_in=_base.shape[0]):
+            dataset = IncrementalDataset.from_cleaned(_base, base_rows_removed)
+
+    key = base_key
+    totals = {'files': 0, 'rows_added': 0, 'duplicates_skipped': 0, 'rows_removed': 0}
+    for delta_file, delta_hash in zip(_delta_files, delta_hashes):
+        if dataset.has_delta(delta_hash):
+            continue
+        next_key = dataset_key(key, append=delta_hash, drop_nan=drop_nan)
+        stored = IncrementalDataset.load(cache, next_key)
+        if stored is not None:
+            dataset, key = stored, next_key
+            continue
+
+        with profiler.stage('parse_csv') as stage:
+            delta_df, _ = parse_csv(delta_file)
+            stage['rows_out'] = delta_df.shape[0]
+        with profiler.stage('clean_and_process_data', rows_in=delta_df.shape[0]) as stage:
+            cleaned_delta, rows_removed = clean_and_process_data(delta_df, drop_nan)
+            stage['rows_out'] = cleaned_delta.shape[0]
+        with profiler.stage('merge_delta', rows_in=cleaned_delta.shape[0]) as stage:
+            dataset, step = dataset.append(cleaned_delta, rows_removed, delta_hash)
+            stage['rows_out'] = step['rows_added']
+        with profiler.stage('store_disk_cache', rows_in=step['rows_added'], memory=False):
+            dataset.store(cache, next_key)
+        key = next_key
+        totals['files'] += 1
+        for field in ('rows_added', 'duplicates_skipped', 'rows_removed'):
+            totals[field] += step[field]
+
+    if key != base_key:
+        cache.save_ref(name, key, pins=IncrementalDataset.cache_keys(key), drop_nan=drop_nan, rows=dataset.row_count)
+    return dataset, key, totals
+
+# Lapisan agregasi di atas kubus agregat per dataset; dikunci oleh kunci dataset sehingga DataFrame tidak di-hash.
+# Semua grafik, wawasan, dan ringkasan membaca metrik dari lapisan ini.
+@st.cache_resource(max_entries=4)
+def get_aggregations(_df, key, is_cube=False):
+    profiler.annotate(cache='miss')
+    if is_cube:
+        return AggregationLayer(cube_index(_df))
+    return build_aggregations(_df)
 
-    media_type_counts = filtered_data['Media Type'].value_counts().to_dict() if 'Media Type' in filtered_data.columns else {}
-    dominant_media_type = max(media_type_counts, key=media_type_counts.get) if media_type_counts else 'N/A'
-
-    location_engagements = filtered_data.groupby('Location')['Engagements'].sum().sort_values(ascending=False).to_dict() if 'Location' in filtered_data.columns and 'Engagements' in filtered_data.columns else {}
-    top_location = next(iter(location_engagements)) if location_engagements else 'N/A'
-    top_location_engagements = location_engagements.get(top_location, 0)
+# --- Integrasi LLM untuk Ringkasan Kampanye ---
 
-    persona_prefix = ""
-    if persona == "consultant":
-        persona_prefix = "Sebagai seorang konsultan ahli yang menyajikan laporan kepada klien penting, berikan ringkasan ini. Fokus pada rekomendasi strategis dan wawasan yang dapat ditindaklanjuti, dengan bahasa yang formal, berorientasi pada hasil, dan profesional.\n\n"
-    else:  # professional (default)
-        persona_prefix = "Sebagai seorang profesional internal, berikan ringkasan ini. Fokus pada tindakan langsung, wawasan operasional, dan bahasa yang ringkas.\n\n"
+# Klien ringkasan bersama (pool koneksi dan cache respons dibagi antar sesi)
+@st.cache_resource
+def get_summary_client():
+    return SummaryClient(API_KEY)
+
+# Ringkasan yang sudah ada di cache klien untuk status filter dan perspektif ini (tanpa memanggil API)
+def cached_summary(aggregations, state, persona):
+    if aggregations.metric(state, 'selection').empty:
+        return None
+    client = get_summary_client()
+    return client.cached(client.cache_key(persona, aggregations.metric(state, 'summary_facts')))
+
+# Mulai pembuatan ringkasan di thread latar. Mengembalikan Future berisi teks ringkasan,
+# atau SummaryStream berisi potongan teks jika streaming diaktifkan.
+def start_summary(aggregations, state, persona, streaming=False):
+    if aggregations.metric(state, 'selection').empty:
+        future = Future()
+        future.set_result("Tidak ada data yang difilter untuk membuat ringkasan.")
+        return future
+
+    facts = aggregations.metric(state, 'summary_facts')
+    prompt = build_summary_prompt(facts, persona)
+    client = get_summary_client()
+    profiler.annotate(cache='hit' if client.cached(client.cache_key(persona, facts)) is not None else 'miss')
+    if streaming:
+        return client.submit_stream(prompt, persona, facts)
+    return client.submit(prompt, persona, facts)
+
+# Tampilkan kesalahan pemanggilan Gemini dan kembalikan teks penggantinya
+def summary_error_text(e):
+    if isinstance(e, json.JSONDecodeError):
+        st.error(f"Error mengurai respons JSON dari Gemini API: {e}")
+        return f'Error mengurai respons Gemini API: {e}'
+    st.error(f"Error memanggil Gemini API: {e}")
+    return f'Error membuat ringkasan: {e}'
 
-    prompt = persona_prefix + f"""Berdasarkan data intelijen media dan wawasan berikut, berikan ringkasan strategi kampanye yang ringkas (tindakan dan rekomendasi utama).
-- Sentimen Dominan: {dominant_sentiment}.
-- Platform Keterlibatan Teratas: {top_platform} dengan {top_platform_engagements} keterlibatan.
-- Tren Keterlibatan Keseluruhan: {overall_trend} dari {start_date_llm} hingga {end_date_llm}.
-- Jenis Media yang Paling Sering Digunakan: {dominant_media_type}.
-- Lokasi Teratas untuk Keterlibatan: {top_location} dengan {top_location_engagements} keterlibatan.
-Sarankan 3-5 rekomendasi yang dapat ditindaklanjuti untuk mengoptimalkan kampanye media. Fokus pada langkah-langkah yang dapat ditindaklanjuti berdasarkan poin data ini."""
+# Tunggu hasil ringkasan; kesalahan ditampilkan dan dikembalikan sebagai teks
+def resolve_summary(future):
+    try:
+        return future.result()
+    except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+        return summary_error_text(e)
+
+# Render ringkasan streaming secara bertahap; tebal dikonversi aman di batas potongan
+def render_summary_stream(summary_stream):
+    output = st.empty()
+    formatter = IncrementalBoldFormatter()
+    try:
+        for chunk in summary_stream:
+            output.markdown(formatter.feed(chunk), unsafe_allow_html=True)
+    except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+        output.markdown(format_markdown_bold(summary_error_text(e)), unsafe_allow_html=True)
+        return
+    output.markdown(formatter.finish(), unsafe_allow_html=True)
+    if summary_stream.time_to_first_text is not None:
+        st.caption(f"Teks pertama muncul dalam {summary_stream.time_to_first_text:.2f} detik.")
+
+# Render satu bagian grafik beserta wawasannya
+def render_section(section):
+    st.markdown(f"### {section['title']}")
+    if section['figure'] is not None:
+        st.plotly_chart(section['figure'], use_container_width=True)
+    else:
+        st.markdown(section['empty_message'])
+    st.markdown("#### Wawasan Utama:")
+    for insight in section['insights']:
+        st.markdown(f"- {format_markdown_bold(insight)}", unsafe_allow_html=True)
+    if not section['insights']:
+        st.markdown(f"- {section['empty_message']}")
+    st.markdown("---")
+
+# --- Ekspor Laporan ---
+
+# Selang pemeriksaan status ekspor yang sedang berjalan (detik)
+EXPORT_POLL_SECONDS = 1.0
+
+# Pekerja ekspor bersama: artefak di disk dipakai ulang oleh semua sesi untuk status yang sama
+@st.cache_resource
+def get_export_worker():
+    return ExportWorker()
+
+# Ekspor tampilan saat ini (filter, granularitas tren, bagian yang ditampilkan, ringkasan yang sudah
+# ada di cache) ke HTML/PDF mandiri. File dibuat di thread latar; selama menunggu, hanya fragmen ini
+# yang dijalankan ulang berkala (run_every), dan rerun penuh dipicu sekali saat pekerjaan dimulai dan selesai.
+def export_panel(aggregations, filter_state, dataset_name, dataset_cache_key, row_count, rows_removed, polling):
+    export_format = st.radio("Format ekspor", available_formats(), format_func=str.upper, horizontal=True)
+    persona = st.session_state.get('summary_persona', 'professional')
+    granularity = st.session_state.get('trend_granularity', AUTO_GRANULARITY)
+    builders = [builder for builder in SECTION_BUILDERS if st.session_state.get(f"show_{section_key(builder)}", True)]
+    summary = cached_summary(aggregations, filter_state, persona)
+    key = export_key(dataset_cache_key, filter_state, export_format, granularity=granularity, summary=summary,
+                     sections=[builder.__name__ for builder in builders])
+
+    worker = get_export_worker()
+    exports = st.session_state.setdefault('exports', {}) # kunci -> Future yang sedang berjalan atau gagal
+    if polling and all(future.done() for future in exports.values()):
+        st.rerun() # semua pekerjaan selesai: rerun penuh menghentikan pemeriksaan berkala
+
+    future = exports.get(key)
+    if future is not None and not future.done():
+        st.info("Membuat file ekspor di latar belakang...")
+        return
+    if future is not None:
+        del exports[key]
+        try:
+            future.result()
+        except Exception as e:
+            st.error(f"Ekspor gagal: {e}")
+
+    path = worker.finished(key, export_format)
+    if path is None:
+        if not st.button("Buat File Ekspor"):
+            st.caption("Grafik disertakan sebagai gambar statis (di HTML, grafik interaktif bila gambar tidak dapat dibuat), "
+                       "beserta wawasan dan ringkasan yang sudah dibuat.")
+            return
+        with fragment_profiling(), profiler.stage('export_request', rows_in=row_count, memory=False):
+            report = build_report(aggregations, filter_state, dataset_name, row_count, rows_removed, persona=persona,
+                                  granularity=granularity, builders=builders)
+            report['summary'] = summary
+            exports[key] = worker.submit(key, export_format, report)
+        st.rerun() # rerun penuh agar fragmen ini mulai memeriksa status
+
+    with open(path, 'rb') as f:
+        st.download_button(f"Unduh {export_format.upper()}", f.read(),
+                           file_name=f"{os.path.splitext(dataset_name)[0]}-laporan.{export_format}",
+                           mime=EXPORT_FORMATS[export_format], on_click='ignore')
+
+# Panel diagnostik: catatan tahap jalannya skrip ini (tahap bersarang diindentasi)
+def render_diagnostics(panel, profiler):
+    with panel.expander("Diagnostik Kinerja", expanded=True):
+        st.caption(f"Jalannya {profiler.run_id}: {profiler.total_seconds():.3f} detik")
+        if profiler.track_memory:
+            st.caption("Memori puncak diukur dengan tracemalloc untuk seluruh proses: tahap terukur berjalan "
+                       "bergantian antar sesi, tetapi alokasi thread lain selama tahap ikut terhitung (perkiraan).")
+        records = pd.DataFrame(profiler.records)
+        if records.empty:
+            return
+        records['stage'] = ['\u00a0\u00a0' * depth + stage for depth, stage in zip(records['depth'], records['stage'])]
+        records['memori_puncak_MB'] = (records['peak_memory_bytes'].astype('float64') / 2**20).round(2)
+        st.dataframe(records[['stage', 'seconds', 'memori_puncak_MB', 'rows_in', 'rows_out', 'cache']], hide_index=True)
+
+# --- Fragmen: bagian yang dapat dijalankan ulang sendiri ---
+
+# Fragmen yang dijalankan ulang sendiri berjalan setelah jalannya skrip penuh selesai;
+# tahapnya dicatat dengan profiler baru agar log JSON tidak menempel ke run_id lama
+@contextmanager
+def fragment_profiling():
+    global profiler
+    if not profiler.finished:
+        yield
+        return
+    profiler = Profiler(session_id=profiler.session_id, track_memory=profiler.track_memory)
+    try:
+        yield
+    finally:
+        profiler.finish()
+
+# Ringkasan strategi sebagai fragmen: memilih perspektif, mode streaming, atau menekan tombol
+# hanya menjalankan ulang fragmen ini, bukan kelima grafik di bawahnya.
+# Status filter datang sebagai argumen, jadi perubahan filter tetap lewat rerun penuh.
+@st.fragment
+def summary_fragment(aggregations, filter_state):
+    with fragment_profiling():
+        summary_persona = st.selectbox(
+            "Pilih Perspektif Ringkasan:",
+            ["professional", "consultant"],
+            format_func=lambda x: "Generate Gemini AI Analysis" if x == "professional" else "Generate with OpenRouter AI",
+            key='summary_persona'
+        )
 
-    headers = {'Content-Type': 'application/json'}
-    payload = {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
-    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={API_KEY}"
+        stream_summary = st.checkbox("Tampilkan ringkasan secara bertahap (streaming)", value=True)
+
+        summary_placeholder = st.empty()
+        if not st.button("Buat Ringkasan Strategi"):
+            summary_placeholder.write("Klik 'Buat Ringkasan Strategi' untuk mendapatkan rekomendasi kampanye berdasarkan data yang difilter.")
+            return
+
+        # Ringkasan diminta di thread latar; grafik tidak dijalankan ulang selama menunggu
+        with profiler.stage('summary_request', memory=False):
+            summary_future = start_summary(aggregations, filter_state, summary_persona, streaming=stream_summary)
+        summary_placeholder.info("Membuat ringkasan...")
+        with summary_placeholder.container(), profiler.stage('summary', memory=False):
+            if isinstance(summary_future, SummaryStream):
+                render_summary_stream(summary_future)
+            else:
+                summary_text = resolve_summary(summary_future)
+                # Gunakan st.markdown dengan unsafe_allow_html=True untuk merender tag kuat HTML
+                st.markdown(format_markdown_bold(summary_text), unsafe_allow_html=True)
 
-    try:
-        response = requests.post(api_url, headers=headers, data=json.dumps(payload))
-        response.raise_for_status() # Menimbulkan pengecualian untuk kesalahan HTTP
-        result = response.json()
-        if result and 'candidates' in result and len(result['candidates']) > 0 and \
-           'content' in result['candidates'][0] and 'parts' in result['candidates'][0]['content'] and \
-           len(result['candidates'][0]['content']['parts']) > 0:
-            text = result['candidates'][0]['content']['parts'][0]['text']
-            return text
-        else:
-            return 'Gagal membuat ringkasan. Struktur respons Gemini API tidak terduga.'
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error memanggil Gemini API: {e}")
-        return f'Error membuat ringkasan: {e}'
-    except json.JSONDecodeError as e:
-        st.error(f"Error mengurai respons JSON dari Gemini API: {e}")
-        return f'Error mengurai respons Gemini API: {e}'
+# Satu bagian grafik sebagai fragmen. Bagian bergantung pada status filter (argumen) dan pada
+# masukan yang dideklarasikannya di SECTION_INPUTS; kontrol untuk masukan itu ada di dalam fragmen,
+# jadi mengubahnya hanya membangun ulang bagian ini. Bagian yang disembunyikan tidak dibangun sama sekali.
+# Pembangunan (agregasi + gambar Plotly) dan render (serialisasi st.plotly_chart) diukur terpisah.
+@st.fragment
+def section_fragment(builder, aggregations, filter_state):
+    with fragment_profiling():
+        key = section_key(builder)
+        if not st.toggle(f"Tampilkan {SECTION_TITLES[key]}", value=True, key=f"show_{key}"):
+            return
+
+        inputs = {}
+        if 'granularity' in SECTION_INPUTS[builder.__name__]:
+            # Granularitas grafik tren; otomatis memilih hari/minggu/bulan dari rentang yang dipilih
+            inputs['granularity'] = st.selectbox("Granularitas Tren", GRANULARITY_OPTIONS,
+                                                 index=GRANULARITY_OPTIONS.index(AUTO_GRANULARITY),
+                                                 format_func=granularity_label, key=f"{key}_granularity")
+        with profiler.stage(builder.__name__, cache_stats=aggregations.stats):
+            section = build_section(builder, aggregations, filter_state, **inputs)
+        with profiler.stage(f"render_{key}"):
+            render_section(section)
 
 # --- Tata Letak Dasbor ---
 
 st.title("Dashboard Intelijen Media Interaktif")
 
+# Profil kinerja jalannya skrip ini: setiap tahap dicatat ke log JSON dan panel diagnostik.
+# Memori per tahap (tracemalloc, memperlambat eksekusi) hanya diukur saat panel diagnostik aktif.
+profiler = Profiler(session_id=st.session_state.setdefault('session_id', uuid.uuid4().hex[:12]),
+                    track_memory=PROFILE_MEMORY_ENABLED or st.session_state.get('show_diagnostics', False))
+
 # Bagian Unggah File
 uploaded_file = st.file_uploader("Unggah File CSV Anda", type=["csv"],
                                  help="Pastikan memiliki kolom untuk 'Date', 'Engagements', 'Sentiment', 'Platform', 'Media Type', dan 'Location'.")
 
-if uploaded_file is not None:
-    # Baca CSV
-    csv_text = uploaded_file.getvalue().decode("utf-8")
-    original_df = parse_csv(csv_text)
+# Dataset tersimpan dari mode tambah harian dapat dilanjutkan tanpa mengunggah ulang riwayatnya
+saved_datasets = get_dataset_cache().refs()
+saved_name = None
+if uploaded_file is None and saved_datasets:
+    saved_name = st.selectbox("Atau lanjutkan dataset tersimpan:", [None] + sorted(saved_datasets),
+                              format_func=lambda name: "-" if name is None else name)
 
-    # Opsi Pembersihan Data
+if uploaded_file is not None or saved_name is not None:
+    # Opsi Pembersihan Data (dataset tersimpan memakai opsi saat pertama dibuat)
     st.sidebar.header("Pembersihan Data")
-    drop_nan = st.sidebar.checkbox("Hapus baris dengan nilai yang hilang (NaN)", value=True)
-    
-    cleaned_df, rows_removed = clean_and_process_data(original_df.copy(), drop_nan)
+    if saved_name is not None:
+        drop_nan = st.sidebar.checkbox("Hapus baris dengan nilai yang hilang (NaN)",
+                                       value=saved_datasets[saved_name]['drop_nan'], disabled=True)
+    else:
+        drop_nan = st.sidebar.checkbox("Hapus baris dengan nilai yang hilang (NaN)", value=True)
+
+    # Diagnostik kinerja (diisi di akhir jalannya skrip)
+    show_diagnostics = st.sidebar.checkbox("Tampilkan diagnostik kinerja", value=False, key='show_diagnostics')
+    diagnostics_panel = st.sidebar.container()
+
+    # Mode tambah harian: file delta digabung ke dataset tanpa memproses ulang riwayat
+    st.sidebar.header("Tambah Data Harian")
+    delta_files = st.sidebar.file_uploader("Unggah file delta (CSV baru)", type=["csv"], accept_multiple_files=True,
+                                           help="Baris baru dibersihkan dan digabung; baris yang sudah ada dilewati.")
+
+    dataset_name = uploaded_file.name if uploaded_file is not None else saved_name
+    out_of_core = False
+    is_cube = False # True jika dataset_frame adalah kubus agregat, bukan baris
+    if saved_name is not None:
+        with profiler.stage('load_dataset', memory=False) as stage:
+            dataset_cache_key = saved_datasets[saved_name]['key']
+            base_dataset = load_saved_dataset(dataset_cache_key)
+            stage['cache'] = stage['cache'] or 'hit'
+        if base_dataset is None:
+            st.error("Dataset tersimpan tidak lagi tersedia di cache. Silakan unggah ulang file riwayatnya.")
+            st.stop()
+        dataset_frame, is_cube = base_dataset.cube, True
+        row_count, rows_removed = base_dataset.row_count, base_dataset.metadata['rows_removed']
+        memory_report = []
+        record_stage(memory_report, 'cache_disk', row_count, frame_memory(base_dataset.cube))
+    else:
+        # Baca dan bersihkan CSV (atau muat dari cache disk jika isi dan opsi sudah dikenal).
+        # File yang lebih besar dari ambang diproses out-of-core oleh DuckDB menjadi kubus agregat.
+        with profiler.stage('hash_upload'):
+            content_hash = upload_content_hash(uploaded_file)
+        out_of_core = uploaded_file.size >= OUT_OF_CORE_THRESHOLD and duckdb_available()
+        with profiler.stage('load_dataset', memory=False) as stage:
+            if out_of_core:
+                dataset_cache_key = dataset_key(content_hash, drop_nan=drop_nan, backend='duckdb-cube')
+                dataset_frame, row_count, rows_removed, memory_report = load_dataset_cube(uploaded_file, dataset_cache_key, drop_nan)
+            else:
+                dataset_cache_key = dataset_key(content_hash, drop_nan=drop_nan)
+                dataset_frame, rows_removed, memory_report = load_dataset(uploaded_file, dataset_cache_key, drop_nan)
+                row_count = dataset_frame.shape[0]
+            stage['rows_out'] = row_count
+            stage['cache'] = stage['cache'] or 'hit' # badan fungsi ber-cache tidak berjalan
+        memory_report = [{'stage': 'unggahan', 'rows': 0, 'bytes': uploaded_file.size}] + memory_report
+        base_dataset = dataset_frame
+        is_cube = out_of_core
+
+    if delta_files and out_of_core:
+        st.sidebar.info("Mode tambah harian belum tersedia untuk file yang diproses out-of-core.")
+    elif delta_files:
+        with profiler.stage('hash_upload'):
+            delta_hashes = tuple(upload_content_hash(delta_file) for delta_file in delta_files)
+        with profiler.stage('append_deltas', rows_in=row_count, memory=False) as stage:
+            try:
+                appended, dataset_cache_key, append_totals = append_deltas(
+                    base_dataset, delta_files, dataset_name, dataset_cache_key, int(rows_removed), delta_hashes, drop_nan)
+            except ValueError as e:
+                st.error(f"File delta tidak dapat digabung: {e}")
+                st.stop()
+            stage['cache'] = stage['cache'] or 'hit'
+            stage['rows_out'] = appended.row_count
+        dataset_frame, is_cube = appended.cube, True
+        row_count, rows_removed = appended.row_count, appended.metadata['rows_removed']
+        record_stage(memory_report, 'tambah_delta', row_count, frame_memory(appended.cube))
+        if append_totals['files']:
+            st.sidebar.success(f"{append_totals['rows_added']} baris baru dari {append_totals['files']} file delta; "
+                               f"{append_totals['duplicates_skipped']} baris yang sudah ada di dataset dilewati.")
+        st.sidebar.caption(f"Dataset disimpan sebagai '{dataset_name}' dan dapat dilanjutkan tanpa mengunggah riwayat.")
+
+    # Laporan penggunaan memori per tahap
+    with st.sidebar.expander("Penggunaan Memori"):
+        st.dataframe(
+            pd.DataFrame(memory_report).assign(MB=lambda m: (m['bytes'] / 2**20).round(2)),
+            hide_index=True
+        )
 
-    if cleaned_df.empty:
+    if row_count == 0:
         st.error("File CSV kosong atau tidak valid setelah pembersihan. Silakan unggah file lain.")
     else:
-        st.success(f"File CSV berhasil diunggah dengan {cleaned_df.shape[0]} baris. ({rows_removed} baris dihapus selama pembersihan awal).")
-        st.sidebar.write(f"File saat ini: {uploaded_file.name}")
+        st.success(f"File CSV berhasil diunggah dengan {row_count} baris. ({rows_removed} baris dihapus selama pembersihan awal).")
+        st.sidebar.write(f"File saat ini: {dataset_name}")
 
         # --- Bagian Filter (Sidebar) ---
         st.sidebar.header("Filter Data")
 
+        # Kubus agregat dibangun sekali per dataset bersih; filter bekerja pada sel kubus
+        with profiler.stage('aggregations', rows_in=row_count) as stage:
+            aggregations = get_aggregations(dataset_frame, dataset_cache_key, is_cube=is_cube)
+            stage['rows_out'] = aggregations.index.size
+            stage['cache'] = stage['cache'] or 'hit'
+        filter_index = aggregations.index
+
         # Dapatkan nilai unik untuk filter
-        platforms = ['All'] + sorted(cleaned_df['Platform'].unique().tolist()) if 'Platform' in cleaned_df.columns else ['All']
-        sentiments = ['All'] + sorted(cleaned_df['Sentiment'].unique().tolist()) if 'Sentiment' in cleaned_df.columns else ['All']
-        media_types = ['All'] + sorted(cleaned_df['Media Type'].unique().tolist()) if 'Media Type' in cleaned_df.columns else ['All']
-        locations = ['All'] + sorted(cleaned_df['Location'].unique().tolist()) if 'Location' in cleaned_df.columns else ['All']
+        platforms = ['All'] + filter_index.options('Platform')
+        sentiments = ['All'] + filter_index.options('Sentiment')
+        media_types = ['All'] + filter_index.options('Media Type')
+        locations = ['All'] + filter_index.options('Location')
 
         selected_platform = st.sidebar.selectbox("Platform", platforms)
         selected_sentiment = st.sidebar.selectbox("Sentiment", sentiments)
@@ -186,12 +528,7 @@ if uploaded_file is not None:
         selected_location = st.sidebar.selectbox("Lokasi", locations)
 
         # Filter Rentang Tanggal
-        min_date = cleaned_df['Date'].min() if 'Date' in cleaned_df.columns and not cleaned_df['Date'].empty else None
-        max_date = cleaned_df['Date'].max() if 'Date' in cleaned_df.columns and not cleaned_df['Date'].empty else None
-        
-        # Ensure min_date and max_date are actual date objects for st.date_input
-        if min_date and pd.isna(min_date): min_date = None
-        if max_date and pd.isna(max_date): max_date = None
+        min_date, max_date = filter_index.date_bounds()
 
         col_start_date, col_end_date = st.sidebar.columns(2)
         with col_start_date:
@@ -199,201 +536,44 @@ if uploaded_file is not None:
         with col_end_date:
             end_date = st.date_input("Tanggal Akhir", value=max_date, min_value=min_date, max_value=max_date) if max_date else None
 
-        # Terapkan filter
-        filtered_df = cleaned_df.copy()
-        if selected_platform != 'All':
-            filtered_df = filtered_df[filtered_df['Platform'] == selected_platform]
-        if selected_sentiment != 'All':
-            filtered_df = filtered_df[filtered_df['Sentiment'] == selected_sentiment]
-        if selected_media_type != 'All':
-            filtered_df = filtered_df[filtered_df['Media Type'] == selected_media_type]
-        if selected_location != 'All':
-            filtered_df = filtered_df[filtered_df['Location'] == selected_location]
+        # Terapkan filter: satu seleksi sel kubus lewat AND bitmap, tanpa menyalin DataFrame.
+        # Status filter menjadi kunci memo untuk semua metrik.
+        filter_state = FilterState(selected_platform, selected_sentiment, selected_media_type,
+                                   selected_location, start_date, end_date)
+        with profiler.stage('filter', rows_in=row_count, cache_stats=aggregations.stats) as stage:
+            selection = aggregations.metric(filter_state, 'selection')
+            stage['rows_out'] = selection.count
 
-        if 'Date' in filtered_df.columns and start_date and end_date:
-            filtered_df = filtered_df[(filtered_df['Date'] >= pd.to_datetime(start_date)) & (filtered_df['Date'] <= pd.to_datetime(end_date))]
+        # Statistik cache lapisan agregasi (diisi setelah semua bagian dirender)
+        aggregation_stats_panel = st.sidebar.expander("Cache Agregasi")
 
         # --- Konten Dasbor ---
 
         st.subheader("Ringkasan Strategi Kampanye")
-        summary_persona = st.selectbox(
-            "Pilih Perspektif Ringkasan:",
-            ["professional", "consultant"],
-            format_func=lambda x: "Generate Gemini AI Analysis" if x == "professional" else "Generate with OpenRouter AI"
-        )
-
-        if st.button("Buat Ringkasan Strategi"):
-            with st.spinner("Membuat ringkasan..."):
-                summary_text = generate_summary(filtered_df, summary_persona)
-                # Gunakan st.markdown dengan unsafe_allow_html=True untuk merender tag kuat HTML
-                st.markdown(format_markdown_bold(summary_text), unsafe_allow_html=True)
-        else:
-            st.write("Klik 'Buat Ringkasan Strategi' untuk mendapatkan rekomendasi kampanye berdasarkan data yang difilter.")
+        summary_fragment(aggregations, filter_state)
 
         st.markdown("---") # Pemisah
 
         st.subheader("Analisis Data")
 
-        # Grafik 1: Perincian Sentimen
-        st.markdown("### Analisis Sentimen")
-        if 'Sentiment' in filtered_df.columns and not filtered_df.empty:
-            sentiment_counts = filtered_df['Sentiment'].value_counts().reset_index()
-            sentiment_counts.columns = ['Sentiment', 'Count']
-            fig_sentiment = px.pie(sentiment_counts, values='Count', names='Sentiment',
-                                   title='Distribusi Sentimen', hole=0.3,
-                                   color_discrete_sequence=CUSTOM_PLOTLY_COLORS) # Menggunakan palet kustom
-            st.plotly_chart(fig_sentiment, use_container_width=True)
-            
-            # Wawasan
-            insights = []
-            if not sentiment_counts.empty:
-                dominant_sentiment = sentiment_counts.loc[sentiment_counts['Count'].idxmax()]
-                insights.append(f"Sentimen dominan adalah **{dominant_sentiment['Sentiment']}** dengan **{dominant_sentiment['Count']}** entri, menunjukkan persepsi yang umumnya {dominant_sentiment['Sentiment'].lower()}.")
-                if len(sentiment_counts) > 1:
-                    least_sentiment = sentiment_counts.loc[sentiment_counts['Count'].idxmin()]
-                    insights.append(f"**{least_sentiment['Sentiment']}** mewakili bagian terkecil dengan **{least_sentiment['Count']}** entri.")
-            st.markdown("#### Wawasan Utama:")
-            for insight in insights:
-                st.markdown(f"- {format_markdown_bold(insight)}", unsafe_allow_html=True)
-            if not insights:
-                st.markdown("- Tidak ada data sentimen untuk ditampilkan.")
-        else:
-            st.markdown("Tidak ada data sentimen untuk ditampilkan.")
-            st.markdown("#### Wawasan Utama:")
-            st.markdown("- Tidak ada data sentimen untuk ditampilkan.")
-        st.markdown("---")
-
-        # Grafik 2: Tren Keterlibatan Seiring Waktu
-        st.markdown("### Tren Keterlibatan Seiring Waktu")
-        if 'Date' in filtered_df.columns and 'Engagements' in filtered_df.columns and not filtered_df.empty:
-            # Memastikan kolom 'Date' adalah datetime dan mengurutkannya
-            df_for_trend = filtered_df.set_index('Date').resample('D')['Engagements'].sum().reset_index()
-            df_for_trend.columns = ['Date', 'Total Engagements']
-            df_for_trend = df_for_trend.sort_values('Date') # Pastikan data diurutkan berdasarkan tanggal
-
-            fig_trend = px.line(df_for_trend, x='Date', y='Total Engagements',
-                                title='Tren Keterlibatan Harian',
-                                line_shape='spline', markers=True,
-                                color_discrete_sequence=[CUSTOM_PLOTLY_COLORS[0]]) # Menggunakan warna pertama dari palet kustom
-            st.plotly_chart(fig_trend, use_container_width=True)
-            
-            # Wawasan
-            insights = []
-            if not df_for_trend.empty:
-                peak_engagement = df_for_trend.loc[df_for_trend['Total Engagements'].idxmax()]
-                insights.append(f"Keterlibatan mencapai puncaknya sekitar **{peak_engagement['Date'].strftime('%Y-%m-%d')}** dengan **{peak_engagement['Total Engagements']}** keterlibatan.")
-                
-                if len(df_for_trend) > 1:
-                    first_val = df_for_trend['Total Engagements'].iloc[0]
-                    last_val = df_for_trend['Total Engagements'].iloc[-1]
-                    overall_trend = 'stabil'
-                    if last_val > first_val * 1.1: overall_trend = 'meningkat'
-                    elif last_val < first_val * 0.9: overall_trend = 'menurun'
-                    insights.append(f"Tren keseluruhan menunjukkan keterlibatan yang **{overall_trend}** selama periode yang dipilih.")
-            st.markdown("#### Wawasan Utama:")
-            for insight in insights:
-                st.markdown(f"- {format_markdown_bold(insight)}", unsafe_allow_html=True)
-            if not insights:
-                st.markdown("- Tidak ada data tren keterlibatan untuk ditampilkan.")
-        else:
-            st.markdown("Tidak ada data tren keterlibatan untuk ditampilkan.")
-            st.markdown("#### Wawasan Utama:")
-            st.markdown("- Tidak ada data tren keterlibatan untuk ditampilkan.")
-        st.markdown("---")
-
-
-        # Grafik 3: Keterlibatan per Platform
-        st.markdown("### Keterlibatan per Platform")
-        if 'Platform' in filtered_df.columns and 'Engagements' in filtered_df.columns and not filtered_df.empty:
-            platform_engagements = filtered_df.groupby('Platform')['Engagements'].sum().reset_index()
-            platform_engagements.columns = ['Platform', 'Total Engagements']
-            platform_engagements = platform_engagements.sort_values('Total Engagements', ascending=True) # Untuk grafik batang horizontal
-            fig_platform = px.bar(platform_engagements, x='Total Engagements', y='Platform',
-                                  title='Total Keterlibatan per Platform', orientation='h',
-                                  color_discrete_sequence=CUSTOM_PLOTLY_COLORS) # Menggunakan palet kustom
-            st.plotly_chart(fig_platform, use_container_width=True)
-
-            # Wawasan
-            insights = []
-            if not platform_engagements.empty:
-                top_platform = platform_engagements.loc[platform_engagements['Total Engagements'].idxmax()]
-                insights.append(f"**{top_platform['Platform']}** secara konsisten mendorong keterlibatan tertinggi dengan total **{top_platform['Total Engagements']}**.")
-                if len(platform_engagements) > 1:
-                    lowest_platform = platform_engagements.loc[platform_engagements['Total Engagements'].idxmin()]
-                    insights.append(f"Platform seperti **{lowest_platform['Platform']}** menunjukkan keterlibatan yang lebih rendah.")
-            st.markdown("#### Wawasan Utama:")
-            for insight in insights:
-                st.markdown(f"- {format_markdown_bold(insight)}", unsafe_allow_html=True)
-            if not insights:
-                st.markdown("- Tidak ada data keterlibatan platform untuk ditampilkan.")
-        else:
-            st.markdown("Tidak ada data keterlibatan platform untuk ditampilkan.")
-            st.markdown("#### Wawasan Utama:")
-            st.markdown("- Tidak ada data keterlibatan platform untuk ditampilkan.")
-        st.markdown("---")
-
-        # Grafik 4: Kombinasi Jenis Media
-        st.markdown("### Kombinasi Jenis Media")
-        if 'Media Type' in filtered_df.columns and not filtered_df.empty:
-            media_type_counts = filtered_df['Media Type'].value_counts().reset_index()
-            media_type_counts.columns = ['Media Type', 'Count']
-            fig_media_type = px.pie(media_type_counts, values='Count', names='Media Type',
-                                    title='Distribusi Jenis Media', hole=0.3,
-                                    color_discrete_sequence=CUSTOM_PLOTLY_COLORS) # Menggunakan palet kustom
-            st.plotly_chart(fig_media_type, use_container_width=True)
-
-            # Wawasan
-            insights = []
-            if not media_type_counts.empty:
-                dominant_media_type = media_type_counts.loc[media_type_counts['Count'].idxmax()]
-                insights.append(f"**{dominant_media_type['Media Type']}** adalah jenis media yang paling sering digunakan dengan **{dominant_media_type['Count']}** entri.")
-                if len(media_type_counts) > 1:
-                    least_common_media = media_type_counts.loc[media_type_counts['Count'].idxmin()]
-                    insights.append(f"**{least_common_media['Media Type']}** kurang umum, mungkin menjadi area untuk eksplorasi.")
-            st.markdown("#### Wawasan Utama:")
-            for insight in insights:
-                st.markdown(f"- {format_markdown_bold(insight)}", unsafe_allow_html=True)
-            if not insights:
-                st.markdown("- Tidak ada data jenis media untuk ditampilkan.")
-        else:
-            st.markdown("Tidak ada data jenis media untuk ditampilkan.")
-            st.markdown("#### Wawasan Utama:")
-            st.markdown("- Tidak ada data jenis media untuk ditampilkan.")
-        st.markdown("---")
-
-
-        # Grafik 5: 5 Lokasi Teratas
-        st.markdown("### 5 Lokasi Teratas")
-        if 'Location' in filtered_df.columns and 'Engagements' in filtered_df.columns and not filtered_df.empty:
-            location_engagements = filtered_df.groupby('Location')['Engagements'].sum().nlargest(5).reset_index()
-            location_engagements.columns = ['Location', 'Total Engagements']
-            location_engagements = location_engagements.sort_values('Total Engagements', ascending=True) # Untuk grafik batang horizontal
-            fig_location = px.bar(location_engagements, x='Total Engagements', y='Location',
-                                  title='5 Lokasi Teratas berdasarkan Keterlibatan', orientation='h',
-                                  color_discrete_sequence=[CUSTOM_PLOTLY_COLORS[0]]) # Menggunakan warna utama dari palet kustom
-            st.plotly_chart(fig_location, use_container_width=True)
-            
-            # Wawasan
-            insights = []
-            if not location_engagements.empty:
-                top_location = location_engagements.loc[location_engagements['Total Engagements'].idxmax()]
-                insights.append(f"**{top_location['Location']}** adalah area geografis utama untuk keterlibatan dengan total **{top_location['Total Engagements']}** keterlibatan.")
-            st.markdown("#### Wawasan Utama:")
-            for insight in insights:
-                st.markdown(f"- {format_markdown_bold(insight)}", unsafe_allow_html=True)
-            if not insights:
-                st.markdown("- Tidak ada data lokasi untuk ditampilkan.")
-        else:
-            st.markdown("Tidak ada data lokasi untuk ditampilkan.")
-            st.markdown("#### Wawasan Utama:")
-            st.markdown("- Tidak ada data lokasi untuk ditampilkan.")
-        st.markdown("---")
-
-        st.markdown("""
-            ---
-            **Ekspor ke PDF:** Untuk mengekspor seluruh dashboard ke PDF, silakan gunakan fungsi "Cetak" atau "Simpan sebagai PDF" dari browser Anda (Ctrl+P atau Cmd+P).
-            """)
+        # Lima grafik beserta wawasannya, dibangun oleh report_engine dari lapisan agregasi.
+        # Setiap bagian adalah fragmen terpisah; bagian dimemo per status filter dan masukannya,
+        # jadi rerun penuh tanpa perubahan filter tidak membangun ulang gambar (gambar tetap dikirim ulang ke browser).
+        for builder in SECTION_BUILDERS:
+            section_fragment(builder, aggregations, filter_state)
+
+        st.subheader("Ekspor Laporan")
+        exporting = any(not future.done() for future in st.session_state.get('exports', {}).values())
+        st.fragment(export_panel, run_every=EXPORT_POLL_SECONDS if exporting else None)(
+            aggregations, filter_state, dataset_name, dataset_cache_key, row_count, rows_removed, exporting)
+
+        aggregation_stats_panel.json(aggregations.stats())
+
+    if show_diagnostics:
+        render_diagnostics(diagnostics_panel, profiler)
 
 else:
     st.info("Silakan unggah file CSV untuk memulai.")
 
+profiler.finish()
+
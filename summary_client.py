@@ -0,0 +1,237 @@
+import hashlib
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = 'https://generativelanguage.googleapis.com/v1beta'
+DEFAULT_MODEL = 'gemini-2.0-flash'
+
+# Status HTTP yang layak dicoba ulang
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Status yang berarti endpoint streaming tidak tersedia; jatuh kembali ke panggilan biasa
+STREAM_UNAVAILABLE_STATUSES = {400, 404, 405, 501}
+
+UNEXPECTED_RESPONSE_TEXT = 'Gagal membuat ringkasan. Struktur respons Gemini API tidak terduga.'
+
+
+# Ambil teks dari respons generateContent; None jika strukturnya tidak terduga
+def extract_text(result):
+    if result and 'candidates' in result and len(result['candidates']) > 0 and \
+       'content' in result['candidates'][0] and 'parts' in result['candidates'][0]['content'] and \
+       len(result['candidates'][0]['content']['parts']) > 0:
+        return result['candidates'][0]['content']['parts'][0]['text']
+    return None
+
+
+# Klien ringkasan Gemini: sesi HTTP ber-pool, timeout, percobaan ulang dengan backoff
+# untuk 429/5xx, cache respons ber-TTL, dan pemanggilan di thread latar.
+class SummaryClient:
+    def __init__(self, api_key, model=DEFAULT_MODEL, base_url=DEFAULT_BASE_URL,
+                 connect_timeout=5.0, read_timeout=60.0, max_retries=3, backoff_factor=0.5,
+                 max_backoff=8.0, cache_ttl=3600.0, cache_max_entries=256, max_workers=4,
+                 pool_size=8, session=None, sleep=time.sleep, clock=time.monotonic):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._sleep = sleep
+        self._clock = clock
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summary')
+
+    def endpoint(self, method='generateContent'):
+        return f"{self.base_url}/models/{self.model}:{method}"
+
+    def payload(self, prompt):
+        return {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
+
+    # Kunci cache: model, persona, dan fakta agregat prompt
+    def cache_key(self, persona, facts):
+        payload = json.dumps({'model': self.model, 'persona': persona, 'facts': facts}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def cached(self, key):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, text = entry
+            if self._clock() - stored_at > self.cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return text
+
+    def remember(self, key, text):
+        with self._cache_lock:
+            self._cache[key] = (self._clock(), text)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+
+    # POST dengan percobaan ulang terbatas untuk 429/5xx dan kegagalan koneksi
+    def post(self, url, payload, params=None, **kwargs):
+        params = dict(params or {}, key=self.api_key)
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                response = self.session.post(url, params=params, json=payload,
+                                             timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt:
+                    raise
+                self._sleep(self._retry_delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                delay = self._retry_delay(attempt, response)
+                response.close()
+                self._sleep(delay)
+                continue
+            response.raise_for_status() # Menimbulkan pengecualian untuk kesalahan HTTP
+            return response
+
+    # Buat ringkasan secara sinkron; memakai cache jika fakta yang sama sudah pernah diringkas.
+    # Kesalahan HTTP/JSON diteruskan ke pemanggil.
+    def summarize(self, prompt, persona, facts):
+        key = self.cache_key(persona, facts)
+        text = self.cached(key)
+        if text is not None:
+            return text
+
+        response = self.post(self.endpoint(), self.payload(prompt))
+        text = extract_text(response.json())
+        if text is None:
+            return UNEXPECTED_RESPONSE_TEXT
+        self.remember(key, text)
+        return text
+
+    # Jalankan summarize di thread latar; kembalikan Future
+    def submit(self, prompt, persona, facts):
+        key = self.cache_key(persona, facts)
+        text = self.cached(key)
+        if text is not None:
+            future = Future()
+            future.set_result(text)
+            return future
+        return self._executor.submit(self.summarize, prompt, persona, facts)
+
+    # Buat ringkasan sebagai generator potongan teks lewat streamGenerateContent (SSE).
+    # Jika endpoint streaming tidak tersedia, jatuh kembali ke summarize dan hasilkan satu potongan.
+    def stream(self, prompt, persona, facts):
+        key = self.cache_key(persona, facts)
+        text = self.cached(key)
+        if text is not None:
+            yield text
+            return
+
+        try:
+            response = self.post(self.endpoint('streamGenerateContent'), self.payload(prompt),
+                                 params={'alt': 'sse'}, stream=True)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code not in STREAM_UNAVAILABLE_STATUSES:
+                raise
+            yield self.summarize(prompt, persona, facts)
+            return
+
+        parts = []
+        with response:
+            if 'text/event-stream' not in response.headers.get('Content-Type', ''):
+                # Server mengirim JSON biasa (objek atau larik objek), bukan SSE
+                result = response.json()
+                for item in result if isinstance(result, list) else [result]:
+                    chunk = extract_text(item)
+                    if chunk:
+                        parts.append(chunk)
+                        yield chunk
+            else:
+                response.encoding = 'utf-8'
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    chunk = extract_text(json.loads(line[len('data:'):].strip()))
+                    if chunk:
+                        parts.append(chunk)
+                        yield chunk
+
+        if not parts:
+            yield UNEXPECTED_RESPONSE_TEXT
+            return
+        self.remember(key, ''.join(parts))
+
+    # Jalankan stream di thread latar; potongan dapat dibaca dari SummaryStream
+    def submit_stream(self, prompt, persona, facts):
+        summary_stream = SummaryStream(self._clock)
+        self._executor.submit(summary_stream.pump, self.stream(prompt, persona, facts))
+        return summary_stream
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+# Penghubung antara thread latar yang membaca stream dan thread skrip yang merender.
+# Iterasi menghasilkan potongan teks; kesalahan dari thread latar dimunculkan kembali di akhir.
+class SummaryStream:
+    _DONE = object()
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._queue = queue.Queue()
+        self.started_at = clock()
+        self.first_chunk_at = None
+
+    def pump(self, chunks):
+        try:
+            for chunk in chunks:
+                self._queue.put(chunk)
+        except BaseException as e:
+            self._queue.put(e)
+        finally:
+            self._queue.put(self._DONE)
+
+    # Detik dari permintaan dimulai sampai potongan pertama diterima
+    @property
+    def time_to_first_text(self):
+        return None if self.first_chunk_at is None else self.first_chunk_at - self.started_at
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            if self.first_chunk_at is None:
+                self.first_chunk_at = self._clock()
+            yield item
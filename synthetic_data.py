@@ -0,0 +1,125 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Jumlah nilai unik default per kolom dimensi
+DEFAULT_CARDINALITIES = {
+    'Platform': 8,
+    'Sentiment': 3,
+    'Media Type': 5,
+    'Location': 50,
+}
+
+# Nama nilai yang dipakai lebih dulu sebelum nama generik "<kolom> N"
+NAMED_VALUES = {
+    'Platform': ['Instagram', 'TikTok', 'Twitter', 'Facebook', 'YouTube', 'LinkedIn', 'News', 'Blog'],
+    'Sentiment': ['Positive', 'Negative', 'Neutral', 'Mixed'],
+    'Media Type': ['Video', 'Image', 'Text', 'Carousel', 'Story'],
+    'Location': ['Jakarta', 'Surabaya', 'Bandung', 'Medan', 'Semarang', 'Makassar', 'Palembang', 'Denpasar'],
+}
+
+# Proporsi nilai kotor default: sel kosong, tanggal rusak, dan keterlibatan non-numerik
+DEFAULT_MISSING_RATE = 0.01
+DEFAULT_INVALID_DATE_RATE = 0.005
+DEFAULT_INVALID_ENGAGEMENT_RATE = 0.005
+
+DATE_OUTPUT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Baris per potongan saat menulis file besar
+WRITE_CHUNK_ROWS = 1_000_000
+
+
+def dimension_values(col, cardinality):
+    named = NAMED_VALUES.get(col, [])[:cardinality]
+    return named + [f'{col} {i}' for i in range(len(named) + 1, cardinality + 1)]
+
+
+# Buat DataFrame sintetis dengan skema dasbor (semua kolom sebagai teks, seperti isi CSV).
+# Distribusi dimensi condong (Zipf ringan) agar ada nilai dominan dan nilai jarang.
+def generate_frame(rows, seed=0, cardinalities=None, start='2023-01-01', days=365,
+                   missing_rate=DEFAULT_MISSING_RATE, invalid_date_rate=DEFAULT_INVALID_DATE_RATE,
+                   invalid_engagement_rate=DEFAULT_INVALID_ENGAGEMENT_RATE):
+    rng = np.random.default_rng(seed)
+    cardinalities = dict(DEFAULT_CARDINALITIES, **(cardinalities or {}))
+
+    hours = rng.integers(0, days * 24, size=rows)
+    dates = (pd.Timestamp(start) + pd.to_timedelta(hours, unit='h')).strftime(DATE_OUTPUT_FORMAT)
+    data = {'Date': np.asarray(dates, dtype=object),
+            'Engagements': rng.lognormal(mean=4.0, sigma=1.2, size=rows).astype('int64').astype(str).astype(object)}
+
+    for col, cardinality in cardinalities.items():
+        values = np.array(dimension_values(col, cardinality), dtype=object)
+        weights = 1.0 / np.arange(1, cardinality + 1) ** 0.8
+        data[col] = values[rng.choice(cardinality, size=rows, p=weights / weights.sum())]
+
+    df = pd.DataFrame(data)
+    df.loc[rng.random(rows) < invalid_date_rate, 'Date'] = 'tanggal tidak valid'
+    df.loc[rng.random(rows) < invalid_engagement_rate, 'Engagements'] = 'tidak diketahui'
+    for col in df.columns:
+        df.loc[rng.random(rows) < missing_rate, col] = None
+    return df
+
+
+# Tulis dataset sintetis ke CSV per potongan sehingga 10 juta baris tidak perlu muat sekaligus
+def write_csv(path, rows, seed=0, chunk_rows=WRITE_CHUNK_ROWS, **options):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    written = 0
+    part = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < rows or part == 0:
+            size = min(chunk_rows, rows - written)
+            generate_frame(size, seed=[seed, part], **options).to_csv(f, index=False, header=(part == 0))
+            written += size
+            part += 1
+    return path
+
+
+# Tipe argparse untuk bilangan bulat >= 1
+def positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bukan bilangan bulat: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"harus minimal 1: {number}")
+    return number
+
+
+def parse_cardinality(value):
+    col, _, count = value.partition('=')
+    if col not in DEFAULT_CARDINALITIES or not count.isdigit() or int(count) < 1:
+        raise argparse.ArgumentTypeError(f"format harus KOLOM=JUMLAH (JUMLAH minimal 1) dengan KOLOM salah satu dari {list(DEFAULT_CARDINALITIES)}")
+    return col, int(count)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Buat CSV intelijen media sintetis untuk pengujian dan benchmark.")
+    parser.add_argument('output', help="Path CSV keluaran")
+    parser.add_argument('-n', '--rows', type=positive_int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start', default='2023-01-01', help="Tanggal awal (default: 2023-01-01)")
+    parser.add_argument('--days', type=positive_int, default=365, help="Panjang rentang tanggal dalam hari")
+    parser.add_argument('--cardinality', type=parse_cardinality, action='append', default=[],
+                        help="Jumlah nilai unik per kolom, mis. Location=500 (boleh diulang)")
+    parser.add_argument('--missing-rate', type=float, default=DEFAULT_MISSING_RATE)
+    parser.add_argument('--invalid-date-rate', type=float, default=DEFAULT_INVALID_DATE_RATE)
+    parser.add_argument('--invalid-engagement-rate', type=float, default=DEFAULT_INVALID_ENGAGEMENT_RATE)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    write_csv(args.output, args.rows, seed=args.seed, start=args.start, days=args.days,
+              cardinalities=dict(args.cardinality), missing_rate=args.missing_rate,
+              invalid_date_rate=args.invalid_date_rate, invalid_engagement_rate=args.invalid_engagement_rate)
+    print(f"{args.rows} baris ditulis ke {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
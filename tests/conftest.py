@@ -0,0 +1,70 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+# Pengganti lokal Gemini API: setiap permintaan POST dijawab dengan respons berikutnya dari antrean
+# (status, header, badan) dan dicatat (path, query, badan JSON) untuk diperiksa tes.
+class GeminiStandIn:
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                url = urlparse(self.path)
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with stand_in._lock:
+                    stand_in.requests.append({'path': url.path, 'query': parse_qs(url.query),
+                                              'json': json.loads(body or b'null')})
+                    status, headers, payload = stand_in.responses.pop(0)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1beta"
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+        self._thread.start()
+
+    def respond(self, status=200, body=b'', headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+            headers = dict({'Content-Type': 'application/json'}, **(headers or {}))
+        self.responses.append((status, headers or {}, body))
+
+    # Respons generateContent dengan satu potongan teks
+    def respond_text(self, text):
+        self.respond(body=self.text_response(text))
+
+    # Respons streamGenerateContent sebagai server-sent events, satu event per potongan
+    def respond_sse(self, chunks):
+        body = ''.join(f"data: {json.dumps(self.text_response(chunk))}\r\n\r\n" for chunk in chunks)
+        self.respond(body=body.encode('utf-8'), headers={'Content-Type': 'text/event-stream'})
+
+    # Badan respons Gemini dengan satu potongan teks
+    @staticmethod
+    def text_response(text):
+        return {'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}}]}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def gemini_server():
+    server = GeminiStandIn()
+    yield server
+    server.close()
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from aggregations import AggregationLayer, FilterState
+from data_cube import build_cube_index
+
+
+def _layer(max_entries):
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03']),
+        'Engagements': [1, 2, 3],
+        'Platform': pd.Categorical(['X', 'Y', 'X']),
+    })
+    return AggregationLayer(build_cube_index(df), max_entries=max_entries)
+
+
+def _state(platform):
+    return FilterState(platform, 'All', 'All', 'All', None, None)
+
+
+def test_memo_counts_hits_and_misses():
+    layer = _layer(4)
+    calls = []
+    for _ in range(3):
+        assert layer.memo(_state('X'), 'nilai', lambda: calls.append(1) or 42) == 42
+    assert calls == [1]
+    assert layer.stats() == {'hits': 2, 'misses': 1, 'entries': 1}
+
+
+# Status filter yang paling lama tidak dipakai digusur lebih dulu; memakai ulang sebuah status memperbaruinya
+def test_lru_eviction_order():
+    layer = _layer(2)
+    layer.memo(_state('A'), 'nilai', lambda: 'a')
+    layer.memo(_state('B'), 'nilai', lambda: 'b')
+    layer.memo(_state('A'), 'nilai', lambda: 'a lagi') # hit: A menjadi yang terbaru
+    layer.memo(_state('C'), 'nilai', lambda: 'c') # melebihi max_entries: B digusur
+    assert layer.stats() == {'hits': 1, 'misses': 3, 'entries': 2}
+
+    assert layer.memo(_state('A'), 'nilai', lambda: 'baru') == 'a'
+    assert layer.memo(_state('B'), 'nilai', lambda: 'b baru') == 'b baru'
+    assert layer.stats() == {'hits': 2, 'misses': 4, 'entries': 2}
+
+
+# Satu entri LRU per status filter, memuat semua metriknya
+def test_metrics_share_one_entry_per_state():
+    layer = _layer(2)
+    for platform in ['X', 'Y', 'X']:
+        layer.metric(_state(platform), 'sentiment_counts')
+        layer.metric(_state(platform), 'daily_engagements')
+    stats = layer.stats()
+    assert stats['entries'] == 2
+    assert stats['hits'] > 0 and stats['misses'] > 0
+    assert layer.metric(_state('Y'), 'daily_engagements').tolist() == [2]
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from batch_report import main, process_file
+from report_engine import ALL_FILTERS
+from synthetic_data import write_csv
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    directory = tmp_path / 'masukan'
+    write_csv(str(directory / 'kampanye.csv'), 300, seed=1)
+    return directory
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_process_file_writes_json_and_html(input_dir, tmp_path):
+    result = process_file(str(input_dir / 'kampanye.csv'), str(tmp_path), True, ALL_FILTERS, 'professional', True)
+    assert 'error' not in result
+    report = _read_json(result['json'])
+    assert report['name'] == 'kampanye.csv'
+    assert report['rows'] == result['rows'] > 0
+    assert [section['key'] for section in report['sections']] == ['sentiment', 'trend', 'platform', 'media_type', 'location']
+    assert report['summary'] is None and result['prompt'] == report['summary_prompt']
+    with open(result['html'], encoding='utf-8') as f:
+        page = f.read()
+    assert 'Laporan Intelijen Media - kampanye.csv' in page
+    assert page.count('Plotly.newPlot') == 5
+
+
+# Menunggu ringkasan: hanya JSON yang ditulis, HTML dirender sesudah ringkasan dilampirkan
+def test_process_file_without_html(input_dir, tmp_path):
+    result = process_file(str(input_dir / 'kampanye.csv'), str(tmp_path), True, ALL_FILTERS, 'professional', False)
+    assert (tmp_path / 'kampanye.json').exists()
+    assert not (tmp_path / 'kampanye.html').exists()
+    assert result['facts']['top_platform'] != 'N/A'
+
+
+@pytest.mark.parametrize('content, error', [(b'', 'EmptyDataError'), (b'\xff\xfe\x00rusak\n', 'UnicodeDecodeError')])
+def test_process_file_reports_errors(tmp_path, content, error):
+    path = tmp_path / 'rusak.csv'
+    path.write_bytes(content)
+    result = process_file(str(path), str(tmp_path), True, ALL_FILTERS, 'professional', True)
+    assert result['path'] == str(path)
+    assert result['error'].startswith(error)
+
+
+# Satu file rusak tidak menghentikan file lain, tetapi kode keluar menjadi 1
+def test_main_continues_after_failed_file(input_dir, tmp_path, capsys):
+    (input_dir / 'rusak.csv').write_bytes(b'')
+    output_dir = tmp_path / 'laporan'
+    assert main([str(input_dir), '-o', str(output_dir), '-w', '1']) == 1
+    assert sorted(path.name for path in output_dir.iterdir()) == ['kampanye.html', 'kampanye.json']
+    captured = capsys.readouterr()
+    assert 'GAGAL' in captured.err and 'rusak.csv' in captured.err
+    assert '1/2 laporan selesai' in captured.out
+
+
+def test_main_requires_api_key_for_summaries(input_dir, tmp_path, monkeypatch):
+    monkeypatch.delenv('GEMINI_API_KEY', raising=False)
+    with pytest.raises(SystemExit):
+        main([str(input_dir), '-o', str(tmp_path), '--summaries', '--api-key', ''])
+
+
+# Ringkasan diminta lewat server pengganti Gemini lalu dilampirkan ke JSON dan HTML
+def test_main_attaches_summaries(input_dir, tmp_path, gemini_server, monkeypatch):
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1')
+    gemini_server.respond_text('Fokuskan anggaran pada **X**.')
+    output_dir = tmp_path / 'laporan'
+    assert main([str(input_dir), '-o', str(output_dir), '-w', '1', '--summaries', '--api-key', 'kunci-tes',
+                 '--api-base-url', gemini_server.base_url]) == 0
+
+    request, = gemini_server.requests
+    report = _read_json(output_dir / 'kampanye.json')
+    assert request['query']['key'] == ['kunci-tes']
+    assert request['json']['contents'][0]['parts'][0]['text'] == report['summary_prompt']
+    assert report['summary'] == 'Fokuskan anggaran pada **X**.'
+    with open(output_dir / 'kampanye.html', encoding='utf-8') as f:
+        assert 'Fokuskan anggaran pada <strong>X</strong>.' in f.read()
+
+
+# Ringkasan yang gagal dicatat sebagai teks kesalahan; laporan tetap ditulis
+def test_main_records_failed_summary(input_dir, tmp_path, gemini_server, monkeypatch):
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1')
+    gemini_server.respond(status=403, body={'error': {'message': 'ditolak'}})
+    output_dir = tmp_path / 'laporan'
+    assert main([str(input_dir), '-o', str(output_dir), '-w', '1', '--summaries', '--api-key', 'kunci-tes',
+                 '--api-base-url', gemini_server.base_url]) == 0
+    assert _read_json(output_dir / 'kampanye.json')['summary'].startswith('Error membuat ringkasan')
+    assert (output_dir / 'kampanye.html').exists()
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from aggregations import METRICS
+from benchmark import benchmark_file, build_parser, compare, merge_repeats
+from synthetic_data import build_parser as build_synthetic_parser, generate_frame, write_csv
+
+
+@pytest.mark.parametrize('argv', [['--repeat', '0'], ['--repeat', '-1'], ['--sizes', '10', '0'], ['--sizes', 'x']])
+def test_parser_rejects_invalid_counts(argv):
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(argv)
+
+
+def test_parser_accepts_positive_counts():
+    args = build_parser().parse_args(['--sizes', '10', '20', '--repeat', '3'])
+    assert (args.sizes, args.repeat) == ([10, 20], 3)
+
+
+def test_synthetic_parser_rejects_empty_cardinality():
+    with pytest.raises(SystemExit):
+        build_synthetic_parser().parse_args(['data.csv', '--cardinality', 'Location=0'])
+
+
+def test_write_csv_creates_directory(tmp_path):
+    path = tmp_path / 'baru' / 'data.csv'
+    write_csv(str(path), 50, chunk_rows=20)
+    df = pd.read_csv(path)
+    assert len(df) == 50
+    assert list(df.columns) == list(generate_frame(1).columns)
+
+
+# Waktu terbaik dari jalannya waktu, puncak memori dari jalannya memori (waktu None)
+def test_merge_repeats():
+    runs = [[{'stage': 'a', 'seconds': 2.0, 'peak_bytes': None}],
+            [{'stage': 'a', 'seconds': 1.0, 'peak_bytes': None}],
+            [{'stage': 'a', 'seconds': None, 'peak_bytes': 100}]]
+    assert merge_repeats(runs) == [{'stage': 'a', 'seconds': 1.0, 'peak_bytes': 100, 'repeats': 2}]
+
+
+def test_compare_flags_regressions():
+    baseline = {'results': [{'rows': 10, 'stages': [{'stage': 'a', 'seconds': 1.0}, {'stage': 'b', 'seconds': 0.001}]}]}
+    current = {'results': [{'rows': 10, 'stages': [{'stage': 'a', 'seconds': 1.5}, {'stage': 'b', 'seconds': 0.005}]}]}
+    rows = {row['stage']: row for row in compare(baseline, current)}
+    assert rows['a']['regression']
+    assert not rows['b']['regression'] # di bawah min_seconds
+
+
+def test_synthetic_parser_rejects_negative_rows():
+    with pytest.raises(SystemExit):
+        build_synthetic_parser().parse_args(['data.csv', '--rows', '-5'])
+
+
+# Fakta ringkasan dihitung pada lapisan baru, bukan dari memo yang sudah diisi tahap grafik
+def test_summary_facts_are_not_cache_hits(tmp_path, monkeypatch):
+    path = tmp_path / 'data.csv'
+    write_csv(str(path), 200)
+    hits_before = []
+    summary_facts = METRICS['summary_facts']
+
+    def measured(layer, state):
+        hits_before.append(layer.stats()['hits'])
+        return summary_facts(layer, state)
+
+    monkeypatch.setitem(METRICS, 'summary_facts', measured)
+    stages = [stage['stage'] for stage in benchmark_file(str(path), measure_memory=False)]
+    assert {'summary_facts_all', 'summary_prompt_all'} <= set(stages)
+    assert hits_before and all(hits == 0 for hits in hits_before)
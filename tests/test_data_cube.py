@@ -0,0 +1,172 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from aggregations import METRICS, AggregationLayer, FilterState
+from data_cube import ROWS_COLUMN, build_cube, build_cube_index, merge_cubes, update_cube
+from filter_index import FilterIndex
+from report_engine import media_type_section, sentiment_section
+
+# Metrik yang dibandingkan; 'selection' dibandingkan lewat jumlah barisnya
+COMPARED_METRICS = [name for name in METRICS if name != 'selection']
+
+DAYS = [datetime.date(2024, 1, 1), datetime.date(2024, 1, 2), datetime.date(2024, 1, 3)]
+
+
+# Baris dengan waktu tepat tengah malam, sesaat sesudahnya, dan sesaat sebelum tengah malam berikutnya,
+# sehingga batas rentang tanggal (tengah malam) jatuh di antara baris pada hari yang sama.
+# Separuh baris memakai dimensi yang sama sepanjang hari, jadi waktu-waktu itu berbagi sel kubus.
+def _frame():
+    times = []
+    for day in DAYS:
+        midnight = pd.Timestamp(day)
+        times += [midnight, midnight + pd.Timedelta(microseconds=1), midnight + pd.Timedelta(hours=12),
+                  midnight + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)]
+    rows = len(times)
+    varied = pd.DataFrame({
+        'Date': pd.to_datetime(times),
+        'Engagements': [(i * 7) % 11 + 1 for i in range(rows)],
+        'Platform': ['X', 'Y', 'X', 'Z'] * (rows // 4),
+        'Sentiment': ['Positive', 'Negative', 'Neutral'] * (rows // 3),
+        'Media Type': ['Video', 'Video', 'Text'] * (rows // 3),
+        'Location': ['Jakarta', 'Bandung'] * (rows // 2),
+    })
+    constant = varied.assign(Engagements=[i + 100 for i in range(rows)], Platform='X', Sentiment='Positive',
+                             **{'Media Type': 'Video', 'Location': 'Jakarta'})
+    df = pd.concat([varied, constant], ignore_index=True)
+    for col in ['Platform', 'Sentiment', 'Media Type', 'Location']:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def _states():
+    states = []
+    for start in DAYS:
+        for end in DAYS:
+            if start <= end:
+                states.append(FilterState('All', 'All', 'All', 'All', start, end))
+    states += [FilterState('X', 'All', 'All', 'All', None, None),
+               FilterState('All', 'Negative', 'Video', 'All', DAYS[0], DAYS[1]),
+               FilterState('Z', 'All', 'All', 'Bandung', DAYS[1], DAYS[2]),
+               FilterState('Tidak Ada', 'All', 'All', 'All', None, None),
+               FilterState('All', 'All', 'All', 'All', None, None)]
+    return states
+
+
+def _assert_same(expected, actual):
+    if isinstance(expected, (pd.Series, pd.DataFrame)):
+        pd.testing.assert_series_equal(actual, expected, check_dtype=False)
+    else:
+        assert actual == expected
+
+
+@pytest.mark.parametrize('state', _states())
+def test_cube_metrics_match_rows(state):
+    df = _frame()
+    rows = AggregationLayer(FilterIndex(df))
+    cube = AggregationLayer(build_cube_index(df))
+    assert cube.metric(state, 'selection').count == rows.metric(state, 'selection').count
+    for name in COMPARED_METRICS:
+        _assert_same(rows.metric(state, name), cube.metric(state, name))
+
+
+# Baris tengah malam dan baris lain pada hari yang sama berada di sel yang berbeda
+def test_midnight_rows_get_their_own_cell():
+    df = _frame()
+    cube = build_cube(df, dimensions=[])
+    assert len(cube) == 2 * len(DAYS)
+    assert cube[ROWS_COLUMN].sum() == len(df)
+    midnight_cells = cube[cube['Date'] == cube['Date'].dt.floor('D')]
+    assert midnight_cells[ROWS_COLUMN].tolist() == [2] * len(DAYS)
+
+
+def test_cube_date_bounds_match_rows():
+    df = _frame()
+    assert build_cube_index(df).date_bounds() == FilterIndex(df).date_bounds()
+
+
+def test_merge_cubes_matches_build_cube():
+    df = _frame()
+    merged = merge_cubes([build_cube(df.iloc[:5]), build_cube(df.iloc[5:], row_offset=5)])
+    state = FilterState('All', 'All', 'All', 'All', DAYS[1], DAYS[2])
+    full = AggregationLayer(build_cube_index(df))
+    layer = AggregationLayer(FilterIndex(merged, rows_column=ROWS_COLUMN))
+    assert len(merged) == len(build_cube(df))
+    for name in COMPARED_METRICS:
+        _assert_same(full.metric(state, name), layer.metric(state, name))
+
+
+def test_cube_without_dates():
+    df = _frame().drop(columns=['Date'])
+    state = FilterState('X', 'All', 'All', 'All', None, None)
+    rows = AggregationLayer(FilterIndex(df))
+    cube = AggregationLayer(build_cube_index(df))
+    for name in ['sentiment_counts', 'media_type_counts', 'platform_engagements', 'location_engagements']:
+        _assert_same(rows.metric(state, name), cube.metric(state, name))
+
+
+# Hanya hari yang disentuh delta yang dikelompokkan ulang; hasilnya tetap setara build_cube atas semua baris.
+# Delta berisi baris paling akhir, jadi hari pertama tidak tersentuh dan hari pemisah terbagi dua
+@pytest.mark.parametrize('split', [8, 10, 20])
+def test_update_cube_equals_full_build(split):
+    df = _frame().sort_values('Date', kind='stable').reset_index(drop=True)
+    updated = update_cube(build_cube(df.iloc[:split]), build_cube(df.iloc[split:], row_offset=split))
+    expected = build_cube(df)
+    columns = list(expected.columns)
+    pd.testing.assert_frame_equal(updated[columns].sort_values(columns).reset_index(drop=True),
+                                  expected.sort_values(columns).reset_index(drop=True), check_dtype=False,
+                                  check_categorical=False)
+
+
+# Enam baris dengan jumlah yang sama untuk beberapa nilai; urutan kemunculan pertama tidak alfabetis
+TIES = pd.DataFrame({
+    'Date': pd.to_datetime(['2024-01-01 09:00', '2024-01-01 10:00', '2024-01-02 09:00', '2024-01-02 10:00',
+                            '2024-01-03 09:00', '2024-01-03 10:00']),
+    'Engagements': [5, 3, 8, 2, 4, 6],
+    'Platform': ['X', 'Y', 'X', 'Y', 'X', 'Y'],
+    'Sentiment': ['Positive', 'Negative', 'Neutral', 'Negative', 'Positive', 'Mixed'],
+    'Media Type': ['Video', 'Image', 'Video', 'Image', 'Text', 'Text'],
+    'Location': ['Jakarta', 'Bandung', 'Jakarta', 'Bandung', 'Surabaya', 'Surabaya'],
+})
+
+TIE_STATES = [FilterState('All', 'All', 'All', 'All', None, None),
+              FilterState('All', 'All', 'All', 'All', DAYS[1], DAYS[2]),
+              FilterState('Y', 'All', 'All', 'All', DAYS[0], DAYS[2]),
+              FilterState('All', 'All', 'Text', 'All', None, None)]
+
+
+# Baris mentah terfilter, seperti jalur per baris sebelum kubus
+def _filtered(df, state):
+    mask = pd.Series(True, index=df.index)
+    for col, value in zip(['Platform', 'Sentiment', 'Media Type', 'Location'], state[:4]):
+        if value != 'All':
+            mask &= df[col] == value
+    if state.start_date and state.end_date:
+        mask &= (df['Date'] >= pd.Timestamp(state.start_date)) & (df['Date'] <= pd.Timestamp(state.end_date))
+    return df[mask]
+
+
+def _categorical(df):
+    return df.astype({col: 'category' for col in ['Platform', 'Sentiment', 'Media Type', 'Location']})
+
+
+# Jumlah per nilai, termasuk urutan nilai berjumlah sama, dan wawasan dominan/terkecil sama dengan
+# value_counts() pada baris mentah terfilter
+@pytest.mark.parametrize('index', [lambda df: build_cube_index(_categorical(df)),
+                                   lambda df: FilterIndex(_categorical(df))], ids=['kubus', 'baris'])
+@pytest.mark.parametrize('state', TIE_STATES)
+def test_counts_match_value_counts(index, state):
+    layer = AggregationLayer(index(TIES))
+    expected_rows = _filtered(TIES, state)
+    facts = layer.metric(state, 'summary_facts')
+    for col, metric, builder, fact in [('Sentiment', 'sentiment_counts', sentiment_section, 'dominant_sentiment'),
+                                       ('Media Type', 'media_type_counts', media_type_section, 'dominant_media_type')]:
+        expected = expected_rows[col].value_counts()
+        actual = layer.metric(state, metric)
+        assert list(actual.items()) == list(expected.items())
+        assert facts[fact] == expected.idxmax()
+        insights = builder(layer, state)['insights']
+        assert f"**{expected.idxmax()}**" in insights[0]
+        if len(expected) > 1:
+            assert f"**{expected.idxmin()}**" in insights[1]
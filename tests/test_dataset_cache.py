@@ -0,0 +1,45 @@
+import io
+
+import pandas as pd
+
+from dataset_cache import DatasetCache, dataset_key, hash_upload
+
+
+def _frame(rows=1000):
+    return pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=rows, freq='h'),
+        'Engagements': pd.Series(range(rows), dtype='int64'),
+        'Platform': pd.Categorical(['X', 'Y'] * (rows // 2)),
+    })
+
+
+def test_round_trip(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    df = _frame()
+    assert cache.store('k', df, {'rows_removed': 3})
+    loaded, metadata = cache.load('k')
+    pd.testing.assert_frame_equal(loaded, df)
+    assert metadata == {'rows_removed': 3}
+    assert cache.load('tidak-ada') is None
+
+
+# Kolom tanpa nilai kosong dibaca langsung dari buffer mmap (tanpa salinan, jadi hanya-baca)
+def test_load_is_zero_copy(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    cache.store('k', _frame())
+    loaded, _ = cache.load('k')
+    assert not loaded['Engagements'].to_numpy().flags.writeable
+    assert not loaded['Date'].to_numpy().flags.writeable
+    assert not loaded['Platform'].cat.codes.to_numpy().flags.writeable
+
+
+def test_store_over_budget_is_rejected(tmp_path):
+    cache = DatasetCache(str(tmp_path), budget_bytes=100)
+    assert not cache.store('k', _frame())
+    assert not cache.has('k')
+
+
+def test_hash_upload_and_key():
+    content = b'Date,Engagements\n2024-01-01,1\n'
+    assert hash_upload(io.BytesIO(content)) == hash_upload(io.BytesIO(content))
+    assert dataset_key('h', drop_nan=True) != dataset_key('h', drop_nan=False)
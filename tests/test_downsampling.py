@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregations import AggregationLayer
+from data_cube import build_cube_index
+from downsampling import (AUTO_GRANULARITY, TREND_POINT_BUDGET, WEBGL_POINT_THRESHOLD, bucket_series,
+                          choose_granularity, lttb, trend_points)
+from report_engine import ALL_FILTERS, trend_section
+
+
+def _daily(days, start='2023-01-01'):
+    index = pd.date_range(start, periods=days, freq='D', name='Date')
+    return pd.Series(np.arange(days, dtype='int64') % 17, index=index, name='Engagements')
+
+
+@pytest.mark.parametrize('days, expected', [(1, 'D'), (TREND_POINT_BUDGET, 'D'), (TREND_POINT_BUDGET + 1, 'W'),
+                                            (7 * TREND_POINT_BUDGET, 'W'), (7 * TREND_POINT_BUDGET + 1, 'M')])
+def test_choose_granularity(days, expected):
+    assert choose_granularity(days) == expected
+    assert choose_granularity(days, 'M') == 'M'
+
+
+# Mode otomatis dapat mencapai jalur WebGL: rentang harian di atas ambang tetap harian
+def test_auto_granularity_reaches_webgl():
+    days = WEBGL_POINT_THRESHOLD + 100
+    df = pd.DataFrame({'Date': pd.date_range('2023-01-01', periods=days, freq='D'), 'Engagements': 1})
+    section = trend_section(AggregationLayer(build_cube_index(df)), ALL_FILTERS, AUTO_GRANULARITY)
+    trace, = section['figure'].data
+    assert trace.type == 'scattergl'
+    assert len(trace.x) == days
+
+
+# 2023-01-01 adalah hari Minggu: minggu pertama dimulai Senin 2022-12-26, labelnya dipotong ke data pertama
+def test_first_week_label_is_clipped_to_data_start():
+    daily = _daily(20)
+    weekly = bucket_series(daily, 'W')
+    assert weekly.index[0] == pd.Timestamp('2023-01-01')
+    assert list(weekly.index[1:]) == list(pd.date_range('2023-01-02', periods=len(weekly) - 1, freq='W-MON'))
+    assert weekly.sum() == daily.sum()
+    assert weekly.iloc[0] == daily.iloc[0]
+
+
+def test_first_month_label_is_clipped_to_data_start():
+    monthly = bucket_series(_daily(60, start='2023-01-15'), 'M')
+    assert list(monthly.index) == [pd.Timestamp('2023-01-15'), pd.Timestamp('2023-02-01'), pd.Timestamp('2023-03-01')]
+
+
+def test_lttb_keeps_ends_and_peaks():
+    y = np.zeros(1000)
+    y[123] = 50
+    y[789] = -40
+    selected = lttb(y, 100)
+    assert len(selected) == 100
+    assert selected[0] == 0 and selected[-1] == 999
+    assert {123, 789} <= set(selected)
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_trend_points_respects_budget():
+    daily = _daily(3000)
+    points, granularity, total = trend_points(daily, 'D', budget=500)
+    assert (granularity, total, len(points)) == ('D', 3000, 500)
+    assert points.index[0] == daily.index[0] and points.index[-1] == daily.index[-1]
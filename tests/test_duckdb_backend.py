@@ -0,0 +1,97 @@
+import datetime
+import os
+import tomllib
+
+import pandas as pd
+import pytest
+
+import duckdb_backend
+from aggregations import FilterState
+from duckdb_backend import load_cube, verify_against_pandas
+
+pytest.importorskip('duckdb')
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# File contoh -> (jumlah baris bersih, baris dihapus) dengan drop_nan=True
+FIXTURES = {
+    'mixed_formats.csv': (6, 1),
+    'times_of_day.csv': (7, 0),
+    'dayfirst.csv': (5, 0),
+    'engagements.csv': (6, 2),
+    'missing_columns.csv': (3, 1),
+    'no_dates.csv': (2, 1),
+    'timezones.csv': (4, 1),
+    'ties.csv': (6, 0),
+}
+
+
+def _path(name):
+    return os.path.join(DATA_DIR, name)
+
+
+@pytest.mark.parametrize('name', sorted(FIXTURES))
+def test_matches_pandas(name):
+    assert verify_against_pandas(_path(name)) == []
+
+
+# Tanpa drop_nan, baris dengan dimensi kosong tetap ada (hanya file yang memuat nilai kosong)
+@pytest.mark.parametrize('name', ['engagements.csv', 'missing_columns.csv', 'no_dates.csv'])
+def test_matches_pandas_keeping_nan(name):
+    assert verify_against_pandas(_path(name), drop_nan=False) == []
+
+
+@pytest.mark.parametrize('name, counts', sorted(FIXTURES.items()))
+def test_row_counts(name, counts):
+    _, row_count, rows_removed, _ = load_cube(_path(name))
+    assert (row_count, rows_removed) == counts
+
+
+# Batas rentang tanggal jatuh tepat di tengah malam dan di antara waktu-waktu pada hari yang sama
+def test_matches_pandas_at_date_boundaries():
+    days = [datetime.date(2024, 1, day) for day in (1, 2, 3)]
+    states = [FilterState('All', 'All', 'All', 'All', start, end) for start in days for end in days if start <= end]
+    states += [FilterState('X', 'All', 'All', 'Jakarta', days[0], days[1])]
+    assert verify_against_pandas(_path('times_of_day.csv'), states=states) == []
+
+
+def test_timezone_dates_are_naive_utc():
+    cube, _, _, _ = load_cube(_path('timezones.csv'))
+    assert cube['Date'].dt.tz is None
+    assert sorted(cube['Date']) == [pd.Timestamp('2024-01-01 10:00'), pd.Timestamp('2024-01-02 16:30'),
+                                    pd.Timestamp('2024-01-04 01:00')]
+
+
+# Filter yang didorong ke pemindaian tidak mengubah jumlah baris bersih dan baris dihapus
+def test_filtered_scan():
+    state = FilterState('Y', 'All', 'All', 'All', datetime.date(2024, 1, 2), datetime.date(2024, 1, 3))
+    cube, row_count, rows_removed, _ = load_cube(_path('timezones.csv'), state=state)
+    assert (row_count, rows_removed) == FIXTURES['timezones.csv']
+    assert cube['Rows'].sum() == 2
+    assert set(cube['Platform']) == {'Y'}
+
+
+def test_missing_columns_warn():
+    _, _, _, warnings = load_cube(_path('missing_columns.csv'))
+    assert any('Engagements' in warning for warning in warnings)
+    _, _, _, warnings = load_cube(_path('no_dates.csv'))
+    assert any('Date' in warning for warning in warnings)
+
+
+# Tipe tanggal yang berbeda antar backend dilaporkan sebagai perbedaan, bukan pengecualian
+def test_type_mismatch_is_reported(monkeypatch):
+    def tz_aware_cube(*args, **kwargs):
+        cube, row_count, rows_removed, warnings = load_cube(*args, **kwargs)
+        return cube.assign(Date=cube['Date'].dt.tz_localize('UTC')), row_count, rows_removed, warnings
+
+    monkeypatch.setattr(duckdb_backend, 'load_cube', tz_aware_cube)
+    mismatches = verify_against_pandas(_path('timezones.csv'))
+    assert any('tipe kolom Date' in mismatch for mismatch in mismatches)
+
+
+# Unggahan di atas ambang out-of-core harus lolos batas unggahan Streamlit, kalau tidak DuckDB tak pernah dipakai
+def test_upload_limit_allows_out_of_core_uploads():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.streamlit', 'config.toml')
+    with open(config_path, 'rb') as f:
+        max_upload_mb = tomllib.load(f)['server']['maxUploadSize']
+    assert max_upload_mb * 1024 ** 2 > duckdb_backend.OUT_OF_CORE_THRESHOLD
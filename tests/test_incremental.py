@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+
+from data_cube import ROWS_COLUMN, build_cube
+from dataset_cache import DatasetCache
+from incremental import IncrementalDataset
+
+DIMENSIONS = ['Platform', 'Sentiment', 'Media Type', 'Location']
+
+
+def _frame(times, engagements, platforms):
+    rows = len(times)
+    return pd.DataFrame({
+        'Date': pd.to_datetime(times),
+        'Engagements': pd.Series(engagements, dtype='int64'),
+        'Platform': platforms,
+        'Sentiment': ['Positive'] * rows,
+        'Media Type': ['Video'] * rows,
+        'Location': ['Jakarta'] * rows,
+    })
+
+
+BASE = _frame(['2024-01-01 08:00', '2024-01-01 08:00', '2024-01-02 00:00'], [5, 5, 7], ['X', 'X', 'Y'])
+
+
+def _sorted(cube):
+    return cube.sort_values(['Date'] + DIMENSIONS).reset_index(drop=True)
+
+
+# Baris yang muncul k kali di delta dan n kali di dataset ditambah max(k - n, 0) kali
+def test_append_matches_rows_as_multiset():
+    dataset = IncrementalDataset.from_cleaned(BASE, rows_removed=1)
+    delta = _frame(['2024-01-01 08:00', '2024-01-01 08:00', '2024-01-01 08:00', '2024-01-03 09:00'],
+                   [5, 5, 5, 4], ['X', 'X', 'X', 'Y'])
+    appended, stats = dataset.append(delta, rows_removed=2, delta_hash='d1')
+
+    assert stats == {'rows_added': 2, 'duplicates_skipped': 2, 'rows_removed': 2}
+    assert appended.row_count == 5
+    assert appended.metadata['rows_removed'] == 3
+    assert appended.has_delta('d1') and not dataset.has_delta('d1')
+    expected = build_cube(pd.concat([BASE, delta.iloc[[2, 3]]], ignore_index=True))
+    pd.testing.assert_frame_equal(_sorted(appended.cube), _sorted(expected), check_dtype=False)
+
+    again, stats = appended.append(delta, rows_removed=0, delta_hash='d2')
+    assert stats['rows_added'] == 0 and again.row_count == 5
+
+
+def test_store_and_load_round_trip(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    dataset = IncrementalDataset.from_cleaned(BASE, rows_removed=0)
+    assert dataset.store(cache, 'k')
+    assert all(cache.has(key) for key in IncrementalDataset.cache_keys('k'))
+    assert len(os.listdir(tmp_path)) == len(IncrementalDataset.cache_keys('k'))
+
+    loaded = IncrementalDataset.load(cache, 'k')
+    pd.testing.assert_frame_equal(_sorted(loaded.cube), _sorted(dataset.cube), check_dtype=False)
+    assert loaded.metadata == dataset.metadata
+    assert (loaded.hashes == dataset.hashes).all() and (loaded.counts == dataset.counts).all()
+    assert IncrementalDataset.load(cache, 'tidak-ada') is None
+
+
+# Entri dataset tersimpan disematkan; entri ref sebelumnya kembali digusur menurut LRU
+def test_saved_dataset_survives_eviction(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    dataset = IncrementalDataset.from_cleaned(BASE, rows_removed=0)
+    dataset.store(cache, 'lama')
+    cache.save_ref('data.csv', 'lama', pins=IncrementalDataset.cache_keys('lama'))
+
+    cache.budget_bytes = cache.total_bytes() - 1
+    assert cache.evict() > cache.budget_bytes
+    assert IncrementalDataset.load(cache, 'lama') is not None
+
+    appended, _ = dataset.append(_frame(['2024-01-04 10:00'], [3], ['Y']), rows_removed=0, delta_hash='d1')
+    appended.store(cache, 'baru')
+    cache.save_ref('data.csv', 'baru', pins=IncrementalDataset.cache_keys('baru'))
+    assert IncrementalDataset.load(cache, 'baru').cube[ROWS_COLUMN].sum() == 4
+    assert not any(cache.has(key) for key in IncrementalDataset.cache_keys('lama'))
@@ -0,0 +1,115 @@
+import io
+
+import pandas as pd
+import pytest
+
+from ingestion import (CATEGORICAL_COLUMNS, DATE_FORMAT_MIN_SHARE, detect_date_format, parse_mixed_dates,
+                       read_csv_chunked)
+
+CSV_HEADER = 'Date,Engagements,Platform,Sentiment,Media Type,Location\n'
+
+ROWS = ['2024-01-01,5,X,Positive,Video,Jakarta', '2024-01-02,6,Y,Negative,Text,Bandung',
+        '2024-01-03,7.9,X,Neutral,Video,Jakarta', '2024-01-04,abc,Z,Positive,Text,Medan',
+        '2024-01-05,9,X,Positive,Video,Bandung', '2024-01-06,,Y,Negative,Image,Jakarta',
+        '2024-01-07,11,Z,Neutral,Video,Surabaya']
+
+
+def _csv(rows):
+    return io.BytesIO((CSV_HEADER + ''.join(row + '\n' for row in rows)).encode('utf-8'))
+
+
+def _values(series):
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+# Satu chunk berisi kolom dimensi yang kosong seluruhnya (kategori bertipe object, bukan str)
+def test_blank_dimension_chunk_matches_read_csv():
+    rows = ['2024-01-01,5,X,Positive,Video,', '2024-01-02,6,Y,Negative,Text,', '2024-01-03,7,X,Neutral,Video,',
+            '2024-01-04,8,Y,Positive,Text,Jakarta', '2024-01-05,9,X,Positive,Video,Bandung']
+    df, _ = read_csv_chunked(_csv(rows), chunksize=3)
+    expected = pd.read_csv(_csv(rows))
+    for col in CATEGORICAL_COLUMNS:
+        assert _values(df[col]) == _values(expected[col]), col
+
+
+# Hasil tidak bergantung pada letak batas chunk
+@pytest.mark.parametrize('chunksize', [1, 2, 3, 6, 7, 100])
+def test_chunk_boundaries_do_not_change_result(chunksize):
+    expected, _ = read_csv_chunked(_csv(ROWS), chunksize=len(ROWS))
+    df, report = read_csv_chunked(_csv(ROWS), chunksize=chunksize)
+    pd.testing.assert_frame_equal(df, expected)
+    assert report[0] == {'stage': 'chunk_terbesar', 'rows': min(chunksize, len(ROWS)), 'bytes': report[0]['bytes']}
+
+
+def test_chunks_are_typed():
+    df, _ = read_csv_chunked(_csv(ROWS), chunksize=3)
+    for col in CATEGORICAL_COLUMNS:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype)
+        assert list(df[col].cat.categories) == sorted(df[col].dropna().unique())
+    assert pd.api.types.is_datetime64_dtype(df['Date'])
+    # Pecahan dipotong, nilai rusak dan kosong menjadi 0
+    assert df['Engagements'].tolist() == [5, 6, 7, 0, 9, 0, 11]
+
+
+# Tanpa format dominan, nilai tanggal unik diurai per nilai dan hasilnya dipakai ulang antar chunk
+def test_mixed_dates_across_chunks():
+    rows = ['2024-01-31,1,X,Positive,Video,Jakarta', '31/01/2024,2,X,Positive,Video,Jakarta',
+            '2024-01-31,3,X,Positive,Video,Jakarta', '01/02/2024 10:30,4,X,Positive,Video,Jakarta',
+            'bukan tanggal,5,X,Positive,Video,Jakarta']
+    df, _ = read_csv_chunked(_csv(rows), chunksize=2)
+    assert df['Date'].tolist()[:4] == [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-01-31'),
+                                       pd.Timestamp('2024-01-31'), pd.Timestamp('2024-02-01 10:30')]
+    assert pd.isna(df['Date'].iloc[4])
+
+
+def test_empty_file():
+    df, _ = read_csv_chunked(_csv([]))
+    assert df.empty
+
+
+def test_detect_date_format_exact():
+    assert detect_date_format(['2024-01-31', '2024-02-01', None]) == '%Y-%m-%d'
+    assert detect_date_format(['31/01/2024', '01/02/2024']) == '%d/%m/%Y'
+    assert detect_date_format(['2024-01-31 10:00:00', '2024-02-01 11:30:00']) == '%Y-%m-%d %H:%M:%S'
+
+
+def test_detect_date_format_empty():
+    assert detect_date_format([]) is None
+    assert detect_date_format([None, None]) is None
+
+
+# Nilai kotor di bawah ambang tidak menggagalkan deteksi; di atas ambang tidak ada format dominan
+def test_detect_date_format_share_threshold():
+    valid = [f'2024-01-{day:02d}' for day in range(1, 20)]
+    assert len(valid) / (len(valid) + 1) == DATE_FORMAT_MIN_SHARE
+    assert detect_date_format(valid + ['rusak']) == '%Y-%m-%d'
+    assert detect_date_format(valid[:18] + ['rusak', 'juga rusak']) is None
+
+
+def test_detect_date_format_mixed():
+    assert detect_date_format(['2024-01-31', '31/01/2024', '01/31/2024', '2024/01/31']) is None
+
+
+def test_parse_mixed_dates():
+    parsed = parse_mixed_dates(['2024-01-31', '31/01/2024', '02/13/2024', '01/02/2024 10:30',
+                                '2024-01-31T10:00:00.5', 'rusak', None])
+    assert parsed.tolist()[:5] == [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-01-31'), pd.Timestamp('2024-02-13'),
+                                   pd.Timestamp('2024-02-01 10:30'), pd.Timestamp('2024-01-31 10:00:00.5')]
+    assert parsed.iloc[5:].isna().all()
+
+
+# Tanggal ISO dengan 'Z' atau offset dinormalkan ke UTC tanpa zona, juga jika offset berbeda antar baris
+def test_timezone_dates_are_naive_utc():
+    rows = ['2024-01-01T10:00:00Z,1,X,Positive,Video,Jakarta', '2024-01-02T23:30:00+07:00,2,X,Positive,Video,Jakarta',
+            '2024-01-03T00:30:00-05:00,3,X,Positive,Video,Jakarta', 'rusak,4,X,Positive,Video,Jakarta']
+    df, _ = read_csv_chunked(_csv(rows), chunksize=2)
+    assert df['Date'].dt.tz is None
+    assert df['Date'].tolist()[:3] == [pd.Timestamp('2024-01-01 10:00'), pd.Timestamp('2024-01-02 16:30'),
+                                       pd.Timestamp('2024-01-03 05:30')]
+    assert pd.isna(df['Date'].iloc[3])
+
+
+def test_parse_mixed_dates_with_offsets():
+    parsed = parse_mixed_dates(['31/01/2024', '2024-01-31T10:00:00+07:00', '2024-01-31T10:00:00Z'])
+    assert parsed.tolist() == [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-01-31 03:00'),
+                               pd.Timestamp('2024-01-31 10:00')]
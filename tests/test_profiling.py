@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from profiling import Profiler
+
+MB = 2 ** 20
+
+
+def test_stage_records():
+    profiler = Profiler(log=False)
+    with profiler.stage('luar', rows_in=10) as outer:
+        with profiler.stage('dalam'):
+            pass
+        outer['rows_out'] = 5
+    outer, inner = profiler.records
+    assert (outer['stage'], outer['depth'], outer['rows_in'], outer['rows_out']) == ('luar', 0, 10, 5)
+    assert (inner['stage'], inner['depth']) == ('dalam', 1)
+    assert outer['seconds'] >= inner['seconds'] >= 0
+    assert outer['peak_memory_bytes'] is None
+
+
+def test_cache_status_from_stats():
+    stats = {'misses': 0}
+    profiler = Profiler(log=False)
+    with profiler.stage('hit', cache_stats=lambda: stats):
+        pass
+    with profiler.stage('miss', cache_stats=lambda: stats):
+        stats['misses'] += 1
+    assert [record['cache'] for record in profiler.records] == ['hit', 'miss']
+
+
+# Puncak tahap induk mencakup puncak tahap anak, walaupun anak me-reset puncak tracemalloc
+def test_nested_peaks():
+    profiler = Profiler(log=False, track_memory=True)
+    with profiler.stage('luar'):
+        with profiler.stage('dalam'):
+            block = np.ones(8 * MB, dtype=np.uint8)
+            del block
+        with profiler.stage('kecil'):
+            pass
+    outer, inner, small = profiler.records
+    assert inner['peak_memory_bytes'] >= 8 * MB
+    assert outer['peak_memory_bytes'] >= inner['peak_memory_bytes']
+    assert small['peak_memory_bytes'] < MB
+
+
+# Tahap terukur dari dua profiler (mis. dua sesi) tidak tumpang tindih, jadi reset_peak satu tahap
+# tidak menghapus puncak tahap lain
+def test_concurrent_measured_stages_run_one_at_a_time():
+    events = []
+    first_started = threading.Event()
+
+    def run(name, size, started=None):
+        profiler = Profiler(log=False, track_memory=True)
+        with profiler.stage(name):
+            events.append(('mulai', name))
+            if started is not None:
+                started.set()
+            block = np.ones(size, dtype=np.uint8)
+            time.sleep(0.2)
+            del block
+            events.append(('selesai', name))
+        return profiler.records[0]
+
+    results = {}
+    first = threading.Thread(target=lambda: results.update(a=run('a', 16 * MB, first_started)))
+    first.start()
+    first_started.wait()
+    second = threading.Thread(target=lambda: results.update(b=run('b', MB)))
+    second.start()
+    first.join()
+    second.join()
+
+    assert events == [('mulai', 'a'), ('selesai', 'a'), ('mulai', 'b'), ('selesai', 'b')]
+    assert results['a']['peak_memory_bytes'] >= 16 * MB
+    assert MB <= results['b']['peak_memory_bytes'] < 16 * MB
+
+
+def test_emit_json(caplog):
+    profiler = Profiler(session_id='sesi', log=True)
+    with caplog.at_level('INFO', logger='media_dashboard.profiling'):
+        with profiler.stage('tahap'):
+            pass
+    record = json.loads(caplog.records[-1].getMessage())
+    assert (record['event'], record['stage'], record['session_id'], record['run_id']) == \
+        ('stage', 'tahap', 'sesi', profiler.run_id)
+
+
+# Tahap yang menunggu I/O (memory=False) tidak memegang kunci pengukuran dan tidak menyalakan tracemalloc,
+# jadi tahap terukur sesi lain selesai selama penantian itu
+def test_waiting_stage_does_not_block_measured_stages():
+    waiting = threading.Event()
+    response = threading.Event()
+    tracing_during_wait = []
+
+    def wait_for_network():
+        profiler = Profiler(log=False, track_memory=True)
+        with profiler.stage('summary', memory=False):
+            waiting.set()
+            tracing_during_wait.append(tracemalloc.is_tracing())
+            assert response.wait(5)
+        return profiler
+
+    results = {}
+    first = threading.Thread(target=lambda: results.update(a=wait_for_network()))
+    first.start()
+    waiting.wait()
+
+    other = Profiler(log=False, track_memory=True)
+
+    def measure():
+        with other.stage('hash_upload'):
+            block = np.ones(MB, dtype=np.uint8)
+            del block
+
+    second = threading.Thread(target=measure)
+    second.start()
+    second.join(timeout=2)
+    finished_while_waiting = not second.is_alive()
+    response.set()
+    first.join()
+    second.join()
+
+    assert finished_while_waiting
+
+    assert tracing_during_wait == [False]
+    assert other.records[0]['peak_memory_bytes'] >= MB
+    assert results['a'].records[0]['peak_memory_bytes'] is None
+
+
+# Tahap anak di dalam tahap tanpa memori tetap diukur
+def test_measured_child_of_timing_only_stage():
+    profiler = Profiler(log=False, track_memory=True)
+    with profiler.stage('load_dataset', memory=False):
+        with profiler.stage('parse_csv'):
+            block = np.ones(4 * MB, dtype=np.uint8)
+            del block
+        assert not tracemalloc.is_tracing()
+    outer, inner = profiler.records
+    assert outer['peak_memory_bytes'] is None
+    assert inner['peak_memory_bytes'] >= 4 * MB
@@ -0,0 +1,63 @@
+import base64
+
+import plotly.graph_objects as go
+import pytest
+
+import report_export
+from report_engine import ALL_FILTERS, report_filters
+from report_export import render_export
+
+# PNG 1x1 piksel
+PNG = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==')
+
+
+def _report():
+    sections = [{'key': key, 'title': f"Grafik {key}", 'empty_message': "Tidak ada data.", 'insights': [f"Wawasan {key}"],
+                 'figure': go.Figure(go.Bar(x=['X', 'Y'], y=[1, 2])).to_plotly_json()}
+                for key in ('sentiment', 'platform', 'trend')]
+    return {'name': 'data.csv', 'rows': 2, 'rows_removed': 0, 'warnings': [], 'filters': report_filters(ALL_FILTERS),
+            'sections': sections, 'summary': None}
+
+
+# Hanya grafik 'sentiment' yang berhasil dibuat gambarnya
+@pytest.fixture
+def partial_images(monkeypatch):
+    images = iter([PNG, None, None])
+    monkeypatch.setattr(report_export, 'chart_image', lambda figure: next(images))
+
+
+# Grafik tanpa gambar disematkan sebagai Plotly interaktif; Plotly.js dimuat sekali di dalam file, bukan dari CDN
+def test_html_embeds_figures_without_image(partial_images):
+    page = render_export(_report(), 'html').decode('utf-8')
+    assert page.count('<img src="data:image/png;base64,') == 1
+    assert page.count('Plotly.newPlot') == 2
+    assert page.count('plotly.js v') == 1
+    assert 'src="https://cdn.plot.ly' not in page
+    assert report_export.IMAGE_UNAVAILABLE_MESSAGE not in page
+
+
+def test_pdf_notes_missing_images(partial_images, monkeypatch):
+    pytest.importorskip('fpdf')
+    notes = []
+    monkeypatch.setattr(report_export, '_pdf_text', lambda text: notes.append(str(text)) or str(text))
+    render_export(_report(), 'pdf')
+    assert notes.count(report_export.IMAGE_UNAVAILABLE_MESSAGE) == 2
+
+
+# Hanya '**' yang menjadi tebal; '--', '__', '~~' dan tautan dari teks LLM tampil apa adanya
+def test_pdf_summary_keeps_literal_markers(monkeypatch):
+    pytest.importorskip('fpdf')
+    monkeypatch.setattr(report_export, 'chart_image', lambda figure: None)
+    written = []
+    write = report_export.FPDF.write
+
+    def record(pdf, height, text, *args, **kwargs):
+        written.append((text, 'B' in pdf.font_style))
+        return write(pdf, height, text, *args, **kwargs)
+
+    monkeypatch.setattr(report_export.FPDF, 'write', record)
+    report = _report()
+    report['summary'] = "Tingkatkan -- segera -- konten __video__ ~~lama~~ [X](http://x) di **Platform X**."
+    render_export(report, 'pdf')
+    assert written[:3] == [("Tingkatkan -- segera -- konten __video__ ~~lama~~ [X](http://x) di ", False),
+                           ("Platform X", True), (".", False)]
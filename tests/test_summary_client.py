@@ -0,0 +1,178 @@
+import pytest
+import requests
+
+from summary_client import DEFAULT_MODEL, UNEXPECTED_RESPONSE_TEXT, SummaryClient
+
+FACTS = {'dominant_sentiment': 'Positive', 'top_platform': 'X'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def client(gemini_server, sleeps, clock):
+    client = SummaryClient('kunci-tes', base_url=gemini_server.base_url, max_retries=3, backoff_factor=0.5,
+                           max_backoff=8.0, cache_ttl=60.0, sleep=sleeps.append, clock=clock)
+    client.session.trust_env = False # abaikan proksi lingkungan untuk server lokal
+    yield client
+    client.close()
+
+
+def test_summarize_posts_prompt(client, gemini_server):
+    gemini_server.respond_text('Ringkasan **penting**')
+    assert client.summarize('prompt tes', 'professional', FACTS) == 'Ringkasan **penting**'
+    request, = gemini_server.requests
+    assert request['path'] == f"/v1beta/models/{DEFAULT_MODEL}:generateContent"
+    assert request['query'] == {'key': ['kunci-tes']}
+    assert request['json'] == {'contents': [{'role': 'user', 'parts': [{'text': 'prompt tes'}]}]}
+
+
+# 429/5xx dicoba ulang: Retry-After dipakai jika ada (dibatasi max_backoff), jika tidak backoff eksponensial
+def test_retries_with_backoff_and_retry_after(client, gemini_server, sleeps):
+    gemini_server.respond(429, {'error': 'kuota'}, headers={'Retry-After': '2'})
+    gemini_server.respond(503, {'error': 'sibuk'})
+    gemini_server.respond(500, {'error': 'galat'}, headers={'Retry-After': '30'})
+    gemini_server.respond_text('akhirnya')
+    assert client.summarize('p', 'professional', FACTS) == 'akhirnya'
+    assert len(gemini_server.requests) == 4
+    assert sleeps == [2.0, 1.0, 8.0]
+
+
+def test_retry_after_date_falls_back_to_backoff(client, gemini_server, sleeps):
+    gemini_server.respond(503, {}, headers={'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+    gemini_server.respond_text('ok')
+    assert client.summarize('p', 'professional', FACTS) == 'ok'
+    assert sleeps == [0.5]
+
+
+def test_gives_up_after_max_retries(client, gemini_server, sleeps):
+    for _ in range(4):
+        gemini_server.respond(503, {'error': 'sibuk'})
+    with pytest.raises(requests.exceptions.HTTPError) as excinfo:
+        client.summarize('p', 'professional', FACTS)
+    assert excinfo.value.response.status_code == 503
+    assert len(gemini_server.requests) == 4
+    assert sleeps == [0.5, 1.0, 2.0]
+
+
+def test_client_errors_are_not_retried(client, gemini_server, sleeps):
+    gemini_server.respond(403, {'error': 'ditolak'})
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.summarize('p', 'professional', FACTS)
+    assert len(gemini_server.requests) == 1
+    assert sleeps == []
+
+
+def test_unexpected_response_is_not_cached(client, gemini_server):
+    gemini_server.respond(body={'candidates': []})
+    assert client.summarize('p', 'professional', FACTS) == UNEXPECTED_RESPONSE_TEXT
+    assert client.cached(client.cache_key('professional', FACTS)) is None
+
+
+def test_cache_hit_then_expiry(client, gemini_server, clock):
+    gemini_server.respond_text('pertama')
+    assert client.summarize('p', 'professional', FACTS) == 'pertama'
+
+    clock.now = 59.0
+    assert client.summarize('p', 'professional', FACTS) == 'pertama'
+    assert len(gemini_server.requests) == 1
+
+    # Persona atau fakta lain adalah kunci cache lain
+    gemini_server.respond_text('konsultan')
+    assert client.summarize('p', 'consultant', FACTS) == 'konsultan'
+    assert len(gemini_server.requests) == 2
+
+    clock.now = 61.0
+    gemini_server.respond_text('kedua')
+    assert client.summarize('p', 'professional', FACTS) == 'kedua'
+    assert len(gemini_server.requests) == 3
+
+
+def test_submit_runs_in_executor(client, gemini_server):
+    gemini_server.respond_text('latar')
+    future = client.submit('p', 'professional', FACTS)
+    assert future.result(timeout=10) == 'latar'
+
+    # Fakta yang sama sudah ada di cache: Future langsung selesai tanpa permintaan baru
+    cached = client.submit('p', 'professional', FACTS)
+    assert cached.done()
+    assert cached.result() == 'latar'
+    assert len(gemini_server.requests) == 1
+
+
+def test_submit_propagates_errors(client, gemini_server):
+    gemini_server.respond(404, {'error': 'tidak ada'})
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.submit('p', 'professional', FACTS).result(timeout=10)
+
+
+def test_stream_delivers_sse_chunks(client, gemini_server):
+    gemini_server.respond_sse(['Satu ', '**dua**', ' tiga'])
+    assert list(client.stream('p', 'professional', FACTS)) == ['Satu ', '**dua**', ' tiga']
+    request, = gemini_server.requests
+    assert request['path'] == f"/v1beta/models/{DEFAULT_MODEL}:streamGenerateContent"
+    assert request['query'] == {'alt': ['sse'], 'key': ['kunci-tes']}
+
+    # Teks lengkap disimpan di cache; stream berikutnya menghasilkan satu potongan tanpa permintaan
+    assert list(client.stream('p', 'professional', FACTS)) == ['Satu **dua** tiga']
+    assert client.summarize('p', 'professional', FACTS) == 'Satu **dua** tiga'
+    assert len(gemini_server.requests) == 1
+
+
+@pytest.mark.parametrize('status', [400, 404, 405, 501])
+def test_stream_falls_back_to_summarize(client, gemini_server, status):
+    gemini_server.respond(status, {'error': 'streaming tidak tersedia'})
+    gemini_server.respond_text('tanpa streaming')
+    assert list(client.stream('p', 'professional', FACTS)) == ['tanpa streaming']
+    assert [request['path'].rsplit(':', 1)[1] for request in gemini_server.requests] == \
+        ['streamGenerateContent', 'generateContent']
+
+
+def test_stream_other_errors_are_raised(client, gemini_server):
+    gemini_server.respond(403, {'error': 'ditolak'})
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(client.stream('p', 'professional', FACTS))
+    assert len(gemini_server.requests) == 1
+
+
+# Server yang mengabaikan alt=sse mengirim JSON biasa: larik objek atau satu objek
+@pytest.mark.parametrize('chunks, as_list', [(['Satu ', 'dua'], True), (['utuh'], False)])
+def test_stream_plain_json_body(client, gemini_server, chunks, as_list):
+    items = [gemini_server.text_response(chunk) for chunk in chunks]
+    gemini_server.respond(body=items if as_list else items[0])
+    assert list(client.stream('p', 'professional', FACTS)) == chunks
+    assert client.cached(client.cache_key('professional', FACTS)) == ''.join(chunks)
+
+
+def test_stream_without_text(client, gemini_server):
+    gemini_server.respond_sse([])
+    assert list(client.stream('p', 'professional', FACTS)) == [UNEXPECTED_RESPONSE_TEXT]
+    assert client.cached(client.cache_key('professional', FACTS)) is None
+
+
+def test_submit_stream(client, gemini_server, clock):
+    gemini_server.respond_sse(['a', 'b'])
+    summary_stream = client.submit_stream('p', 'professional', FACTS)
+    assert list(summary_stream) == ['a', 'b']
+    assert summary_stream.time_to_first_text == 0.0
+
+
+def test_submit_stream_reraises_errors(client, gemini_server):
+    gemini_server.respond(403, {'error': 'ditolak'})
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(client.submit_stream('p', 'professional', FACTS))
@@ -0,0 +1,41 @@
+import pytest
+
+from text_format import IncrementalBoldFormatter, format_markdown_bold
+
+TEXT = "Ringkasan **strategi** kampanye.\n1. Tingkatkan **video pendek** di *TikTok*.\n2. Fokus pada **Jakarta**"
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_format_markdown_bold():
+    assert format_markdown_bold("a **b** c **d**") == "a <strong>b</strong> c <strong>d</strong>"
+
+
+# Setiap ukuran potongan memotong teks di tempat berbeda, termasuk di tengah penanda '**'
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 7, 13, len(TEXT)])
+def test_chunked_output_matches_full_text(size):
+    formatter = IncrementalBoldFormatter()
+    for chunk in _chunks(TEXT, size):
+        partial = formatter.feed(chunk)
+        assert '**' not in partial
+    assert partial == format_markdown_bold(TEXT)
+    assert formatter.finish() == format_markdown_bold(TEXT)
+
+
+def test_marker_split_across_chunks():
+    formatter = IncrementalBoldFormatter()
+    assert formatter.feed("Fokus pada *") == "Fokus pada "
+    assert formatter.feed("*Jaka") == "Fokus pada "
+    assert formatter.feed("rta*") == "Fokus pada "
+    assert formatter.feed("* sekarang") == "Fokus pada <strong>Jakarta</strong> sekarang"
+    assert formatter.finish() == format_markdown_bold("Fokus pada **Jakarta** sekarang")
+
+
+# Penanda yang tidak pernah ditutup tampil apa adanya di hasil akhir, seperti pada teks penuh
+def test_unclosed_marker():
+    formatter = IncrementalBoldFormatter()
+    formatter.feed("harga **naik")
+    assert formatter.feed("\nbaris baru") == "harga **naik\nbaris baru"
+    assert formatter.finish() == format_markdown_bold("harga **naik\nbaris baru")
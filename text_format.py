@@ -0,0 +1,45 @@
+import re
+
+BOLD_PATTERN = re.compile(r'\*\*(.*?)\*\*')
+
+
+# Fungsi untuk mengonversi tebal seperti Markdown (**teks**) menjadi kuat HTML (<strong>teks</strong>)
+def format_markdown_bold(text):
+    return BOLD_PATTERN.sub(r'<strong>\1</strong>', text)
+
+
+# Konversi tebal secara bertahap untuk teks yang datang per potongan.
+# Pola tebal tidak melewati baris baru, jadi baris yang sudah lengkap dikonversi sekali lalu dibekukan.
+# Pada baris yang masih berjalan, penanda '**' yang belum tertutup (dan '*' tunggal di akhir,
+# yang mungkin separuh penanda) ditahan sampai potongan berikutnya, sehingga tanda bintang mentah
+# tidak pernah tampil sementara. Hasil akhir sama persis dengan format_markdown_bold(teks_penuh).
+class IncrementalBoldFormatter:
+    def __init__(self):
+        self.text = ''
+        self._done_html = ''
+        self._line = ''
+
+    def feed(self, chunk):
+        self.text += chunk
+        self._line += chunk
+        if '\n' in self._line:
+            complete, self._line = self._line.rsplit('\n', 1)
+            self._done_html += format_markdown_bold(complete + '\n')
+        return self._done_html + self._render_partial_line()
+
+    def _render_partial_line(self):
+        line = self._line
+        safe_end = 0
+        for match in BOLD_PATTERN.finditer(line):
+            safe_end = match.end()
+        tail = line[safe_end:]
+        open_marker = tail.find('**')
+        if open_marker >= 0:
+            tail = tail[:open_marker]
+        elif tail.endswith('*'):
+            tail = tail[:-1]
+        return format_markdown_bold(line[:safe_end]) + tail
+
+    # HTML akhir setelah semua potongan diterima
+    def finish(self):
+        return format_markdown_bold(self.text)